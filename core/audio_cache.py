@@ -2,12 +2,17 @@
 
 import os
 import hashlib
+import mmap
+from typing import List
 from core.config import GlobalConfig
+from core.audio_models import AudioJob
+from core.tts_text import normalize_tts_text, split_phrases
 
 class AudioCache:
     """
     Manages storage and retrieval of generated audio files.
-    Key strategy: SHA256(backend + voice_id + text).
+    Key strategy: SHA256(backend + voice_id + text), text normalized first
+    (TTS_NORMALIZE) so lines spoken the same share one file.
     """
     def __init__(self, config: GlobalConfig):
         self.config = config
@@ -17,12 +22,46 @@ class AudioCache:
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
 
-    def get_key(self, backend_name: str, job) -> str:
-        """Generates a unique hash for a specific audio job."""
+    def tts_text(self, text: str) -> str:
+        """The text actually synthesized (and keyed) for a line."""
+        return normalize_tts_text(text) if self.config.TTS_NORMALIZE else text
+
+    def phrase_jobs(self, job: AudioJob) -> List[AudioJob]:
+        """
+        The jobs a job is synthesized and cached as: with TTS_PHRASE_SEGMENTS
+        a multi-sentence TTS line becomes one job per sentence (played back
+        to back), anything else is [job]. Split before routing, so whoever
+        tracks a job sees the ones that actually run.
+        """
+        if job is None or job.kind != "tts" or not job.text or not self.config.TTS_PHRASE_SEGMENTS:
+            return [job]
+        phrases = split_phrases(self.tts_text(job.text))
+        if len(phrases) < 2:
+            return [job]
+        return [AudioJob(kind="tts", text=phrase, voice_id=job.voice_id, segment=index)
+                for index, phrase in enumerate(phrases)]
+
+    @staticmethod
+    def _key(backend_name: str, voice_id: str, text: str) -> str:
         # We combine all factors that change the audio output
-        payload = f"{backend_name}|{job.voice_id}|{job.text}"
+        payload = f"{backend_name}|{voice_id}|{text}"
         return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
+    def get_key(self, backend_name: str, job) -> str:
+        """Generates a unique hash for a specific audio job."""
+        return self._key(backend_name, job.voice_id, self.tts_text(job.text))
+
+    def candidate_keys(self, backend_name: str, job) -> List[str]:
+        """
+        Keys to look up, best first: the normalized key, then the raw-text
+        key that files generated before normalization were stored under.
+        """
+        keys = [self.get_key(backend_name, job)]
+        raw_key = self._key(backend_name, job.voice_id, job.text)
+        if raw_key != keys[0]:
+            keys.append(raw_key)
+        return keys
+
     def get_filepath(self, key: str) -> str:
         """Returns the full expected path for a cache key."""
         # Using .mp3 as generic container, though could be .wav depending on backend
@@ -31,4 +70,70 @@ class AudioCache:
     def has(self, key: str) -> bool:
         """Checks if the file exists on disk."""
         path = self.get_filepath(key)
-        return os.path.exists(path) and os.path.getsize(path) > 0
\ No newline at end of file
+        return os.path.exists(path) and os.path.getsize(path) > 0
+
+class AudioCacheIndex:
+    """
+    Sorted, memory-mapped list of the cache keys present on disk.
+
+    Lets many processes answer "is this line cached?" with a binary search
+    over shared pages instead of a stat() per lookup. It is a snapshot:
+    rebuild it after new audio has been generated.
+    Layout: MAGIC | 32-byte SHA256 digests, ascending.
+    """
+    MAGIC = b"RAIDX001"
+    KEY_SIZE = 32
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self._map[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f"Not an audio cache index: {path}")
+        self._count = (len(self._map) - len(self.MAGIC)) // self.KEY_SIZE
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            target = bytes.fromhex(key)
+        except ValueError:
+            return False
+        lo, hi = 0, self._count
+        base = len(self.MAGIC)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = base + mid * self.KEY_SIZE
+            probe = self._map[start:start + self.KEY_SIZE]
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                return True
+        return False
+
+    @staticmethod
+    def build(cache_dir: str, path: str) -> int:
+        """Scans cache_dir for non-empty <sha256>.mp3 files and writes the index atomically."""
+        keys = []
+        if os.path.isdir(cache_dir):
+            for entry in os.scandir(cache_dir):
+                stem, ext = os.path.splitext(entry.name)
+                if ext != ".mp3" or len(stem) != AudioCacheIndex.KEY_SIZE * 2:
+                    continue
+                try:
+                    if entry.stat().st_size > 0:
+                        keys.append(bytes.fromhex(stem))
+                except (OSError, ValueError):
+                    continue
+        keys.sort()
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(AudioCacheIndex.MAGIC)
+            f.write(b"".join(keys))
+        os.replace(tmp_path, path)
+        return len(keys)
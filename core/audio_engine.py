@@ -4,13 +4,13 @@ import threading
 import queue
 import time
 import os
+import itertools
 from typing import Optional, List, Any
 from core.config import GlobalConfig
 from core.audio_cache import AudioCache
-from core.elevenlabs_backend import ElevenLabsBackend
-from core.local_tts_backend import LocalTTSBackend
 from core.audio_models import AudioJob, AudioEvent, AudioBackendBase
 from core.sfx_library import SFXLibrary
+from core.audio_trace import AudioLatencyTracer
 
 class MockAudioBackend(AudioBackendBase):
     def prepare(self, job: AudioJob, cache_path: Optional[str] = None) -> Optional[str]:
@@ -34,19 +34,28 @@ class AudioEngine:
         self.cache = AudioCache(config)
         self.sfx_library = SFXLibrary(config)
         
-        # Select Backend
-        if self.config.AUDIO_BACKEND == "elevenlabs":
-            self.backend = ElevenLabsBackend(config)
-        elif self.config.AUDIO_BACKEND == "local":
-            self.backend = LocalTTSBackend(config)
-        else:
-            self.backend = MockAudioBackend()
+        # Backend is created by the worker thread (see _create_backend),
+        # so its imports never delay the first frame. Jobs queue up meanwhile.
+        self.backend: Optional[AudioBackendBase] = None
+
+        # Latency tracing (histograms are only touched on the main thread)
+        self.tracer = AudioLatencyTracer()
+        self._trace_ids = itertools.count(1)
         
         self.is_running = True
         self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
         self.worker_thread.start()
 
     def enqueue(self, job: AudioJob):
+        # Phrase mode: each sentence is its own job (and cache entry), played back to back
+        for part in self.cache.phrase_jobs(job):
+            self.enqueue_split(part)
+
+    def enqueue_split(self, job: AudioJob):
+        """Queues a job as is; for jobs already split by AudioCache.phrase_jobs."""
+        if job is not None:
+            job.trace_id = next(self._trace_ids)
+            job.trace["enqueued"] = time.perf_counter()
         self.job_queue.put(job)
 
     def poll_events(self) -> List[AudioEvent]:
@@ -56,20 +65,53 @@ class AudioEngine:
                 events.append(self.event_queue.get_nowait())
         except queue.Empty:
             pass
+
+        now = time.perf_counter()
+        for event in events:
+            if event.type == "STARTED":
+                continue
+            event.job.trace.setdefault("polled", now)
+            # AUDIO_READY traces close after playback decode (see complete_trace)
+            if event.type != "AUDIO_READY":
+                self.tracer.finish(event.job)
         return events
 
+    def complete_trace(self, job: AudioJob):
+        """Main thread: call after AudioPlayer has decoded/started the job's audio."""
+        self.tracer.finish(job)
+
+    def latency_stats(self) -> dict:
+        return self.tracer.stats()
+
     def shutdown(self):
         print("[AudioEngine] Shutting down...")
         self.enqueue(None)
         self.worker_thread.join(timeout=2.0)
         self.is_running = False
 
+    def _create_backend(self) -> AudioBackendBase:
+        """Imports and builds only the backend selected by AUDIO_BACKEND."""
+        if self.config.AUDIO_BACKEND == "elevenlabs":
+            from core.elevenlabs_backend import ElevenLabsBackend
+            return ElevenLabsBackend(self.config)
+        elif self.config.AUDIO_BACKEND == "local":
+            from core.local_tts_backend import LocalTTSBackend
+            return LocalTTSBackend(self.config)
+        return MockAudioBackend()
+
     def _worker_loop(self):
+        try:
+            self.backend = self._create_backend()
+        except Exception as e:
+            print(f"[AudioEngine] Backend Init Error: {e}. Falling back to mock.")
+            self.backend = MockAudioBackend()
+
         while self.is_running:
             try:
                 job = self.job_queue.get()
                 if job is None: break
 
+                job.trace["dequeued"] = time.perf_counter()
                 self.event_queue.put(AudioEvent("STARTED", job))
                 
                 try:
@@ -79,21 +121,31 @@ class AudioEngine:
                     if job.kind == "sfx":
                         # SFX are local files, no generation needed
                         result_path = self.sfx_library.get_path(job.sfx_id)
+                        job.cache_hit = bool(result_path)
+                        job.trace["cache_checked"] = time.perf_counter()
                         if not result_path:
                             # Log warning but don't crash
                             print(f"[AudioEngine] SFX Missing: {job.sfx_id}")
                     
                     # --- HANDLING TTS ---
                     elif job.kind == "tts" and job.text:
-                        cache_key = self.cache.get_key(self.config.AUDIO_BACKEND, job)
-                        if self.cache.has(cache_key):
-                            result_path = self.cache.get_filepath(cache_key)
+                        cache_keys = self.cache.candidate_keys(self.config.AUDIO_BACKEND, job)
+                        for cache_key in cache_keys:
+                            if self.cache.has(cache_key):
+                                result_path = self.cache.get_filepath(cache_key)
+                                job.cache_hit = True
+                                break
+                        job.trace["cache_checked"] = time.perf_counter()
                         
                         if not result_path:
-                            target_path = self.cache.get_filepath(cache_key) if cache_key else None
+                            # Synthesize the normalized text, stored under its key
+                            job.text = self.cache.tts_text(job.text)
+                            target_path = self.cache.get_filepath(cache_keys[0])
                             result_path = self.backend.prepare(job, cache_path=target_path)
+                            job.trace["synthesized"] = time.perf_counter()
                     
                     # --- RESULT ---
+                    job.trace["posted"] = time.perf_counter()
                     if result_path:
                         self.event_queue.put(AudioEvent("AUDIO_READY", job, data=result_path))
                     else:
@@ -106,4 +158,15 @@ class AudioEngine:
                 self.job_queue.task_done()
                 
             except Exception as e:
-                print(f"[AudioEngine] Critical Worker Error: {e}")
\ No newline at end of file
+                print(f"[AudioEngine] Critical Worker Error: {e}")
+
+class NullAudioEngine:
+    """Drop-in AudioEngine that discards jobs (headless replay, load testing)."""
+    def enqueue(self, job: AudioJob):
+        pass
+
+    def poll_events(self) -> List[AudioEvent]:
+        return []
+
+    def shutdown(self):
+        pass
@@ -2,7 +2,7 @@
 
 import time
 from dataclasses import dataclass, field
-from typing import Optional, Any
+from typing import Optional, Any, Dict
 
 @dataclass
 class AudioJob:
@@ -17,6 +17,14 @@ class AudioJob:
     
     data: Any = None 
 
+    # Phrase-segmented lines (TTS_PHRASE_SEGMENTS): sentence index; > 0 plays after the previous one
+    segment: int = 0
+
+    # Latency tracing: stage name -> time.perf_counter() (see AudioLatencyTracer)
+    trace_id: int = 0
+    cache_hit: bool = False
+    trace: Dict[str, float] = field(default_factory=lambda: {"created": time.perf_counter()})
+
 @dataclass
 class AudioEvent:
     """Feedback sent from Worker -> Main Thread."""
@@ -2,12 +2,42 @@
 
 import pygame
 import os
+import random
+import time
+from collections import deque
 from core.config import GlobalConfig
+from core.sfx_bank import SFXBank, load_sounds
 
 class AudioPlayer:
-    def __init__(self, config: GlobalConfig):
+    CLICK_LATE_S = 0.1
+
+    def __init__(self, config: GlobalConfig, defer_init: bool = False):
         self.config = config
-        
+        self.voice_channel = None
+        self.sfx_channel = None
+        # Decoded phrase segments waiting for the voice channel (see update())
+        self.voice_queue = []
+        # sfx_id -> Sound sliced from the SFX bank (see load_sfx_bank())
+        self.sfx_sounds = {}
+
+        # Typewriter clicks (see queue_typewriter() / play_typewriter())
+        self.typewriter_channels = []
+        self._next_click_channel = 0
+        self._click_queue = deque()  # (reveal time in game seconds, sfx_id)
+        self._last_click = None
+        self._click_interval = 1.0 / max(1, config.TYPEWRITER_SFX_MAX_CPS)
+        self._click_rng = random.Random()  # volume jitter only; never touches game RNG
+        self.clicks_played = 0
+        self.clicks_dropped = 0
+
+        # Deferred mode: plays requested before init_mixer() are held, then started by it
+        self._held_plays = [] if defer_init else None
+        if not defer_init:
+            self.init_mixer()
+
+    def init_mixer(self):
+        """Opens the mixer device and starts any plays held until now. Main thread only."""
+        held, self._held_plays = self._held_plays or [], None
         try:
             pygame.mixer.init(
                 frequency=self.config.AUDIO_FREQ,
@@ -17,23 +47,60 @@ class AudioPlayer:
             )
             self.voice_channel = pygame.mixer.Channel(0)
             self.sfx_channel = pygame.mixer.Channel(1)
+            # Reserved so nothing else (find_channel, Sound.play) lands on them
+            first = 2
+            count = self.config.TYPEWRITER_SFX_CHANNELS
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), first + count))
+            pygame.mixer.set_reserved(first + count)
+            self.typewriter_channels = [pygame.mixer.Channel(first + i) for i in range(count)]
         except pygame.error as e:
             print(f"[AudioPlayer] Init Failed: {e}")
             self.voice_channel = None
             self.sfx_channel = None
+            self.typewriter_channels = []
+        for play, args in held:
+            play(*args)
+
+    @property
+    def holding_plays(self) -> bool:
+        """True until init_mixer(): plays requested now start (and decode) only then."""
+        return self._held_plays is not None
 
-    def play_voice(self, filepath: str):
+    def play_voice(self, filepath: str, trace: dict = None, queued: bool = False):
+        """Plays a voice line, interrupting the current one; queued=True (later phrase segments) plays it after."""
+        if self._held_plays is not None:
+            self._held_plays.append((self.play_voice, (filepath, trace, queued)))
+            return
         if not self.voice_channel: return
         if not os.path.exists(filepath): return
         try:
             sound = pygame.mixer.Sound(filepath)
-            self.voice_channel.play(sound)
+            if trace is not None:
+                trace["decoded"] = time.perf_counter()
+            if queued and (self.voice_channel.get_busy() or self.voice_queue):
+                self.voice_queue.append(sound)
+                self.update()
+            else:
+                self.voice_queue.clear()
+                self.voice_channel.play(sound)
         except pygame.error as e:
             print(f"[AudioPlayer] Voice Error: {e}")
 
+    def update(self):
+        """Main thread, once per frame: hands the next queued segment to the channel's one-slot queue."""
+        if not self.voice_channel or not self.voice_queue:
+            return
+        if not self.voice_channel.get_busy():
+            self.voice_channel.play(self.voice_queue.pop(0))
+        elif self.voice_channel.get_queue() is None:
+            self.voice_channel.queue(self.voice_queue.pop(0))
+
     # --- NEW METHOD ---
-    def play_sfx(self, filepath: str):
+    def play_sfx(self, filepath: str, trace: dict = None):
         """Plays sound effect on secondary channel (mixes with voice)."""
+        if self._held_plays is not None:
+            self._held_plays.append((self.play_sfx, (filepath, trace)))
+            return
         if not self.sfx_channel: return
         if not os.path.exists(filepath):
             print(f"[AudioPlayer] SFX File not found: {filepath}")
@@ -41,15 +108,77 @@ class AudioPlayer:
             
         try:
             sound = pygame.mixer.Sound(filepath)
+            if trace is not None:
+                trace["decoded"] = time.perf_counter()
             self.sfx_channel.play(sound)
         except pygame.error as e:
             print(f"[AudioPlayer] SFX Error: {e}")
 
+    def load_sfx_bank(self) -> int:
+        """
+        Main thread, after init_mixer(): rebuilds the SFX bank if SFX_DIR or
+        the mixer format changed, then slices it into Sounds once.
+        """
+        if not self.sfx_channel:
+            return 0
+        path = self.config.SFX_BANK_PATH
+        try:
+            # One read when the bank is current; a rebuild reads back what it wrote
+            bank = SFXBank.open_current(path, self.config.SFX_DIR, pygame.mixer.get_init())
+            if bank is None:
+                count = SFXBank.build(self.config, path)
+                print(f"[AudioPlayer] SFX bank rebuilt: {count} files -> {path}")
+                bank = SFXBank(path)
+            self.sfx_sounds = load_sounds(bank, lambda pcm: pygame.mixer.Sound(buffer=pcm))
+        except (OSError, ValueError, pygame.error) as e:
+            print(f"[AudioPlayer] SFX bank unavailable ({e}), using files")
+            self.sfx_sounds = {}
+        return len(self.sfx_sounds)
+
+    def trigger_sfx(self, sfx_id: str) -> bool:
+        """Plays a banked effect immediately; False if it is not in the bank."""
+        sound = self.sfx_sounds.get(sfx_id)
+        if sound is None or not self.sfx_channel:
+            return False
+        self.sfx_channel.play(sound)
+        return True
+
+    def queue_typewriter(self, sfx_id: str, reveal_times):
+        """Clicks at SceneRunner reveal times (game seconds, SceneRunner.clock_s); played by play_typewriter()."""
+        if sfx_id in self.sfx_sounds and self.typewriter_channels:
+            self._click_queue.extend((t, sfx_id) for t in reveal_times)
+
+    def play_typewriter(self, now_s: float):
+        """
+        Main thread, once per frame: plays the queued clicks revealed by now_s
+        (game time as drawn). The rate cap is applied to reveal times, not
+        frame times, so a steady line up to TYPEWRITER_SFX_MAX_CPS keeps every
+        click. Clicks more than CLICK_LATE_S behind (after a stall) are
+        dropped. Reserved channels are reused round-robin, cutting off
+        whatever click the next one still plays.
+        """
+        queue = self._click_queue
+        while queue and queue[0][0] <= now_s:
+            reveal_s, sfx_id = queue.popleft()
+            too_soon = self._last_click is not None and 0 <= reveal_s - self._last_click < self._click_interval - 1e-6
+            if too_soon or now_s - reveal_s > self.CLICK_LATE_S:
+                self.clicks_dropped += 1
+                continue
+            self._last_click = reveal_s
+            channel = self.typewriter_channels[self._next_click_channel]
+            self._next_click_channel = (self._next_click_channel + 1) % len(self.typewriter_channels)
+            channel.set_volume(0.7 + 0.3 * self._click_rng.random())
+            channel.play(self.sfx_sounds[sfx_id])
+            self.clicks_played += 1
+
     def is_playing(self) -> bool:
         if self.voice_channel:
             return self.voice_channel.get_busy()
         return False
         
     def stop_all(self):
+        self.voice_queue.clear()
+        self._click_queue.clear()
         if self.voice_channel: self.voice_channel.stop()
-        if self.sfx_channel: self.sfx_channel.stop()
\ No newline at end of file
+        if self.sfx_channel: self.sfx_channel.stop()
+        for channel in self.typewriter_channels: channel.stop()
\ No newline at end of file
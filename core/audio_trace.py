@@ -0,0 +1,111 @@
+# core/audio_trace.py
+
+import bisect
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+class LatencyHistogram:
+    """Log-spaced millisecond buckets. Percentiles are bucket upper bounds."""
+    BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)  # last bucket = overflow
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.buckets[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return self.BOUNDS_MS[i] if i < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms,
+        }
+
+class AudioLatencyTracer:
+    """
+    Aggregates per-stage latency of AudioJobs, split by cache hit/miss.
+
+    Jobs carry monotonic timestamps in job.trace (see AudioJob). Stamps are
+    written by whichever thread owns the job at that moment; the queues hand
+    ownership over, so no locking is needed. finish() runs on the main thread.
+    """
+    # (stage name, start stamp, end stamp, outcome it applies to or None for both)
+    STAGES: List[Tuple[str, str, str, Optional[str]]] = [
+        ("enqueue",     "created",       "enqueued",      None),
+        ("queue_wait",  "enqueued",      "dequeued",      None),
+        ("cache_check", "dequeued",      "cache_checked", None),
+        ("synthesis",   "cache_checked", "synthesized",   "miss"),
+        ("post",        "cache_checked", "posted",        "hit"),
+        ("post",        "synthesized",   "posted",        "miss"),  # not counting synthesis twice
+        ("event_wait",  "posted",        "polled",        None),
+        ("decode",      "polled",        "decoded",       None),
+        ("total",       "created",       "done",          None),
+    ]
+
+    def __init__(self, recent_size: int = 32):
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.recent = deque(maxlen=recent_size)
+        self.finished = 0
+
+    def finish(self, job):
+        """Closes a job's trace and folds its stage timings into the histograms."""
+        trace = job.trace
+        if "done" in trace:
+            return
+        trace["done"] = max(trace.values())
+
+        # Synthesis is only meaningful on a miss; "post" follows whatever came last
+        outcome = "hit" if job.cache_hit else "miss"
+        stages = {}
+        for name, start, end, applies_to in self.STAGES:
+            if applies_to in (None, outcome) and start in trace and end in trace:
+                ms = (trace[end] - trace[start]) * 1000.0
+                stages[name] = ms
+                key = (name, outcome)
+                if key not in self.histograms:
+                    self.histograms[key] = LatencyHistogram()
+                self.histograms[key].add(ms)
+
+        self.finished += 1
+        self.recent.append({"trace_id": job.trace_id, "kind": job.kind, "outcome": outcome, "stages_ms": stages})
+
+    def stats(self) -> dict:
+        """{"hit": {stage: {...}}, "miss": {stage: {...}}, "finished": n}"""
+        result: dict = {"finished": self.finished, "hit": {}, "miss": {}}
+        for name in dict.fromkeys(name for name, _, _, _ in self.STAGES):
+            for outcome in ("hit", "miss"):
+                hist = self.histograms.get((name, outcome))
+                if hist:
+                    result[outcome][name] = hist.to_dict()
+        return result
+
+    def report_lines(self) -> List[str]:
+        """Readable table for the debug console."""
+        s = self.stats()
+        lines = [f"AUDIO LATENCY ({s['finished']} jobs traced)"]
+        for outcome in ("hit", "miss"):
+            if not s[outcome]:
+                continue
+            lines.append(f"-- cache {outcome} --")
+            for name, h in s[outcome].items():
+                lines.append(f"{name:<12} n={h['count']:<5} p50<={h['p50_ms']:g}ms p95<={h['p95_ms']:g}ms max={h['max_ms']:.1f}ms")
+        return lines
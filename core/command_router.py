@@ -0,0 +1,135 @@
+# core/command_router.py
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_AMBIGUOUS = object()
+
+class _Node:
+    __slots__ = ("children", "unique")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Canonical command every prefix-matchable word below this node
+        # resolves to; _AMBIGUOUS once two different commands share it.
+        self.unique: Any = None
+
+@dataclass(frozen=True)
+class CommandMatch:
+    name: str       # canonical command (aliases resolve to their command)
+    target: Any     # whatever was registered with it (handler, action, ...)
+    exact: bool     # False = completed from an unambiguous prefix
+
+class CommandTrie:
+    """
+    Command names and aliases of one context (global, scene, combat).
+    Built once; lookups cost O(len(word)) however many commands exist.
+    Exact names and aliases always match. A shorter input matches when
+    every registered word starting with it belongs to the same command.
+    Commands registered with prefix=False (e.g. quit) need the full word
+    and make any prefix they share ambiguous.
+    """
+    def __init__(self, min_prefix: int = 1):
+        self.min_prefix = min_prefix
+        self.root = _Node()
+        self.words: Dict[str, Tuple[str, Any]] = {}  # word -> (canonical, target)
+
+    def add(self, name: str, target: Any = None, aliases: Iterable[str] = (), prefix: bool = True):
+        name = name.lower()
+        for word in [name] + [a.lower() for a in aliases]:
+            self.words[word] = (name, target)
+            value = name if prefix else _AMBIGUOUS
+            node = self.root
+            for char in word:
+                node = node.children.setdefault(char, _Node())
+                if node.unique is None:
+                    node.unique = value
+                elif node.unique != value:
+                    node.unique = _AMBIGUOUS
+        return self
+
+    def __contains__(self, word: str) -> bool:
+        return word.lower() in self.words
+
+    def _node(self, prefix: str) -> Optional[_Node]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def lookup_exact(self, word: str) -> Optional[CommandMatch]:
+        hit = self.words.get(word.lower())
+        return CommandMatch(hit[0], hit[1], True) if hit else None
+
+    def lookup_prefix(self, word: str) -> Optional[CommandMatch]:
+        word = word.lower()
+        if len(word) < self.min_prefix:
+            return None
+        node = self._node(word)
+        if node is None or node.unique is None or node.unique is _AMBIGUOUS:
+            return None
+        return CommandMatch(node.unique, self.words[node.unique][1], False)
+
+    def lookup(self, word: str) -> Optional[CommandMatch]:
+        return self.lookup_exact(word) or self.lookup_prefix(word)
+
+    def complete(self, prefix: str, limit: int = 32) -> List[str]:
+        """Registered words starting with prefix (sorted, at most limit)."""
+        prefix = prefix.lower()
+        node = self._node(prefix)
+        if node is None:
+            return []
+        found = []
+        stack = [(node, prefix)]
+        while stack and len(found) < limit:
+            node, word = stack.pop()
+            if word in self.words:
+                found.append(word)
+            for char in sorted(node.children, reverse=True):
+                stack.append((node.children[char], word + char))
+        return sorted(found)
+
+@dataclass(frozen=True)
+class Route:
+    context: str
+    match: CommandMatch
+    args: List[str]
+
+class CommandRouter:
+    """
+    Resolves typed input against the global commands and whichever context
+    is active (scene prompt or combat), supplied by `active_context`.
+    Order: global exact, context exact, context prefix, global prefix, so
+    meta commands always work by full name and a scene's own words win
+    over abbreviations of meta commands.
+    """
+    def __init__(self, global_commands: CommandTrie,
+                 active_context: Callable[[], Tuple[str, Optional[CommandTrie]]] = None):
+        self.global_commands = global_commands
+        self.active_context = active_context or (lambda: ("none", None))
+
+    def resolve(self, text: str) -> Optional[Route]:
+        parts = text.strip().split()
+        if not parts:
+            return None
+        word, args = parts[0], parts[1:]
+        name, trie = self.active_context()
+
+        for context, lookup in (("global", self.global_commands.lookup_exact),
+                                (name, trie.lookup_exact if trie else None),
+                                (name, trie.lookup_prefix if trie else None),
+                                ("global", self.global_commands.lookup_prefix)):
+            match = lookup(word) if lookup else None
+            if match:
+                return Route(context, match, args)
+        return None
+
+    def complete(self, text: str) -> List[str]:
+        """Tab completion for the first word: context words first, then global."""
+        if " " in text.strip():
+            return []
+        _, trie = self.active_context()
+        words = trie.complete(text) if trie else []
+        return words + [w for w in self.global_commands.complete(text) if w not in words]
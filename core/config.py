@@ -2,7 +2,7 @@
 
 import os
 from dataclasses import dataclass, field
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 
 @dataclass(frozen=True)
 class GlobalConfig:
@@ -12,7 +12,14 @@ class GlobalConfig:
     # Display
     WIDTH: int = 1024
     HEIGHT: int = 768
-    FPS: int = 60
+    FPS: int = 60                   # render rate cap
+    IDLE_FPS: int = 15              # render rate while waiting at a prompt with no input
+    IDLE_AFTER_MS: int = 2000
+
+    # Simulation: scene timers, typewriter and combat advance in fixed ticks,
+    # independent of the render rate
+    SIM_TICK_MS: int = 10
+    MAX_SIM_TICKS_PER_FRAME: int = 25  # longer stalls are dropped, not replayed
     
     # Colors (R, G, B)
     COLORS: Dict[str, Tuple[int, int, int]] = field(default_factory=lambda: {
@@ -54,9 +61,18 @@ class GlobalConfig:
     # Options: "mock", "elevenlabs", "local"
     AUDIO_BACKEND: str = "elevenlabs" 
     AUDIO_CACHE_DIR: str = "content/audio_cache"
+    # Cache keys use normalized text (whitespace, typography, shouted words), see core/tts_text.py
+    TTS_NORMALIZE: bool = True
+    # Split voice lines into sentences, cached and synthesized separately, played back to back
+    TTS_PHRASE_SEGMENTS: bool = False
 
     # NEW: SFX Directory
     SFX_DIR: str = "content/sfx"
+    SFX_BANK_PATH: str = "content/sfx_bank.bin"  # SFX_DIR packed as PCM, rebuilt when stale
+    # Typewriter clicks (typewrite "sfx"): reserved mixer channels, round-robin with
+    # stealing; clicks revealed closer together than 1 / MAX_CPS are dropped
+    TYPEWRITER_SFX_CHANNELS: int = 4
+    TYPEWRITER_SFX_MAX_CPS: int = 60
     
     # Mixer Settings
     AUDIO_FREQ: int = 44100
@@ -76,5 +92,53 @@ class GlobalConfig:
         "narrator": "8JVbfL6oEdmuxKn5DK2C",
     })
 
-    MAX_HISTORY_LINES: int = 100
+    # Startup
+    # Resolved font file is cached here so later runs skip system font enumeration
+    FONT_CACHE_PATH: str = "content/font_cache.json"
+    STARTUP_PROFILING: bool = False      # print the time-to-first-frame breakdown
+
+    # Headless Host (python -m server.session_host)
+    HOST_ADDRESS: str = "127.0.0.1"
+    HOST_PORT: int = 7777
+    HOST_TICK_HZ: int = 30               # scene steps per second per session
+    HOST_MAX_SESSIONS: int = 5000
+    HOST_MAX_WRITE_BUFFER: int = 256 * 1024  # bytes queued to a client before it is dropped
+
+    # Sharded Host (python -m server.shard_supervisor)
+    SHARD_WORKERS: int = 0               # 0 = one worker process per CPU core
+    SHARD_REBALANCE_S: float = 5.0       # how often sessions move off the busiest worker
+    SCENE_CORPUS_PATH: str = "content/scene_corpus.bin"       # compiled scenes, mmap'd by workers
+    AUDIO_INDEX_PATH: str = "content/audio_cache/index.bin"   # sorted cache keys, mmap'd by workers
+
+    # Determinism / Replay
+    RNG_SEED: Optional[int] = None       # None = random seed per run (still recorded)
+    RECORD_SESSION_PATH: str = ""        # e.g. "session.rec.gz" to record this run
+
+    # Dev: reload content/scenes/*.json while the game runs (inotify, else polling)
+    DEV_HOT_RELOAD: bool = False
+    HOT_RELOAD_POLL_S: float = 0.25
+
+    # Frame Profiling (F3 toggles the overlay and enables profiling)
+    FRAME_PROFILING: bool = False
+    FRAME_PROFILE_WINDOW: int = 600      # frames kept for percentiles
+    FRAME_HITCH_FACTOR: float = 2.0      # hitch = frame longer than factor * target
+    FRAME_PROFILE_EXPORT: str = ""       # e.g. "frame_profile" -> .csv + .json on exit
+
+    # Saving
+    # Options: "json" (readable, fastest to load), "binary" (deflated JSON: ~4x smaller, slightly slower)
+    SAVE_CODEC: str = "json"
+    AUTOSAVE_ENABLED: bool = True
+    AUTOSAVE_SLOT: str = "autosave"
+    # Journal records appended before the autosave is compacted into a full snapshot
+    SAVE_JOURNAL_COMPACT_EVERY: int = 64
+    # Keyed changes remembered by GameState for delta autosaves
+    CHANGE_LOG_LIMIT: int = 4096
+
+    # Instant steps (print, set_flag, branch, ...) run back to back in one frame, up to this many
+    SCENE_STEP_BUDGET: int = 256
+
+    MAX_HISTORY_LINES: int = 100         # in-memory window; older entries go to the transcript
+    TRANSCRIPT_PATH: str = "content/transcript.log"  # full session log for scrollback ("" = window only)
+    SCROLL_WHEEL_LINES: int = 3          # wrapped lines per mouse wheel notch (PageUp/PageDown move a screen)
+    FIND_RESULT_LINES: int = 5           # matches listed by the find command (all of them can be stepped through)
     CURSOR_BLINK_RATE_MS: int = 500
\ No newline at end of file
@@ -0,0 +1,36 @@
+# core/fixed_timestep.py
+
+class FixedTimestep:
+    """
+    Accumulator that turns variable frame times into whole simulation
+    ticks of tick_ms. Scene timers and typewriter pacing then depend only
+    on elapsed time, never on the render rate, and a hitch is caught up
+    with extra ticks instead of one oversized dt. `alpha` is how far the
+    next tick has already progressed (0..1), for interpolating what is
+    drawn between ticks.
+    """
+    def __init__(self, tick_ms: int, max_ticks_per_frame: int):
+        self.tick_ms = tick_ms
+        # Longer stalls (window drag, breakpoint) are dropped rather than
+        # replayed in a burst that would itself stall the next frame
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.dropped_ms = 0.0
+
+    def advance(self, frame_ms: float) -> int:
+        """Adds one frame's time; returns how many ticks to run now."""
+        self.accumulator += frame_ms
+        count = int(self.accumulator // self.tick_ms)
+        if count > self.max_ticks_per_frame:
+            self.dropped_ms += (count - self.max_ticks_per_frame) * self.tick_ms
+            count = self.max_ticks_per_frame
+            self.accumulator %= self.tick_ms
+        else:
+            self.accumulator -= count * self.tick_ms
+        self.ticks += count
+        return count
+
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.tick_ms
@@ -0,0 +1,151 @@
+# core/frame_profiler.py
+
+import csv
+import json
+import time
+from typing import Dict, List, Optional
+
+class SpanRing:
+    """Fixed-size ring buffer of millisecond samples for one span."""
+    def __init__(self, size: int):
+        self.samples: List[float] = [0.0] * size
+        self.index = 0
+        self.count = 0
+
+    def add(self, ms: float):
+        self.samples[self.index] = ms
+        self.index = (self.index + 1) % len(self.samples)
+        if self.count < len(self.samples):
+            self.count += 1
+
+    def ordered(self) -> List[float]:
+        """Samples oldest -> newest."""
+        if self.count < len(self.samples):
+            return self.samples[:self.count]
+        return self.samples[self.index:] + self.samples[:self.index]
+
+    def percentiles(self, points=(50, 95, 99)) -> Dict[str, float]:
+        if not self.count:
+            return {f"p{p}": 0.0 for p in points}
+        data = sorted(self.samples[:self.count])
+        last = len(data) - 1
+        return {f"p{p}": data[min(last, int(round(p / 100.0 * last)))] for p in points}
+
+class FrameProfiler:
+    """
+    Named timing spans per frame (input, scene, audio, render, flip ...).
+
+    Usage per frame:
+        begin_frame() -> lap("input") -> lap("scene") -> ... -> lap("flip")
+    Each lap() records the time since the previous lap; the next
+    begin_frame() commits the frame, including the clock.tick() wait.
+    Pass begin_frame() the rate that tick() waited for when it changes
+    (idle throttling), so hitches are judged against that frame's target.
+    When disabled, every call returns after a single attribute check.
+    """
+    def __init__(self, target_fps: int, enabled: bool = False, window: int = 600, hitch_factor: float = 2.0):
+        self.enabled = enabled
+        self.window = window
+        self.hitch_factor = hitch_factor
+        self.target_frame_ms = 1000.0 / max(1, target_fps)
+        self.hitch_threshold_ms = self.target_frame_ms * hitch_factor
+
+        self.spans: Dict[str, SpanRing] = {}
+        self.frame_ring = SpanRing(window)   # begin -> next begin (includes tick wait)
+        self.work_ring = SpanRing(window)    # sum of spans
+
+        self.frame_count = 0
+        self.hitch_count = 0
+        self.last_hitch: Optional[dict] = None
+
+        self._frame_start = 0.0
+        self._last_lap = 0.0
+        self._current: Dict[str, float] = {}
+
+    def begin_frame(self, target_fps: int = None):
+        """
+        Closes the previous frame (if any) and starts timing a new one.
+        target_fps is the rate the tick() just before this call waited for;
+        None keeps the constructor's rate.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start:
+            threshold_ms = self.hitch_threshold_ms
+            if target_fps:
+                threshold_ms = 1000.0 / target_fps * self.hitch_factor
+            self._commit_frame((now - self._frame_start) * 1000.0, threshold_ms)
+        self._frame_start = now
+        self._last_lap = now
+        self._current = {}
+
+    def lap(self, name: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        ms = (now - self._last_lap) * 1000.0
+        self._last_lap = now
+        self._current[name] = self._current.get(name, 0.0) + ms
+
+    def _commit_frame(self, frame_ms: float, threshold_ms: float):
+        """Records one finished frame. All rings stay aligned frame-for-frame."""
+        work_ms = 0.0
+        for name, ms in self._current.items():
+            ring = self.spans.get(name)
+            if ring is None:
+                ring = self.spans[name] = SpanRing(self.window)
+            ring.add(ms)
+            work_ms += ms
+        self.work_ring.add(work_ms)
+        self.frame_ring.add(frame_ms)
+        self.frame_count += 1
+
+        if frame_ms > threshold_ms:
+            self.hitch_count += 1
+            self.last_hitch = {"frame": self.frame_count, "frame_ms": frame_ms, "threshold_ms": threshold_ms,
+                               "spans": dict(self._current)}
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        self._frame_start = 0.0  # don't count the disabled gap as a hitch
+
+    # --- Reporting ---
+
+    def summary(self) -> dict:
+        return {
+            "frames": self.frame_count,
+            "target_frame_ms": self.target_frame_ms,
+            "hitches": self.hitch_count,
+            "last_hitch": self.last_hitch,
+            "frame": self.frame_ring.percentiles(),
+            "work": self.work_ring.percentiles(),
+            "spans": {name: ring.percentiles() for name, ring in self.spans.items()},
+        }
+
+    def overlay_lines(self) -> List[str]:
+        """Short text block for the in-game overlay."""
+        s = self.summary()
+        lines = [
+            f"FRAME p50 {s['frame']['p50']:5.1f}  p95 {s['frame']['p95']:5.1f}  p99 {s['frame']['p99']:5.1f} ms",
+            f"WORK  p50 {s['work']['p50']:5.1f}  p95 {s['work']['p95']:5.1f}  p99 {s['work']['p99']:5.1f} ms",
+        ]
+        for name, p in s["spans"].items():
+            lines.append(f"{name:<6}p50 {p['p50']:5.2f}  p95 {p['p95']:5.2f}  p99 {p['p99']:5.2f}")
+        lines.append(f"HITCHES {s['hitches']} (> {self.hitch_factor:g}x target frame)")
+        return lines
+
+    def export_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_csv(self, path: str):
+        """One row per buffered frame: total interval, work, then each span."""
+        names = list(self.spans)
+        columns = [self.frame_ring.ordered(), self.work_ring.ordered()] + [self.spans[n].ordered() for n in names]
+        rows = min(len(c) for c in columns) if columns else 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame_ms", "work_ms"] + [f"{n}_ms" for n in names])
+            for i in range(rows):
+                writer.writerow([f"{c[len(c) - rows + i]:.3f}" for c in columns])
@@ -1,12 +1,20 @@
 # core/input_engine.py
 
+import os
 import pygame
 from core.config import GlobalConfig
 from core.models import GameState, UIState
+from core.search_index import InvertedIndex
 
 class InputEngine:
     def __init__(self, config: GlobalConfig):
         self.config = config
+        # Optional callable(text) -> list of completions for Tab (GameSession.complete_command)
+        self.completer = None
+
+        # Ctrl+R: command_history[i] is indexed as document i
+        self.command_index = InvertedIndex()
+        self._indexed_commands = 0
 
     def process_events(self, events: list[pygame.event.Event], game_state: GameState, ui_state: UIState) -> str | None:
         
@@ -17,15 +25,22 @@ class InputEngine:
         for event in events:
             # --- 1. Scrolling (Always allowed) ---
             if event.type == pygame.MOUSEWHEEL:
-                ui_state.scroll_offset += event.y  # y is +1 (up) or -1 (down)
+                ui_state.scroll_offset += event.y * self.config.SCROLL_WHEEL_LINES  # y is +1 (up) or -1 (down)
                 self._clamp_scroll(ui_state, game_state)
 
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_PAGEUP:
-                    ui_state.scroll_offset += 5
+                if event.key != pygame.K_TAB:
+                    ui_state.completion_hint = ""
+                if ui_state.search_active and input_allowed and self._handle_search_key(event, ui_state):
+                    continue
+
+                if event.key == pygame.K_F3:
+                    ui_state.perf_overlay_visible = not ui_state.perf_overlay_visible
+                elif event.key == pygame.K_PAGEUP:
+                    ui_state.scroll_offset += max(1, ui_state.page_lines - 1)
                     self._clamp_scroll(ui_state, game_state)
                 elif event.key == pygame.K_PAGEDOWN:
-                    ui_state.scroll_offset -= 5
+                    ui_state.scroll_offset -= max(1, ui_state.page_lines - 1)
                     self._clamp_scroll(ui_state, game_state)
                 
                 # --- 2. Command History (Only if input allowed) ---
@@ -33,6 +48,13 @@ class InputEngine:
                     self._cycle_history(ui_state, -1)
                 elif input_allowed and event.key == pygame.K_DOWN:
                     self._cycle_history(ui_state, 1)
+                elif input_allowed and event.key == pygame.K_TAB:
+                    self._complete(ui_state)
+                elif input_allowed and event.key == pygame.K_r and event.mod & pygame.KMOD_CTRL:
+                    ui_state.search_active = True
+                    ui_state.search_query = ""
+                    ui_state.search_skip = 0
+                    ui_state.search_saved_buffer = ui_state.input_buffer
 
                 # --- 3. Typing & Submission ---
                 elif input_allowed:
@@ -48,9 +70,8 @@ class InputEngine:
             ui_state.cursor_visible = not ui_state.cursor_visible
 
     def _clamp_scroll(self, ui_state: UIState, game_state: GameState):
-        """Keeps scroll offset within valid bounds (0 to history length)."""
-        max_scroll = max(0, len(game_state.history) - 1)
-        ui_state.scroll_offset = max(0, min(ui_state.scroll_offset, max_scroll))
+        """Keeps scroll offset within valid bounds (0 to the wrapped lines of the whole scrollback, as last laid out)."""
+        ui_state.scroll_offset = max(0, min(ui_state.scroll_offset, ui_state.scroll_max))
 
     def _cycle_history(self, ui_state: UIState, direction: int):
         """
@@ -78,6 +99,77 @@ class InputEngine:
         else:
             ui_state.input_buffer = ui_state.command_history[new_index]
 
+    def _complete(self, ui_state: UIState):
+        """
+        Tab: one candidate fills the word, several extend it to their common
+        prefix or get listed. The listing stays in UIState, not the history:
+        it isn't a session step, so recordings and state digests never see it.
+        """
+        if not self.completer:
+            return
+        text = ui_state.input_buffer.lstrip()
+        candidates = self.completer(text)
+        if not candidates:
+            return
+        if len(candidates) == 1:
+            ui_state.input_buffer = candidates[0] + " "
+        else:
+            common = os.path.commonprefix(candidates)
+            if len(common) > len(text):
+                ui_state.input_buffer = common
+            else:
+                ui_state.completion_hint = "  ".join(candidates)
+        ui_state.scroll_offset = 0
+
+    # --- Reverse-i-search ---
+
+    def _handle_search_key(self, event: pygame.event.Event, ui_state: UIState) -> bool:
+        """
+        Keys while Ctrl+R search is open. Returns True if consumed; any other
+        key (Enter, arrows, Tab) accepts the match and is handled normally.
+        """
+        if event.key == pygame.K_r and event.mod & pygame.KMOD_CTRL:
+            ui_state.search_skip += 1  # next older match
+            if not self._update_search(ui_state):
+                ui_state.search_skip -= 1
+        elif event.key == pygame.K_ESCAPE:
+            ui_state.search_active = False
+            ui_state.input_buffer = ui_state.search_saved_buffer
+        elif event.key == pygame.K_BACKSPACE:
+            ui_state.search_query = ui_state.search_query[:-1]
+            ui_state.search_skip = 0
+            self._update_search(ui_state)
+        elif len(event.unicode) > 0 and event.unicode.isprintable():
+            ui_state.search_query += event.unicode
+            ui_state.search_skip = 0
+            self._update_search(ui_state)
+        else:
+            ui_state.search_active = False
+            return False
+        return True
+
+    def _update_search(self, ui_state: UIState) -> bool:
+        """Puts the search_skip-th newest distinct matching command in the buffer; False if there is none."""
+        history = ui_state.command_history
+        while self._indexed_commands < len(history):
+            self.command_index.add(self._indexed_commands, history[self._indexed_commands])
+            self._indexed_commands += 1
+
+        if not ui_state.search_query.strip():
+            ui_state.input_buffer = ui_state.search_saved_buffer
+            return False
+        seen = set()
+        for index in self.command_index.search(ui_state.search_query):
+            command = history[index]
+            if command in seen:
+                continue
+            if len(seen) == ui_state.search_skip:
+                ui_state.input_buffer = command
+                ui_state.history_view_index = index
+                return True
+            seen.add(command)
+        return False
+
     def _handle_typing(self, event: pygame.event.Event, ui_state: UIState) -> str | None:
         if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
             command = ui_state.input_buffer.strip()
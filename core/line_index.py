@@ -0,0 +1,131 @@
+# core/line_index.py
+
+from array import array
+from typing import Callable, Tuple
+from core.models import GameState, LogEntry
+
+class FenwickTree:
+    """
+    Prefix sums over a growable list of non-negative ints. append, set,
+    prefix_sum and find are all O(log n), so one value can change (a line
+    being typed) without recomputing every sum after it.
+    """
+    def __init__(self):
+        self.values = array('q')
+        self.tree = array('q', [0])  # 1-based; tree[i] covers values (i - lowbit(i), i]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, value: int):
+        n = len(self.values) + 1
+        self.values.append(value)
+        self.tree.append(value + self.prefix_sum(n - 1) - self.prefix_sum(n - (n & -n)))
+
+    def set(self, index: int, value: int):
+        delta = value - self.values[index]
+        if not delta:
+            return
+        self.values[index] = value
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def truncate(self, count: int):
+        """Keeps the first `count` values; tree[i] only covers values up to i, so the rest stays valid."""
+        del self.values[count:]
+        del self.tree[count + 1:]
+
+    def prefix_sum(self, count: int) -> int:
+        """Sum of the first `count` values."""
+        total = 0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def total(self) -> int:
+        return self.prefix_sum(len(self.values))
+
+    def find(self, unit: int) -> Tuple[int, int]:
+        """(index, offset) of the value containing the unit-th unit (0-based), by binary lifting."""
+        pos = 0
+        step = 1 << len(self.values).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= unit:
+                pos = nxt
+                unit -= self.tree[nxt]
+            step >>= 1
+        return pos, unit
+
+class LineIndex:
+    """
+    Wrapped line count of every scrollback entry, kept in a FenwickTree so
+    the entry showing any screen line is found in O(log n). sync() measures
+    only entries appended since the last frame plus the newest few (a
+    typewriter line grows in place); a new wrap width re-measures, a
+    swapped history window (load) re-measures the window and cuts any
+    lines past its end, and a different GameState or transcript starts
+    over. Ids are scrollback positions plus
+    GameState.scrollback_dropped, so trimming the window without a
+    transcript does not shift them.
+    """
+    RECHECK_TAIL = 4
+    CHUNK = 4096  # entries read per scrollback_range() call while catching up
+
+    def __init__(self, measure: Callable[[LogEntry], int]):
+        self.measure = measure  # entry -> wrapped line count
+        self.width = None
+        self.tree = FenwickTree()
+        self._owner = None  # (GameState, transcript) the counts belong to
+        self._window = None
+        self._base = 0  # lines of dropped entries
+
+    def sync(self, game_state: GameState, width: int):
+        owner = (game_state, game_state.transcript)
+        other = self._owner is None or owner[0] is not self._owner[0] or owner[1] is not self._owner[1]
+        if width != self.width or other:
+            self.width = width
+            self._owner = owner
+            self._window = None
+            self.tree = FenwickTree()
+
+        dropped = game_state.scrollback_dropped
+        count = dropped + game_state.scrollback_len()
+        if len(self.tree) > count:
+            self.tree.truncate(count)  # a load dropped lines from after the save
+
+        # Re-measure entries that may have changed since they were counted
+        window_start = count - len(game_state.history)
+        if game_state.history is not self._window:
+            self._window = game_state.history
+            recheck_from = window_start
+        else:
+            recheck_from = max(window_start, count - self.RECHECK_TAIL)
+        for doc_id in range(max(dropped, recheck_from), len(self.tree)):
+            entry = game_state.history[doc_id - window_start]
+            self.tree.set(doc_id, self.measure(entry))
+
+        # Append the new ones (ids already dropped count as zero lines)
+        while len(self.tree) < min(dropped, count):
+            self.tree.append(0)
+        while len(self.tree) < count:
+            start = len(self.tree)
+            stop = min(count, start + self.CHUNK)
+            for entry in game_state.scrollback_range(start - dropped, stop - dropped):
+                self.tree.append(self.measure(entry))
+        self._base = self.tree.prefix_sum(dropped)
+
+    def total_lines(self) -> int:
+        return self.tree.total() - self._base
+
+    def lines_before(self, game_state: GameState, position: int) -> int:
+        """Wrapped lines of scrollback entries [0, position)."""
+        return self.tree.prefix_sum(game_state.scrollback_dropped + position) - self._base
+
+    def locate(self, game_state: GameState, line: int) -> Tuple[int, int]:
+        """(scrollback position, line within that entry) of the line-th wrapped line."""
+        doc_id, offset = self.tree.find(self._base + line)
+        return doc_id - game_state.scrollback_dropped, offset
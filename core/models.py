@@ -2,8 +2,10 @@
 
 from dataclasses import dataclass, field
 import time
-from typing import List, Dict, Any, Optional
+from types import MappingProxyType
+from typing import List, Any, Mapping, Optional, Tuple
 from core.config import GlobalConfig
+from core.state_store import GroupIndex, RangeIndex, StateStore
 
 @dataclass
 class LogEntry:
@@ -33,6 +35,7 @@ class LogEntry:
 @dataclass
 class CombatState:
     active: bool = False
+    enemy_id: str = ""   # key into content/combat/enemies.json ("" = default enemy)
     enemy_name: str = ""
     enemy_hp: int = 0
     enemy_max_hp: int = 0
@@ -41,6 +44,7 @@ class CombatState:
     def to_dict(self) -> dict:
         return {
             "active": self.active,
+            "enemy_id": self.enemy_id,
             "enemy_name": self.enemy_name,
             "enemy_hp": self.enemy_hp,
             "enemy_max_hp": self.enemy_max_hp,
@@ -49,6 +53,7 @@ class CombatState:
     
     def restore(self, data: dict):
         self.active = data.get("active", False)
+        self.enemy_id = data.get("enemy_id", "")
         self.enemy_name = data.get("enemy_name", "")
         self.enemy_hp = data.get("enemy_hp", 0)
         self.enemy_max_hp = data.get("enemy_max_hp", 0)
@@ -72,13 +77,38 @@ class UIState:
     typewriter_index: int = 0
     
     # --- NEW: Scroll & History ---
-    scroll_offset: int = 0  # Number of LogEntries to skip from the bottom
+    scroll_offset: int = 0  # Wrapped lines to skip from the bottom
+    # Written by RenderEngine each frame (it owns the line layout)
+    scroll_max: int = 0
+    page_lines: int = 5
+    scroll_to_entry: Optional[int] = None  # scrollback position to jump to on the next frame
+
+    # (entry, text) to draw instead of entry.text: the line being typed, interpolated between ticks
+    typing_preview: Optional[Tuple[LogEntry, str]] = None
     
     command_history: List[str] = field(default_factory=list)
     history_view_index: int = 0 # Tracks position in history while cycling
 
+    # Reverse-i-search (Ctrl+R) over command_history
+    search_active: bool = False
+    search_query: str = ""
+    search_skip: int = 0        # Ctrl+R presses past the newest match
+    search_saved_buffer: str = ""  # restored on Escape
+
+    # Tab candidates listed above the prompt; UI-only, so replays never see it
+    completion_hint: str = ""
+
+    # --- Debug Overlay ---
+    perf_overlay_visible: bool = False
+    perf_overlay_lines: List[str] = field(default_factory=list)
+
 # --- GAME STATE ---
 class GameState:
+    # Version of the to_dict() layout. Bump it and add a _migrate_vN step
+    # whenever the saved shape changes.
+    SAVE_SCHEMA_VERSION = 2
+    RESTORE_SCAN_CHUNK = 4096  # scrollback entries read at a time while lining up a loaded window
+
     def __init__(self, config: GlobalConfig):
         self.config = config
         
@@ -86,71 +116,297 @@ class GameState:
         self.mode: str = "terminal" # "terminal", "cutscene", "combat"
         self.current_scene_id: str = "boot_sequence"
         self.scene_cursor: int = 0
-        self.history: List[LogEntry] = []
+        self.history: List[LogEntry] = []  # in-memory window (MAX_HISTORY_LINES)
+
+        # Optional core.transcript.Transcript: entries leaving the window are
+        # appended there, so scrollback covers the whole session.
+        self.transcript = None
+        # Entries discarded without a transcript; keeps search ids stable
+        self.scrollback_dropped: int = 0
         
         # RPG Stats (NEW)
         self.tier: int = 1
         self.hp: int = 20
         self.max_hp: int = 20
-        self.flags: Dict[str, Any] = {}
-        self.inventory: Dict[str, int] = {} # item_id -> quantity
-        self.quests: Dict[str, str] = {}    # quest_id -> status ("active", "completed")
+        # flags / inventory (item_id -> quantity) / quests (quest_id -> status)
+        # live in an observable store; write through the helpers below so
+        # subscribers, indexes and the change log stay in step.
+        self.store = StateStore(("flag", "item", "quest"), config.CHANGE_LOG_LIMIT)
+        self.store.add_index("quests_by_status", "quest", GroupIndex())
+        self.store.add_index("items_by_qty", "item", RangeIndex())
+        self._views = {kind: MappingProxyType(values) for kind, values in self.store.data.items()}
         
         self.combat: CombatState = CombatState()
 
+        # --- Change Tracking (feeds delta autosaves) ---
+        # history_seq counts every entry ever appended; the last entry in
+        # history always has seq == history_seq. Keyed changes are versioned
+        # by the store (change_version / change_log).
+        self.history_seq: int = 0
+
+    # Read-only views; mutate through set_flag/add_item/set_quest
+    @property
+    def flags(self) -> Mapping[str, Any]:
+        return self._views["flag"]
+
+    @property
+    def inventory(self) -> Mapping[str, int]:
+        return self._views["item"]
+
+    @property
+    def quests(self) -> Mapping[str, str]:
+        return self._views["quest"]
+
+    @property
+    def change_version(self) -> int:
+        return self.store.version
+
+    @property
+    def change_log(self) -> List[Tuple[int, str, str]]:
+        return self.store.log
+
+    def reset_change_log(self):
+        self.store.reset_log()
+
     def append_history(self, text: str, channel: str = "terminal", style: str = None):
-        entry = LogEntry(text=text, channel=channel, style=style)
+        self.append_entry(LogEntry(text=text, channel=channel, style=style))
+
+    def append_entry(self, entry: LogEntry):
+        """Appends a prebuilt entry (e.g. a typewriter line filled in later)."""
         self.history.append(entry)
+        self.history_seq += 1
         if len(self.history) > self.config.MAX_HISTORY_LINES:
-            excess = len(self.history) - self.config.MAX_HISTORY_LINES
-            self.history = self.history[excess:]
+            self._evict(len(self.history) - self.config.MAX_HISTORY_LINES)
+
+    def _evict(self, count: int):
+        """Drops the oldest window entries, keeping them in the transcript if there is one."""
+        if self.transcript is not None:
+            self.transcript.extend(self.history[:count])
+        else:
+            self.scrollback_dropped += count
+        del self.history[:count]
+
+    # --- Scrollback (transcript + window) ---
+
+    def scrollback_len(self) -> int:
+        return len(self.history) + (len(self.transcript) if self.transcript is not None else 0)
+
+    def scrollback_range(self, start: int, stop: int) -> List[LogEntry]:
+        """Entries [start, stop) of the whole session, oldest = 0."""
+        on_disk = len(self.transcript) if self.transcript is not None else 0
+        entries = []
+        if start < on_disk:
+            entries = self.transcript.read(start, min(stop, on_disk) - start)
+        if stop > on_disk:
+            entries.extend(self.history[max(0, start - on_disk):stop - on_disk])
+        return entries
 
     def set_flag(self, key: str, value: Any):
-        self.flags[key] = value
+        self.store.set("flag", key, value)
     
     def get_flag(self, key: str, default: Any = None) -> Any:
-        return self.flags.get(key, default)
+        return self.store.get("flag", key, default)
 
     # --- Inventory Helpers ---
     def add_item(self, item_id: str, qty: int = 1):
-        current = self.inventory.get(item_id, 0)
-        self.inventory[item_id] = current + qty
+        self.store.set("item", item_id, self.inventory.get(item_id, 0) + qty)
         
     def remove_item(self, item_id: str, qty: int = 1) -> bool:
         current = self.inventory.get(item_id, 0)
         if current >= qty:
-            self.inventory[item_id] = current - qty
-            if self.inventory[item_id] <= 0:
-                del self.inventory[item_id]
+            if current - qty <= 0:
+                self.store.delete("item", item_id)
+            else:
+                self.store.set("item", item_id, current - qty)
             return True
         return False
         
     def has_item(self, item_id: str, qty: int = 1) -> bool:
         return self.inventory.get(item_id, 0) >= qty
 
+    def items_with_at_least(self, qty: int) -> List[str]:
+        return self.store.index("items_by_qty").at_least(qty)
+
+    # --- Quest Helpers ---
+    def set_quest(self, quest_id: str, status: str):
+        self.store.set("quest", quest_id, status)
+
+    def quests_with_status(self, status: str) -> List[str]:
+        return sorted(self.store.index("quests_by_status").get(status))
+
+    # --- Change Notifications ---
+    def subscribe(self, kind: str, key: Optional[str], callback) -> int:
+        """callback(kind, key, old, new) when a flag/item/quest changes; see StateStore.subscribe."""
+        return self.store.subscribe(kind, key, callback)
+
+    def unsubscribe(self, token: int):
+        self.store.unsubscribe(token)
+
     # --- Persistence ---
     def to_dict(self) -> dict:
+        # Containers are copied so the result is a stable snapshot
+        # (SaveSystem serializes it on another thread).
         return {
+            "schema_version": self.SAVE_SCHEMA_VERSION,
             "tier": self.tier,
             "hp": self.hp,
             "max_hp": self.max_hp,
-            "flags": self.flags,
-            "inventory": self.inventory,
-            "quests": self.quests,
+            "flags": dict(self.flags),
+            "inventory": dict(self.inventory),
+            "quests": dict(self.quests),
             "mode": self.mode,
             "current_scene_id": self.current_scene_id,
             "scene_cursor": self.scene_cursor,
             "combat": self.combat.to_dict(),
-            "history": [e.to_dict() for e in self.history[-50:]]
+            "history_seq": self.history_seq,
+            "history": [e.to_dict() for e in self.history]  # the whole window (MAX_HISTORY_LINES)
         }
 
+    def checkpoint_fields(self) -> dict:
+        """Scalars and combat state as of now; pass to delta_since() to leave unchanged ones out."""
+        return {
+            "tier": self.tier,
+            "hp": self.hp,
+            "max_hp": self.max_hp,
+            "mode": self.mode,
+            "current_scene_id": self.current_scene_id,
+            "scene_cursor": self.scene_cursor,
+            "combat": self.combat.to_dict(),
+        }
+
+    def delta_since(self, version: int, history_seq: int, fields: Optional[dict] = None) -> Optional[dict]:
+        """
+        Returns only what changed since a checkpoint taken at
+        (change_version, history_seq, checkpoint_fields()). Cost scales with
+        the number of changes. Without fields every scalar is included.
+        Returns None if the change log no longer reaches back that far.
+        """
+        changes = self.store.changes_since(version)
+        if changes is None:
+            return None
+
+        fields = fields or {}
+        delta: dict = {k: v for k, v in self.checkpoint_fields().items() if k not in fields or fields[k] != v}
+
+        # Keyed changes (absent inventory key = removed)
+        sources = {"flag": ("flags", self.flags), "item": ("inventory", self.inventory), "quest": ("quests", self.quests)}
+        for _, kind, key in changes:
+            name, store = sources[kind]
+            delta.setdefault(name, {})[key] = store.get(key, 0 if kind == "item" else None)
+
+        # History: re-send the entry that was last at the checkpoint, since a
+        # typewriter line may still have been filling in.
+        first_seq = max(1, history_seq)
+        count = min(self.history_seq - first_seq + 1, len(self.history))
+        if count > 0:
+            delta["history_start"] = self.history_seq - count + 1
+            delta["history"] = [e.to_dict() for e in self.history[-count:]]
+        delta["history_seq"] = self.history_seq
+        return delta
+
+    def apply_delta(self, delta: dict):
+        """Replays a delta produced by delta_since() on top of restored state."""
+        for key in ("tier", "hp", "max_hp", "mode", "current_scene_id", "scene_cursor"):
+            if key in delta:
+                setattr(self, key, delta[key])
+        if "combat" in delta:
+            self.combat.restore(delta["combat"])
+
+        for key, value in delta.get("flags", {}).items():
+            self.store.set("flag", key, value)
+        for quest_id, status in delta.get("quests", {}).items():
+            self.store.set("quest", quest_id, status)
+        for item_id, qty in delta.get("inventory", {}).items():
+            if qty > 0:
+                self.store.set("item", item_id, qty)
+            else:
+                self.store.delete("item", item_id)
+
+        if "history" in delta:
+            # Drop entries the delta re-sends, then append
+            overlap = self.history_seq - delta["history_start"] + 1
+            if overlap > 0:
+                del self.history[max(0, len(self.history) - overlap):]
+            self.history.extend(LogEntry.from_dict(item) for item in delta["history"])
+            if len(self.history) > self.config.MAX_HISTORY_LINES:
+                self._evict(len(self.history) - self.config.MAX_HISTORY_LINES)
+        self.history_seq = delta.get("history_seq", self.history_seq)
+
+    @staticmethod
+    def _same_entry(saved: LogEntry, entry: LogEntry) -> bool:
+        """True if `saved` is `entry` as it was at save time (a typewriter line may have grown since)."""
+        return (saved.timestamp == entry.timestamp and saved.channel == entry.channel
+                and entry.text.startswith(saved.text))
+
+    def _restore_position(self, restored: List[LogEntry]) -> int:
+        """
+        Scrollback position where a restored window goes. A save from this
+        session lines up with the scrollback: its lines return to where
+        they already are (so none is shown twice) and lines written after
+        the save are cut. Without a transcript, lines already dropped are
+        trusted to match (negative position). Anything else goes after the
+        whole scrollback.
+        """
+        end = self.scrollback_len()
+        if not restored:
+            return end
+        same = self._same_entry
+        first = restored[0]
+
+        # Newest first; timestamps only grow within a session, so stop once past the save
+        position = end
+        while position > 0:
+            start = max(0, position - self.RESTORE_SCAN_CHUNK)
+            chunk = self.scrollback_range(start, position)
+            for offset in range(len(chunk) - 1, -1, -1):
+                if chunk[offset].timestamp < first.timestamp:
+                    return end
+                if same(first, chunk[offset]):
+                    found = start + offset
+                    following = self.scrollback_range(found, found + len(restored))
+                    if len(following) == len(restored) and all(map(same, restored, following)):
+                        return found
+                    return end
+            position = start
+
+        if self.transcript is None and self.history:
+            for dropped in range(1, min(len(restored), self.scrollback_dropped + 1)):
+                if same(restored[dropped], self.history[0]):
+                    following = self.history[:len(restored) - dropped]
+                    if len(following) == len(restored) - dropped and all(map(same, restored[dropped:], following)):
+                        return -dropped
+                    break
+        return end
+
+    # --- Schema Migration ---
+
+    def _migrate(self, data: dict) -> dict:
+        """Upgrades an older save dict step by step to SAVE_SCHEMA_VERSION."""
+        version = data.get("schema_version", 1)
+        if version > self.SAVE_SCHEMA_VERSION:
+            raise ValueError(f"Save schema v{version} is newer than supported v{self.SAVE_SCHEMA_VERSION}.")
+
+        while version < self.SAVE_SCHEMA_VERSION:
+            migrate = getattr(self, f"_migrate_v{version}")
+            data = migrate(dict(data))
+            version = data["schema_version"]
+        return data
+
+    def _migrate_v1(self, data: dict) -> dict:
+        """v1 -> v2: history_seq added (journal replay needs it)."""
+        data["history_seq"] = len(data.get("history", []))
+        data["schema_version"] = 2
+        return data
+
     def restore_from_dict(self, data: dict):
+        data = self._migrate(data)
+
         self.tier = data.get("tier", 1)
         self.hp = data.get("hp", 20)
         self.max_hp = data.get("max_hp", 20)
-        self.flags = data.get("flags", {})
-        self.inventory = data.get("inventory", {})
-        self.quests = data.get("quests", {})
+        self.store.replace("flag", data.get("flags", {}))
+        self.store.replace("item", data.get("inventory", {}))
+        self.store.replace("quest", data.get("quests", {}))
         self.mode = data.get("mode", "terminal")
         self.current_scene_id = data.get("current_scene_id", "boot_sequence")
         self.scene_cursor = data.get("scene_cursor", 0)
@@ -158,5 +414,21 @@ class GameState:
         if "combat" in data:
             self.combat.restore(data["combat"])
         
-        raw_history = data.get("history", [])
-        self.history = [LogEntry.from_dict(item) for item in raw_history]
\ No newline at end of file
+        # The current window is replaced. Lines the save brings back take
+        # their old scrollback positions (see _restore_position); what the
+        # window holds before them goes to the transcript first.
+        restored = [LogEntry.from_dict(item) for item in data.get("history", [])]
+        position = self._restore_position(restored)
+        if self.transcript is not None:
+            on_disk = len(self.transcript)
+            if position < on_disk:
+                self.transcript.truncate(position)
+            else:
+                self.transcript.extend(self.history[:position - on_disk])
+        else:
+            self.scrollback_dropped += position
+
+        self.history = restored
+        self.history_seq = data["history_seq"]
+
+        self.reset_change_log()
\ No newline at end of file
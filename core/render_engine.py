@@ -3,23 +3,24 @@
 import pygame
 import math
 import random
+import json
+import os
+from collections import OrderedDict
 from core.config import GlobalConfig
+from core.line_index import LineIndex
 from core.models import GameState, UIState
 
 class RenderEngine:
-    def __init__(self, config: GlobalConfig):
+    FONT_PREFERENCES = ["consolas", "menlo", "couriernew", "courier", "monospace"]
+    ENTRY_SPACING = 4        # px between log entries
+    WRAP_CACHE_SIZE = 1024   # wrapped texts kept
+
+    def __init__(self, config: GlobalConfig, defer_post_fx: bool = False):
         self.config = config
         
         # 1. Font Setup
-        font_preferences = ["consolas", "menlo", "couriernew", "courier", "monospace"]
         self.font_size = 22
-        self.font = pygame.font.SysFont(pygame.font.get_default_font(), self.font_size)
-        
-        available_fonts = pygame.font.get_fonts()
-        for pref in font_preferences:
-            if pref in available_fonts:
-                self.font = pygame.font.SysFont(pref, self.font_size)
-                break
+        self.font = self._load_font()
 
         # 2. Metrics
         self.line_height = self.font.get_linesize()
@@ -27,13 +28,82 @@ class RenderEngine:
         self.margin_y = 20
         self.max_width_px = self.config.WIDTH - (self.margin_x * 2)
 
+        # History layout caches
+        self._wrap_cache: OrderedDict[str, list[str]] = OrderedDict()
+        self.line_index = LineIndex(self._entry_line_count)
+        self._typing_preview = None  # UIState.typing_preview of the frame being drawn
+
         # Post-Processing Setup
         self.canvas = pygame.Surface((self.config.WIDTH, self.config.HEIGHT))
-        self.scanline_surface = self._generate_scanlines()
-        self.vignette_surface = self._generate_vignette()
+        self.scanline_surface: pygame.Surface | None = None
+        self.vignette_surface: pygame.Surface | None = None
 
         # NEW: The Phosphor Bed Background
+        self.bg_surface: pygame.Surface | None = None
+
+        # Deferred mode: frames render with a flat fill until init_post_fx() runs
+        if not defer_post_fx:
+            self.init_post_fx()
+
+    def init_post_fx(self):
+        """Generates the CRT surfaces (background noise, scanlines, vignette)."""
+        self.scanline_surface = self._generate_scanlines()
+        self.vignette_surface = self._generate_vignette()
         self.bg_surface = self._generate_background()
+
+    # --- Font Resolution ---
+
+    def _load_font(self) -> pygame.font.Font:
+        """
+        Loads the preferred monospace font.
+        The resolved file path is cached on disk, because enumerating
+        system fonts (pygame.font.get_fonts) is slow on some platforms.
+        """
+        cached_path = self._read_font_cache()
+        if cached_path:
+            try:
+                return pygame.font.Font(cached_path, self.font_size)
+            except (pygame.error, OSError) as e:
+                print(f"[RenderEngine] Cached font unusable ({e}), rescanning.")
+
+        font_path = None
+        available_fonts = pygame.font.get_fonts()
+        for pref in self.FONT_PREFERENCES:
+            if pref in available_fonts:
+                font_path = pygame.font.match_font(pref)
+                break
+
+        self._write_font_cache(font_path)
+        return pygame.font.Font(font_path, self.font_size)
+
+    def _read_font_cache(self) -> str | None:
+        path = self.config.FONT_CACHE_PATH
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        # Stale if preferences changed or the font file disappeared
+        if data.get("preferences") != self.FONT_PREFERENCES:
+            return None
+        font_path = data.get("font_path")
+        if font_path and os.path.exists(font_path):
+            return font_path
+        return None
+
+    def _write_font_cache(self, font_path: str | None):
+        path = self.config.FONT_CACHE_PATH
+        if not path or not font_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"preferences": self.FONT_PREFERENCES, "font_path": font_path}, f)
+        except OSError as e:
+            print(f"[RenderEngine] Font cache write failed: {e}")
     
     def _generate_background(self) -> pygame.Surface:
         """
@@ -125,27 +195,60 @@ class RenderEngine:
         #    Smoothscale interpolates the pixels, creating a perfect fog.
         return pygame.transform.smoothscale(gradient_surf, (self.config.WIDTH, self.config.HEIGHT))
 
+    # --- History Layout ---
+
+    def _entry_lines(self, entry) -> tuple[list[str], tuple[int, int, int]]:
+        """Wrapped lines + color for one entry; wraps are cached by text (entries repeat, scrolling re-lays)."""
+        theme = self.config.CHANNEL_THEME.get(entry.channel, self.config.CHANNEL_THEME["terminal"])
+        preview = self._typing_preview
+        full_text = theme["prefix"] + (preview[1] if preview and preview[0] is entry else entry.text)
+        lines = self._wrap_cache.get(full_text)
+        if lines is None:
+            lines = self._wrap_text_pixel(full_text, self.max_width_px)
+            self._wrap_cache[full_text] = lines
+            if len(self._wrap_cache) > self.WRAP_CACHE_SIZE:
+                self._wrap_cache.popitem(last=False)
+        else:
+            self._wrap_cache.move_to_end(full_text)
+        return lines, self.config.COLORS.get(theme["color"], (255, 255, 255))
+
+    def _entry_line_count(self, entry) -> int:
+        return len(self._entry_lines(entry)[0])
+
     def _render_history(self, surface: pygame.Surface, game_state: GameState, start_y: int, ui_state: UIState = None):
-        # (Identical logic to Phase 2, but accepts 'surface' arg instead of 'screen')
+        # Lays out only the viewport; scroll_offset counts wrapped lines back from the newest
         current_y = start_y
-        
-        visible_history = game_state.history
-        offset = ui_state.scroll_offset if ui_state else 0
-        
+        self._typing_preview = ui_state.typing_preview if ui_state else None
+        self.line_index.sync(game_state, self.max_width_px)
+        total = self.line_index.total_lines()
+        page = max(1, (start_y - self.margin_y) // self.line_height + 1)
+
+        offset = 0
+        if ui_state:
+            if ui_state.scroll_to_entry is not None:
+                # Jump so that entry's last line sits at the bottom of the view
+                ui_state.scroll_offset = total - self.line_index.lines_before(game_state, ui_state.scroll_to_entry + 1)
+                ui_state.scroll_to_entry = None
+            ui_state.scroll_max = max(0, total - 1)
+            ui_state.page_lines = page
+            ui_state.scroll_offset = max(0, min(ui_state.scroll_offset, ui_state.scroll_max))
+            offset = ui_state.scroll_offset
+
         if offset > 0:
-            visible_history = game_state.history[:-offset]
             self._render_scroll_indicator(surface, current_y)
 
-        for entry in reversed(visible_history):
-            theme = self.config.CHANNEL_THEME.get(entry.channel, self.config.CHANNEL_THEME["terminal"])
-            color_key = theme["color"]
-            prefix = theme["prefix"]
-            
-            full_text = prefix + entry.text
-            color = self.config.COLORS.get(color_key, (255, 255, 255))
+        bottom_line = total - offset
+        if bottom_line <= 0:
+            return
+        last, last_line = self.line_index.locate(game_state, bottom_line - 1)
+        first, _ = self.line_index.locate(game_state, max(0, bottom_line - page))
+        visible = game_state.scrollback_range(first, last + 1)
+
+        for i, entry in enumerate(reversed(visible)):
+            wrapped_lines, color = self._entry_lines(entry)
+            if i == 0:
+                wrapped_lines = wrapped_lines[:last_line + 1]
 
-            wrapped_lines = self._wrap_text_pixel(full_text, self.max_width_px)
-            
             for line in reversed(wrapped_lines):
                 if current_y < self.margin_y:
                     return 
@@ -154,7 +257,7 @@ class RenderEngine:
                 surface.blit(text_surf, (self.margin_x, current_y))
                 current_y -= self.line_height
             
-            current_y -= 4
+            current_y -= self.ENTRY_SPACING
 
     def _render_scroll_indicator(self, surface: pygame.Surface, y_pos: int):
         text = "-- HISTORY SCROLL ACTIVE --"
@@ -167,13 +270,16 @@ class RenderEngine:
         Main draw call.
         """
         # 1. Draw the Phosphor Bed (Instead of flat fill)
-        self.canvas.blit(self.bg_surface, (0, 0))
+        if self.bg_surface:
+            self.canvas.blit(self.bg_surface, (0, 0))
+        else:
+            self.canvas.fill(self.config.COLORS["BACKGROUND"])
         
         # 1. Render Scene to Intermediate Canvas
         # self.canvas.fill(self.config.COLORS["BACKGROUND"])
 
         # Input (Dynamic Height)
-        prompt = "> "
+        prompt = f"(reverse-i-search)'{ui_state.search_query}': " if ui_state.search_active else "> "
         full_input_text = prompt + ui_state.input_buffer
         input_lines = self._wrap_text_pixel(full_input_text, self.max_width_px)
         
@@ -182,20 +288,50 @@ class RenderEngine:
         
         self._render_input_block(self.canvas, input_lines, input_start_y, ui_state.cursor_visible)
 
-        # History (Bottom-up)
+        # Tab candidates sit between the history and the prompt
         history_bottom_y = input_start_y - self.margin_y
+        if ui_state.completion_hint:
+            hint_lines = self._wrap_text_pixel(ui_state.completion_hint, self.max_width_px)
+            hint_start_y = input_start_y - len(hint_lines) * self.line_height
+            self._render_hint_block(self.canvas, hint_lines, hint_start_y)
+            history_bottom_y = hint_start_y - self.margin_y
+
+        # History (Bottom-up)
         self._render_history(self.canvas, game_state, history_bottom_y, ui_state)
         
+        # Debug overlay sits under the CRT pass so it matches the look
+        if ui_state.perf_overlay_visible and ui_state.perf_overlay_lines:
+            self._render_perf_overlay(self.canvas, ui_state.perf_overlay_lines)
+
         # 2. Apply Post-Processing
         if self.config.CRT_ENABLED:
-            if self.config.CRT_SCANLINES:
+            if self.config.CRT_SCANLINES and self.scanline_surface:
                 self.canvas.blit(self.scanline_surface, (0, 0))
-            if self.config.CRT_VIGNETTE:
+            if self.config.CRT_VIGNETTE and self.vignette_surface:
                 self.canvas.blit(self.vignette_surface, (0, 0))
 
         # 3. Final Blit to Screen
         screen.blit(self.canvas, (0, 0))
 
+    def _render_perf_overlay(self, surface: pygame.Surface, lines: list[str]):
+        """Frame timing box in the top-right corner."""
+        surfs = [self.font.render(line, True, self.config.COLORS["CRT_BRIGHT"]) for line in lines]
+        width = max(s.get_width() for s in surfs) + 16
+        height = len(surfs) * self.line_height + 12
+        x = self.config.WIDTH - self.margin_x - width
+        y = self.margin_y
+
+        box = pygame.Surface((width, height), pygame.SRCALPHA)
+        box.fill((0, 0, 0, 200))
+        surface.blit(box, (x, y))
+        for i, s in enumerate(surfs):
+            surface.blit(s, (x + 8, y + 6 + i * self.line_height))
+
+    def _render_hint_block(self, surface: pygame.Surface, lines: list[str], start_y: int):
+        color = self.config.COLORS["GRAY"]
+        for i, line in enumerate(lines):
+            surface.blit(self.font.render(line, True, color), (self.margin_x, start_y + i * self.line_height))
+
     def _render_input_block(self, surface: pygame.Surface, lines: list[str], start_y: int, cursor_visible: bool):
         color = self.config.COLORS["CRT_GREEN"]
         for i, line in enumerate(lines):
@@ -0,0 +1,60 @@
+# core/save_codec.py
+
+import json
+import zlib
+
+class SaveCodec:
+    """Interface for save payload encoders. Payloads are plain dicts."""
+    name: str = ""
+    extension: str = ""
+
+    def encode(self, data: dict) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, payload: bytes) -> dict:
+        raise NotImplementedError
+
+class JsonSaveCodec(SaveCodec):
+    """Compact JSON. Human-readable, and the default."""
+    name = "json"
+    extension = ".json"
+
+    def encode(self, data: dict) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, payload: bytes) -> dict:
+        return json.loads(payload.decode('utf-8'))
+
+class BinarySaveCodec(SaveCodec):
+    """
+    Compact JSON, deflated. About a quarter of the size of compact JSON on
+    large saves, for roughly 1 ms more to encode and under 1 ms more to
+    decode per 150 KB: zlib and json both run in C, so it stays close to
+    JSON speed (see tools/bench_save_codecs.py).
+
+    Layout: b"RSB" + format version byte, then the zlib stream.
+    Version 1 (a pure-Python tagged format) was dropped: it was several
+    times slower than JSON to load.
+    """
+    name = "binary"
+    extension = ".sav"
+
+    MAGIC = b"RSB"
+    FORMAT_VERSION = 2
+    # Level 1: most of the size win at a fraction of level 6's encode time
+    COMPRESS_LEVEL = 1
+
+    def encode(self, data: dict) -> bytes:
+        raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        return self.MAGIC + bytes([self.FORMAT_VERSION]) + zlib.compress(raw, self.COMPRESS_LEVEL)
+
+    def decode(self, payload: bytes) -> dict:
+        if payload[:3] != self.MAGIC:
+            raise ValueError("Not a binary save.")
+        if payload[3] != self.FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary save format: {payload[3]}")
+        try:
+            raw = zlib.decompress(payload[4:])
+        except zlib.error as e:
+            raise ValueError(f"Corrupt binary save: {e}")
+        return json.loads(raw.decode('utf-8'))
@@ -0,0 +1,178 @@
+# core/save_index.py
+
+import json
+import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+@dataclass
+class SlotInfo:
+    """Summary of one save slot, enough to draw a load menu row."""
+    slot_name: str
+    scene_id: str = ""
+    tier: int = 0
+    hp: int = 0
+    max_hp: int = 0
+    saved_at: float = 0.0
+    filename: str = ""
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: dict) -> 'SlotInfo':
+        return SlotInfo(
+            slot_name=data.get("slot_name", ""),
+            scene_id=data.get("scene_id", ""),
+            tier=data.get("tier", 0),
+            hp=data.get("hp", 0),
+            max_hp=data.get("max_hp", 0),
+            saved_at=data.get("saved_at", 0.0),
+            filename=data.get("filename", "")
+        )
+
+class SaveSlotIndex:
+    """
+    Small metadata file ('slots.index') summarizing every save slot.
+
+    Each entry remembers the (mtime_ns, size) stamps of the slot files it was
+    built from. list_slots() compares those against one directory scan and
+    re-reads only the slots whose files changed, so the index rebuilds itself
+    when it is missing, stale, or written by another process.
+    """
+    FILENAME = "slots.index"
+    INDEX_VERSION = 1
+
+    def __init__(self, save_dir: str, snapshot_exts: List[str], journal_ext: str,
+                 read_slot: Callable[[str], Optional[SlotInfo]]):
+        self.save_dir = save_dir
+        self.path = os.path.join(save_dir, self.FILENAME)
+        self.snapshot_exts = snapshot_exts
+        self.journal_ext = journal_ext
+        self.read_slot = read_slot
+
+        # slot -> {"info": {...} | None, "stamps": {filename: [mtime_ns, size]}}
+        self.entries: Optional[Dict[str, dict]] = None
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    # --- Public API ---
+
+    def list_slots(self, verify: bool = True) -> List[SlotInfo]:
+        """
+        Returns slot summaries, most recently saved first.
+        With verify=False the index is trusted as-is (no directory scan).
+        """
+        with self.lock:
+            self._ensure_loaded()
+            if verify:
+                self._refresh()
+            infos = [SlotInfo.from_dict(e["info"]) for e in self.entries.values() if e["info"]]
+        return sorted(infos, key=lambda i: i.saved_at, reverse=True)
+
+    def update(self, info: SlotInfo, persist: bool = True):
+        """Records a slot after its files were written (writer thread)."""
+        with self.lock:
+            self._ensure_loaded()
+            self.entries[info.slot_name] = {
+                "info": info.to_dict(),
+                "stamps": self._stamp_files(self._slot_files(info.slot_name)),
+            }
+            self.dirty = True
+            if persist:
+                self._write()
+
+    def rebuild(self) -> int:
+        """Discards the index and re-reads every slot. Returns the slot count."""
+        with self.lock:
+            self.entries = {}
+            self._refresh()
+            return len(self.entries)
+
+    def flush(self):
+        with self.lock:
+            if self.dirty:
+                self._write()
+
+    # --- Internals (call with lock held) ---
+
+    def _ensure_loaded(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == self.INDEX_VERSION:
+                self.entries = data.get("slots", {})
+        except (OSError, ValueError) as e:
+            print(f"[SaveSlotIndex] Index unreadable, rebuilding: {e}")
+
+    def _scan(self) -> Dict[str, Dict[str, list]]:
+        """One directory pass: slot -> {filename: [mtime_ns, size]}."""
+        slots: Dict[str, Dict[str, list]] = {}
+        with os.scandir(self.save_dir) as it:
+            for dirent in it:
+                slot = self._slot_for_filename(dirent.name)
+                if slot is None:
+                    continue
+                st = dirent.stat()
+                slots.setdefault(slot, {})[dirent.name] = [st.st_mtime_ns, st.st_size]
+        return slots
+
+    def _slot_for_filename(self, name: str) -> Optional[str]:
+        if name.endswith(self.journal_ext):
+            return name[:-len(self.journal_ext)]
+        for ext in self.snapshot_exts:
+            if name.endswith(ext):
+                stem = name[:-len(ext)]
+                # Skips previous generations ('save1.prev') and foreign files
+                return None if "." in stem else stem
+        return None
+
+    def _slot_files(self, slot_name: str) -> List[str]:
+        names = [slot_name + ext for ext in self.snapshot_exts] + [slot_name + self.journal_ext]
+        return [n for n in names if os.path.exists(os.path.join(self.save_dir, n))]
+
+    def _stamp_files(self, names: List[str]) -> Dict[str, list]:
+        stamps = {}
+        for name in names:
+            st = os.stat(os.path.join(self.save_dir, name))
+            stamps[name] = [st.st_mtime_ns, st.st_size]
+        return stamps
+
+    def _refresh(self):
+        """Re-reads slots whose files changed; drops slots that vanished."""
+        on_disk = self._scan()
+        changed = False
+
+        for slot in list(self.entries):
+            if slot not in on_disk:
+                del self.entries[slot]
+                changed = True
+
+        for slot, stamps in on_disk.items():
+            entry = self.entries.get(slot)
+            if entry and entry.get("stamps") == stamps:
+                continue
+            # Unreadable slots are kept with info=None so they aren't re-read every scan
+            info = self.read_slot(slot)
+            self.entries[slot] = {"info": info.to_dict() if info else None, "stamps": stamps}
+            changed = True
+
+        if changed:
+            self.dirty = True
+            self._write()
+
+    def _write(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.INDEX_VERSION, "slots": self.entries}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"[SaveSlotIndex] Index write failed: {e}")
@@ -2,38 +2,451 @@
 
 import json
 import os
+import hashlib
+import threading
+import queue
+import time
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 from core.models import GameState
+from core.save_codec import SaveCodec, JsonSaveCodec, BinarySaveCodec
+from core.save_index import SaveSlotIndex, SlotInfo
+
+@dataclass
+class SaveEvent:
+    """Feedback sent from the save writer thread -> Main Thread."""
+    type: str  # "SAVED", "JOURNALED", "ERROR"
+    slot_name: str
+    data: Any = None
+    timestamp: float = field(default_factory=time.time)
 
 class SaveSystem:
-    def __init__(self, save_dir: str = "content/saves"):
+    """
+    Two-phase saving:
+    1. Main thread takes a cheap snapshot (GameState.to_dict copies containers).
+    2. Writer thread serializes, writes a temp file, fsyncs and renames it
+       into place. The previous file is kept as the fallback generation.
+
+    File layout: a header line 'ROOTSAVE <codec> <sha256>' followed by the
+    codec payload (compact JSON or binary, see core/save_codec.py). The codec
+    is read from the header, so switching codecs never strands old saves.
+    Legacy saves (plain JSON, no header) still load, without verification.
+
+    Autosaves append deltas to '<slot>.journal' instead of rewriting the
+    snapshot. A delta carries only the fields that changed since the last
+    one. The journal header names the snapshot checksum it extends, so
+    a journal left over from an older snapshot is ignored on load.
+    Appends are fsynced as a group: once the writer has no more queued
+    jobs, or every JOURNAL_SYNC_BATCH records, whichever comes first.
+
+    Slot summaries for load menus live in 'slots.index' (see SaveSlotIndex).
+    """
+    HEADER_MAGIC = "ROOTSAVE"
+    JOURNAL_MAGIC = "ROOTJRNL"
+    JOURNAL_EXT = ".journal"
+    SLOT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+    JOURNAL_SYNC_BATCH = 16
+    SUMMARY_KEYS = ("current_scene_id", "tier", "hp", "max_hp")
+
+    CODECS: Dict[str, SaveCodec] = {
+        "json": JsonSaveCodec(),
+        "binary": BinarySaveCodec(),
+    }
+
+    def __init__(self, save_dir: str = "content/saves", compact_every: int = 64, codec: str = "json"):
         self.save_dir = save_dir
+        self.compact_every = compact_every
+        if codec not in self.CODECS:
+            raise ValueError(f"Unknown save codec '{codec}'. Options: {list(self.CODECS)}")
+        self.codec = self.CODECS[codec]
         if not os.path.exists(self.save_dir):
             os.makedirs(self.save_dir)
 
+        # Main thread: slot -> (change_version, history_seq, journal_records, checkpoint_fields)
+        self.journal_checkpoints: Dict[str, Tuple[int, int, int, dict]] = {}
+        # Writer thread: slot -> checksum of the snapshot on disk
+        self.snapshot_checksums: Dict[str, str] = {}
+        # Writer thread: journals appended to but not yet fsynced, and their JOURNALED events
+        self._unsynced_journals: Dict[str, str] = {}
+        self._unsynced_events: List[SaveEvent] = []
+
+        self.index = SaveSlotIndex(
+            self.save_dir,
+            snapshot_exts=[c.extension for c in self.CODECS.values()],
+            journal_ext=self.JOURNAL_EXT,
+            read_slot=self._read_slot_info
+        )
+
+        self.job_queue = queue.Queue()
+        self.event_queue = queue.Queue()
+        self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self.worker_thread.start()
+
+    # --- Paths ---
+
+    def get_filepath(self, slot_name: str, codec: Optional[SaveCodec] = None) -> str:
+        ext = (codec or self.codec).extension
+        return os.path.join(self.save_dir, f"{slot_name}{ext}")
+
+    def get_prev_filepath(self, slot_name: str, codec: Optional[SaveCodec] = None) -> str:
+        ext = (codec or self.codec).extension
+        return os.path.join(self.save_dir, f"{slot_name}.prev{ext}")
+
+    def _load_candidates(self, slot_name: str) -> List[str]:
+        """
+        Existing files for a slot across all codecs: newest current file
+        first, then previous generations (also newest first).
+        """
+        def newest_first(paths: List[str]) -> List[str]:
+            existing = [p for p in paths if os.path.exists(p)]
+            return sorted(existing, key=os.path.getmtime, reverse=True)
+
+        codecs = list(self.CODECS.values())
+        current = newest_first([self.get_filepath(slot_name, c) for c in codecs])
+        previous = newest_first([self.get_prev_filepath(slot_name, c) for c in codecs])
+        return current + previous
+
+    def get_journal_filepath(self, slot_name: str) -> str:
+        return os.path.join(self.save_dir, f"{slot_name}{self.JOURNAL_EXT}")
+
+    def is_valid_slot_name(self, slot_name: str) -> bool:
+        """Slot names become filenames: letters, digits, '-' and '_' only."""
+        return bool(self.SLOT_NAME_PATTERN.match(slot_name or ""))
+
+    # --- Main Thread API ---
+
     def save_game(self, game_state: GameState, slot_name: str = "save1") -> bool:
-        """Writes GameState to JSON file."""
-        data = game_state.to_dict()
-        filepath = os.path.join(self.save_dir, f"{slot_name}.json")
+        """
+        Snapshots GameState and queues it for the writer thread.
+        Completion is reported via poll_events(); an ERROR there drops the
+        slot's journal checkpoint, so the next autosave is a full write.
+        """
+        if not self.is_valid_slot_name(slot_name):
+            print(f"[SaveSystem] Invalid slot name: '{slot_name}'")
+            return False
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-            return True
+            data = game_state.to_dict()
         except Exception as e:
-            print(f"[SaveSystem] Save Error: {e}")
+            print(f"[SaveSystem] Snapshot Error: {e}")
             return False
+        self.journal_checkpoints[slot_name] = (game_state.change_version, game_state.history_seq, 0,
+                                               game_state.checkpoint_fields())
+        self.job_queue.put(("full", slot_name, data, self._summary_fields(game_state)))
+        return True
 
-    def load_game(self, game_state: GameState, slot_name: str = "save1") -> bool:
-        """Reads JSON and restores GameState in-place."""
-        filepath = os.path.join(self.save_dir, f"{slot_name}.json")
-        if not os.path.exists(filepath):
+    def autosave(self, game_state: GameState, slot_name: str = "autosave") -> bool:
+        """
+        Appends only what changed since the slot's last checkpoint.
+        Falls back to a full snapshot on the first save of a session, when
+        the journal is due for compaction, or when the delta is unavailable.
+        """
+        if not self.is_valid_slot_name(slot_name):
+            print(f"[SaveSystem] Invalid slot name: '{slot_name}'")
             return False
-            
+        checkpoint = self.journal_checkpoints.get(slot_name)
+        if checkpoint is None or checkpoint[2] >= self.compact_every:
+            return self.save_game(game_state, slot_name)
+
+        version, history_seq, records, fields = checkpoint
+        delta = game_state.delta_since(version, history_seq, fields)
+        if delta is None:
+            return self.save_game(game_state, slot_name)
+
+        fields = dict(fields, **{k: v for k, v in delta.items() if k in fields})
+        self.journal_checkpoints[slot_name] = (game_state.change_version, game_state.history_seq, records + 1, fields)
+        self.job_queue.put(("delta", slot_name, delta, self._summary_fields(game_state)))
+        return True
+
+    def _summary_fields(self, game_state: GameState) -> dict:
+        """What the slot index shows; deltas may leave these out, so they travel with each job."""
+        return {"current_scene_id": game_state.current_scene_id, "tier": game_state.tier,
+                "hp": game_state.hp, "max_hp": game_state.max_hp}
+
+    def poll_events(self) -> List[SaveEvent]:
+        events = []
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            game_state.restore_from_dict(data)
+            while True:
+                events.append(self.event_queue.get_nowait())
+        except queue.Empty:
+            pass
+        for event in events:
+            if event.type == "ERROR":
+                # The checkpoint may describe a snapshot or journal that never
+                # made it to disk; the next autosave writes a full snapshot
+                self.journal_checkpoints.pop(event.slot_name, None)
+        return events
+
+    def flush(self):
+        """Blocks until every queued save has been written."""
+        self.job_queue.join()
+
+    def list_slots(self, verify: bool = True) -> List[SlotInfo]:
+        """Slot summaries for a load menu, read from the index (newest first)."""
+        # Queued writes land first, so the listing never depends on writer timing
+        self.flush()
+        return self.index.list_slots(verify=verify)
+
+    def load_game(self, game_state: GameState, slot_name: str = "save1") -> bool:
+        """
+        Reads a save and restores GameState in-place.
+        Falls back to the previous generation if the current file is corrupt.
+        """
+        if not self.is_valid_slot_name(slot_name):
+            return False
+
+        # Never read a slot that is still being written
+        self.flush()
+
+        for filepath in self._load_candidates(slot_name):
+            if not os.path.exists(filepath):
+                continue
+            try:
+                data, checksum = self._read_file(filepath)
+                game_state.restore_from_dict(data)
+            except Exception as e:
+                print(f"[SaveSystem] Load Error ({filepath}): {e}")
+                continue
+
+            # Checkpoints referred to the state we just replaced
+            self.journal_checkpoints.clear()
+            records = self._replay_journal(game_state, slot_name, checksum) if checksum else -1
+            if records >= 0:
+                # Keep appending to the same journal (writer is idle after flush)
+                self.snapshot_checksums[slot_name] = checksum
+                self.journal_checkpoints[slot_name] = (game_state.change_version, game_state.history_seq, records,
+                                                       game_state.checkpoint_fields())
             return True
-        except Exception as e:
-            print(f"[SaveSystem] Load Error: {e}")
-            return False
\ No newline at end of file
+
+        return False
+
+    def shutdown(self):
+        """Writes any pending saves, then stops the writer thread."""
+        self.job_queue.put(None)
+        self.worker_thread.join(timeout=5.0)
+        self.index.flush()
+
+    # --- Serialization ---
+
+    def _encode(self, data: dict) -> Tuple[bytes, str]:
+        """Returns (file bytes, checksum)."""
+        payload = self.codec.encode(data)
+        checksum = hashlib.sha256(payload).hexdigest()
+        header = f"{self.HEADER_MAGIC} {self.codec.name} {checksum}\n".encode('ascii')
+        return header + payload, checksum
+
+    def _decode(self, raw: bytes) -> Tuple[dict, Optional[str]]:
+        """Returns (data, checksum). Checksum is None for legacy saves."""
+        magic = self.HEADER_MAGIC.encode('ascii')
+        if not raw.startswith(magic):
+            # Legacy pretty-printed save without checksum
+            return json.loads(raw.decode('utf-8')), None
+
+        header, _, payload = raw.partition(b"\n")
+        parts = header.decode('ascii').split()
+        if len(parts) == 2:
+            # Pre-codec header: 'ROOTSAVE <sha256>' with JSON payload
+            parts.insert(1, "json")
+        if len(parts) != 3:
+            raise ValueError("Malformed save header.")
+        _, codec_name, checksum = parts
+        if codec_name not in self.CODECS:
+            raise ValueError(f"Unknown save codec '{codec_name}'.")
+        if hashlib.sha256(payload).hexdigest() != checksum:
+            raise ValueError("Checksum mismatch.")
+        return self.CODECS[codec_name].decode(payload), checksum
+
+    def _read_file(self, filepath: str) -> Tuple[dict, Optional[str]]:
+        with open(filepath, 'rb') as f:
+            return self._decode(f.read())
+
+    # --- Journal ---
+
+    def _encode_record(self, delta: dict) -> bytes:
+        payload = json.dumps(delta, separators=(',', ':')).encode('utf-8')
+        return f"{zlib.crc32(payload):08x} ".encode('ascii') + payload + b"\n"
+
+    def _replay_journal(self, game_state: GameState, slot_name: str, checksum: str) -> int:
+        """
+        Applies journal records on top of the restored snapshot.
+        Stops at the first torn or corrupt record (a crash mid-append).
+        Returns the number of records applied, or -1 if the journal
+        belongs to a different snapshot.
+        """
+        path = self.get_journal_filepath(slot_name)
+        if not os.path.exists(path):
+            return -1
+
+        with open(path, 'rb') as f:
+            header = f.readline().decode('ascii', errors='replace').split()
+            if header != [self.JOURNAL_MAGIC, checksum]:
+                return -1
+
+            applied = 0
+            for line in f:
+                crc, _, payload = line.rstrip(b"\n").partition(b" ")
+                try:
+                    if int(crc, 16) != zlib.crc32(payload):
+                        break
+                    delta = json.loads(payload.decode('utf-8'))
+                except ValueError:
+                    break
+                game_state.apply_delta(delta)
+                applied += 1
+
+        # Replayed state is only checkpoint-consistent from here on
+        game_state.reset_change_log()
+        return applied
+
+    def _read_journal_tail(self, slot_name: str, checksum: str) -> Optional[dict]:
+        """Summary fields as of the last intact journal record for a snapshot, if any."""
+        path = self.get_journal_filepath(slot_name)
+        if not os.path.exists(path):
+            return None
+        summary = {}
+        with open(path, 'rb') as f:
+            if f.readline().decode('ascii', errors='replace').split() != [self.JOURNAL_MAGIC, checksum]:
+                return None
+            for line in f:
+                crc, _, payload = line.rstrip(b"\n").partition(b" ")
+                try:
+                    if int(crc, 16) != zlib.crc32(payload):
+                        break
+                    delta = json.loads(payload.decode('utf-8'))
+                except ValueError:
+                    break
+                # Deltas only carry what changed
+                summary.update((k, delta[k]) for k in self.SUMMARY_KEYS if k in delta)
+        return summary or None
+
+    # --- Slot Summaries ---
+
+    def _summarize(self, slot_name: str, data: dict, filepath: str, saved_at: float) -> SlotInfo:
+        return SlotInfo(
+            slot_name=slot_name,
+            # Defaults mirror GameState.restore_from_dict
+            scene_id=data.get("current_scene_id", "boot_sequence"),
+            tier=data.get("tier", 1),
+            hp=data.get("hp", 20),
+            max_hp=data.get("max_hp", 20),
+            saved_at=saved_at,
+            filename=os.path.basename(filepath)
+        )
+
+    def _read_slot_info(self, slot_name: str) -> Optional[SlotInfo]:
+        """Full read of one slot (snapshot + journal tail). Used by index rebuilds."""
+        for filepath in self._load_candidates(slot_name):
+            try:
+                data, checksum = self._read_file(filepath)
+            except Exception as e:
+                print(f"[SaveSystem] Slot Read Error ({filepath}): {e}")
+                continue
+
+            saved_at = os.path.getmtime(filepath)
+            tail = self._read_journal_tail(slot_name, checksum) if checksum else None
+            if tail:
+                data = dict(data, **tail)
+                saved_at = max(saved_at, os.path.getmtime(self.get_journal_filepath(slot_name)))
+            return self._summarize(slot_name, data, filepath, saved_at)
+        return None
+
+    # --- Writer Thread ---
+
+    def _write_atomic(self, slot_name: str, blob: bytes):
+        filepath = self.get_filepath(slot_name)
+        tmp_path = filepath + ".tmp"
+
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Keep the last good generation as a fallback
+        if os.path.exists(filepath):
+            os.replace(filepath, self.get_prev_filepath(slot_name))
+        os.replace(tmp_path, filepath)
+        self._fsync_dir()
+
+    def _start_journal(self, slot_name: str, checksum: str):
+        """Replaces the slot's journal with an empty one bound to 'checksum'."""
+        path = self.get_journal_filepath(slot_name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(f"{self.JOURNAL_MAGIC} {checksum}\n".encode('ascii'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self.snapshot_checksums[slot_name] = checksum
+
+    def _append_journal(self, slot_name: str, delta: dict):
+        """Appends a record; it is fsynced later by _sync_journals()."""
+        if slot_name not in self.snapshot_checksums:
+            # The snapshot this delta extends was never written by us
+            raise RuntimeError(f"No base snapshot for journal '{slot_name}'.")
+        path = self.get_journal_filepath(slot_name)
+        with open(path, 'ab') as f:
+            f.write(self._encode_record(delta))
+        self._unsynced_journals[slot_name] = path
+
+    def _sync_journals(self):
+        """One fsync per journal appended to since the last call, then the JOURNALED events."""
+        for slot_name, path in self._unsynced_journals.items():
+            try:
+                with open(path, 'ab') as f:
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"[SaveSystem] Journal Sync Error: {e}")
+                self.snapshot_checksums.pop(slot_name, None)
+                self.event_queue.put(SaveEvent("ERROR", slot_name, data=str(e)))
+        self._unsynced_journals.clear()
+        for event in self._unsynced_events:
+            self.event_queue.put(event)
+        self._unsynced_events.clear()
+
+    def _fsync_dir(self):
+        """Persists the rename itself. Not supported on Windows; ignored there."""
+        try:
+            fd = os.open(self.save_dir, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _worker_loop(self):
+        while True:
+            job = self.job_queue.get()
+            if job is None:
+                self._sync_journals()
+                self.job_queue.task_done()
+                break
+
+            kind, slot_name, data, summary = job
+            try:
+                if kind == "delta":
+                    self._append_journal(slot_name, data)
+                    # Index rewrite waits for the next full save (or shutdown)
+                    self.index.update(self._summarize(slot_name, summary, self.get_filepath(slot_name), time.time()), persist=False)
+                    self._unsynced_events.append(SaveEvent("JOURNALED", slot_name, data=self.get_journal_filepath(slot_name)))
+                else:
+                    blob, checksum = self._encode(data)
+                    self._write_atomic(slot_name, blob)
+                    self._start_journal(slot_name, checksum)  # fsynced; replaces any unsynced appends
+                    self._unsynced_journals.pop(slot_name, None)
+                    self.index.update(self._summarize(slot_name, summary, self.get_filepath(slot_name), time.time()))
+                    self.event_queue.put(SaveEvent("SAVED", slot_name, data=self.get_filepath(slot_name)))
+            except Exception as e:
+                print(f"[SaveSystem] Save Error: {e}")
+                # Deltas queued behind this job were measured from a checkpoint
+                # that is not on disk: refuse them until a full save succeeds
+                self.snapshot_checksums.pop(slot_name, None)
+                self.event_queue.put(SaveEvent("ERROR", slot_name, data=str(e)))
+
+            # Group commit: a burst of autosaves shares one fsync; flush() sees it done
+            if self.job_queue.empty() or len(self._unsynced_events) >= self.JOURNAL_SYNC_BATCH:
+                self._sync_journals()
+            self.job_queue.task_done()
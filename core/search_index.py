@@ -0,0 +1,190 @@
+# core/search_index.py
+
+import bisect
+import heapq
+import re
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+_WORD = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+class InvertedIndex:
+    """
+    Word -> ids of the documents containing it, for documents added in
+    increasing id order (log entries, submitted commands). Postings are
+    compact arrays that only ever grow at the end, so adding a document
+    costs O(words in it) and a query never scans the documents themselves.
+
+    Query semantics: every word must appear; the last one may be a prefix
+    (so results update while it is still being typed).
+    """
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.vocab: List[str] = []  # sorted, for prefix lookups
+        self.last_id = -1
+        self.min_id = 0  # ids below this were pruned
+
+    def add(self, doc_id: int, text: str):
+        if doc_id <= self.last_id:
+            raise ValueError(f"ids must increase ({doc_id} after {self.last_id})")
+        self.last_id = doc_id
+        for word in set(tokenize(text)):
+            ids = self.postings.get(word)
+            if ids is None:
+                ids = self.postings[word] = array('Q')
+                bisect.insort(self.vocab, word)
+            ids.append(doc_id)
+
+    def prune_below(self, min_id: int):
+        """Forgets every id < min_id; words left without documents are dropped. O(vocabulary)."""
+        if min_id <= self.min_id:
+            return
+        self.min_id = min_id
+        for word in list(self.postings):
+            ids = self.postings[word]
+            cut = bisect.bisect_left(ids, min_id)
+            if cut == len(ids):
+                del self.postings[word]
+            elif cut:
+                del ids[:cut]
+        if len(self.postings) != len(self.vocab):
+            self.vocab = sorted(self.postings)
+
+    def prune_from(self, max_id: int):
+        """Forgets every id >= max_id, so those ids can be added again. O(vocabulary)."""
+        if max_id > self.last_id:
+            return
+        self.last_id = max_id - 1
+        for word in list(self.postings):
+            ids = self.postings[word]
+            cut = bisect.bisect_left(ids, max_id)
+            if not cut:
+                del self.postings[word]
+            else:
+                del ids[cut:]
+        if len(self.postings) != len(self.vocab):
+            self.vocab = sorted(self.postings)
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def _prefix_lists(self, prefix: str) -> List[array]:
+        start = bisect.bisect_left(self.vocab, prefix)
+        stop = bisect.bisect_left(self.vocab, prefix + "\uffff")
+        return [self.postings[word] for word in self.vocab[start:stop]]
+
+    def search(self, query: str, before: Optional[int] = None) -> Iterator[int]:
+        """Ids of matching documents, newest first (only ids < before, if given)."""
+        words = tokenize(query)
+        if not words:
+            return iter(())
+        groups = []  # each group: doc matches if it is in any list of the group
+        for word in words[:-1]:
+            ids = self.postings.get(word)
+            if ids is None:
+                return iter(())
+            groups.append([ids])
+        last = self._prefix_lists(words[-1])
+        if not last:
+            return iter(())
+        groups.append(last)
+
+        # Walk the smallest group newest-first, probe the others by bisection
+        groups.sort(key=lambda lists: sum(len(ids) for ids in lists))
+        return self._intersect(groups[0], groups[1:], before)
+
+    @staticmethod
+    def _intersect(driver: List[array], others: List[List[array]], before: Optional[int]) -> Iterator[int]:
+        for doc_id in _descending(driver):
+            if before is not None and doc_id >= before:
+                continue
+            if all(any(_contains(ids, doc_id) for ids in lists) for lists in others):
+                yield doc_id
+
+    @staticmethod
+    def matches(query: str, text: str) -> bool:
+        """Same semantics as search(), for one document that is not indexed."""
+        words = tokenize(query)
+        if not words:
+            return False
+        present = set(tokenize(text))
+        return all(word in present for word in words[:-1]) and any(w.startswith(words[-1]) for w in present)
+
+def _descending(lists: List[array]) -> Iterator[int]:
+    if len(lists) == 1:
+        yield from reversed(lists[0])
+        return
+    previous = None
+    for doc_id in heapq.merge(*(reversed(ids) for ids in lists), reverse=True):
+        if doc_id != previous:
+            yield doc_id
+            previous = doc_id
+
+def _contains(ids: array, doc_id: int) -> bool:
+    i = bisect.bisect_left(ids, doc_id)
+    return i < len(ids) and ids[i] == doc_id
+
+class ScrollbackIndex:
+    """
+    InvertedIndex over a GameState's whole scrollback (transcript + window).
+    sync() indexes entries appended since the last call, so per frame it
+    costs only the new lines. The newest entry is left out until another
+    follows it (a typewriter line is still being filled in) and is matched
+    directly instead. Entries with style SKIP_STYLE (search results) are
+    never indexed, so a search does not find its own output.
+    Without a transcript, postings of entries dropped from the window are
+    pruned every PRUNE_EVERY drops, so memory stays bounded by the window.
+    Entries a load cut from the end of the scrollback are forgotten.
+    """
+    SKIP_STYLE = "search"
+    CHUNK = 4096  # entries read per scrollback_range() call while catching up
+    PRUNE_EVERY = 256
+
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.index = InvertedIndex()
+        # Ids are scrollback positions plus entries dropped for good, so they
+        # stay valid when the window is trimmed without a transcript
+        self.next_id = 0
+
+    def sync(self):
+        gs = self.game_state
+        dropped = gs.scrollback_dropped
+        settled = dropped + gs.scrollback_len() - 1
+        if settled < self.next_id:
+            # A load cut the lines written after its save; their ids get reused
+            self.index.prune_from(max(settled, 0))
+            self.next_id = max(settled, 0)
+        start = max(self.next_id, dropped)
+        while start < settled:
+            stop = min(settled, start + self.CHUNK)
+            for doc_id, entry in enumerate(gs.scrollback_range(start - dropped, stop - dropped), start):
+                if entry.style != self.SKIP_STYLE:
+                    self.index.add(doc_id, entry.text)
+            start = stop
+        self.next_id = max(self.next_id, settled)
+        if dropped - self.index.min_id >= self.PRUNE_EVERY:
+            self.index.prune_below(dropped)
+
+    def find(self, query: str, limit: int = 100, before: Optional[int] = None) -> List[int]:
+        """Scrollback positions of matching entries, newest first (only positions < before, if given)."""
+        self.sync()
+        gs = self.game_state
+        dropped = gs.scrollback_dropped
+        end = dropped + (gs.scrollback_len() if before is None else before)
+
+        hits = []
+        tail_start = max(self.next_id, dropped)
+        if end > tail_start:
+            for doc_id, entry in zip(range(end - 1, tail_start - 1, -1),
+                                     reversed(gs.scrollback_range(tail_start - dropped, end - dropped))):
+                if entry.style != self.SKIP_STYLE and self.index.matches(query, entry.text):
+                    hits.append(doc_id - dropped)
+        for doc_id in self.index.search(query, before=min(end, self.next_id)):
+            if len(hits) >= limit or doc_id < dropped:
+                break
+            hits.append(doc_id - dropped)
+        return hits[:limit]
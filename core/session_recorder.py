@@ -0,0 +1,157 @@
+# core/session_recorder.py
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+class SessionLog:
+    """
+    Compact, gzip'd JSON recording of one play session.
+
+    Frames are rows [dt_ms, repeat, command, events]; trailing empty fields
+    are dropped and consecutive identical idle frames are merged by bumping
+    'repeat', so a steady 60 FPS idle stretch costs one row.
+
+    Events are the async results the frame consumed, replayed verbatim:
+    ["audio", type, job_kind, data] and ["save", type, slot_name, data].
+
+    'saves' holds the save directory as it was when recording started
+    (filename -> base64 contents), so 'load'/'slots' replay against the
+    same slots no matter what is on disk later. 'save_mtimes' keeps each
+    file's mtime (ns): saved_at comes from it, and 'slots' sorts by it.
+
+    'transcript' records whether the session kept a scrollback transcript
+    (TRANSCRIPT_PATH): with one, a load's scrollback differs, so replay
+    attaches a scratch one.
+    """
+    FORMAT_VERSION = 2
+
+    def __init__(self, seed: int, start_scene: str, fps: int, transcript: bool = False):
+        self.seed = seed
+        self.start_scene = start_scene
+        self.fps = fps
+        self.transcript = transcript
+        self.rows: List[list] = []
+        self.final_digest: Optional[str] = None
+        self.saves: Dict[str, str] = {}
+        self.save_mtimes: Dict[str, int] = {}
+
+    def snapshot_saves(self, save_dir: str):
+        """Captures every save file (snapshots, journals, slot index) in save_dir."""
+        self.saves = {}
+        self.save_mtimes = {}
+        if not os.path.isdir(save_dir):
+            return
+        for entry in sorted(os.scandir(save_dir), key=lambda e: e.name):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                with open(entry.path, 'rb') as f:
+                    self.saves[entry.name] = base64.b64encode(f.read()).decode('ascii')
+                self.save_mtimes[entry.name] = entry.stat().st_mtime_ns
+
+    def restore_saves(self, save_dir: str):
+        """Writes the captured save files into save_dir."""
+        os.makedirs(save_dir, exist_ok=True)
+        for name, blob in self.saves.items():
+            path = os.path.join(save_dir, name)
+            with open(path, 'wb') as f:
+                f.write(base64.b64decode(blob))
+            if name in self.save_mtimes:
+                # Fresh mtimes would reorder the slot list
+                os.utime(path, ns=(self.save_mtimes[name], self.save_mtimes[name]))
+
+    def add_frame(self, dt_ms: int, command: Optional[str], events: List[list]):
+        if command is None and not events:
+            last = self.rows[-1] if self.rows else None
+            if last and len(last) == 2 and last[0] == dt_ms:
+                last[1] += 1
+                return
+            self.rows.append([dt_ms, 1])
+            return
+        row: list = [dt_ms, 1, command]
+        if events:
+            row.append(events)
+        self.rows.append(row)
+
+    def frames(self) -> Iterator[Tuple[int, Optional[str], List[list]]]:
+        """Expands rows back into (dt_ms, command, events) per frame."""
+        for row in self.rows:
+            dt_ms, repeat = row[0], row[1]
+            command = row[2] if len(row) > 2 else None
+            events = row[3] if len(row) > 3 else []
+            yield dt_ms, command, events
+            for _ in range(repeat - 1):
+                yield dt_ms, None, []
+
+    def frame_count(self) -> int:
+        return sum(row[1] for row in self.rows)
+
+    def save(self, path: str):
+        data = {
+            "version": self.FORMAT_VERSION,
+            "seed": self.seed,
+            "start_scene": self.start_scene,
+            "fps": self.fps,
+            "transcript": self.transcript,
+            "final_digest": self.final_digest,
+            "saves": self.saves,
+            "save_mtimes": self.save_mtimes,
+            "rows": self.rows,
+        }
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    @staticmethod
+    def state_digest(game_state) -> str:
+        """Stable fingerprint of game-relevant state (ignores wall-clock timestamps)."""
+        h = hashlib.sha256()
+        h.update(json.dumps({
+            "scene": game_state.current_scene_id,
+            "cursor": game_state.scene_cursor,
+            "mode": game_state.mode,
+            "hp": game_state.hp,
+            "flags": dict(game_state.flags),
+            "inventory": dict(game_state.inventory),
+            "quests": dict(game_state.quests),
+            "combat": game_state.combat.to_dict(),
+        }, sort_keys=True, default=str).encode('utf-8'))
+        for entry in game_state.history:
+            h.update(f"{entry.channel}\x00{entry.text}\x01".encode('utf-8'))
+        return h.hexdigest()
+
+    @staticmethod
+    def load(path: str) -> 'SessionLog':
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") not in (1, SessionLog.FORMAT_VERSION):
+            raise ValueError(f"Unsupported recording version: {data.get('version')}")
+        log = SessionLog(data["seed"], data["start_scene"], data.get("fps", 60), data.get("transcript", False))
+        log.rows = data["rows"]
+        log.final_digest = data.get("final_digest")
+        log.saves = data.get("saves", {})  # v1 recordings replay against no saves
+        log.save_mtimes = data.get("save_mtimes", {})
+        return log
+
+class SessionRecorder:
+    """Main-thread recorder: call record_frame() once per loop iteration."""
+    def __init__(self, seed: int, start_scene: str, fps: int, save_dir: str = None, transcript: bool = False):
+        self.log = SessionLog(seed, start_scene, fps, transcript)
+        if save_dir:
+            self.log.snapshot_saves(save_dir)
+
+    def record_frame(self, dt_ms: int, command: Optional[str], audio_events: list, save_events: list):
+        # STARTED events don't touch game state; keep only what replay needs
+        events = [["audio", ae.type, ae.job.kind, self._plain(ae.data)] for ae in audio_events if ae.type != "STARTED"]
+        events += [["save", se.type, se.slot_name, self._plain(se.data)] for se in save_events]
+        self.log.add_frame(dt_ms, command, events)
+
+    @staticmethod
+    def _plain(data: Any) -> Any:
+        return data if isinstance(data, (str, int, float, type(None))) else str(data)
+
+    def finish(self, path: str, game_state):
+        self.log.final_digest = SessionLog.state_digest(game_state)
+        self.log.save(path)
+        print(f"[SessionRecorder] {self.log.frame_count()} frames -> {path}")
@@ -0,0 +1,128 @@
+# core/sfx_bank.py
+
+import json
+import os
+import struct
+from typing import Dict, Optional, Tuple
+from core.config import GlobalConfig
+from core.sfx_library import SFXLibrary
+
+class SFXBank:
+    """
+    Every file in SFX_DIR decoded once and packed into a single PCM file in
+    the mixer's format, with an offset index. At startup the bank is read in
+    one go and sliced into Sound objects, so triggering an effect is a dict
+    lookup: no stat(), no decode, no worker round trip.
+    Layout: MAGIC | u32 header length | JSON header | PCM data.
+    Header: {"format": [freq, size, channels], "sources": {filename: mtime_ns},
+             "sounds": {sfx_id: [offset, length]}}
+    """
+    MAGIC = b"RASFX001"
+    HEADER_LEN = struct.Struct("<I")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f"Not an SFX bank: {path}")
+        start = len(self.MAGIC)
+        if len(data) < start + self.HEADER_LEN.size:
+            raise ValueError(f"Truncated SFX bank: {path}")
+        (header_len,) = self.HEADER_LEN.unpack_from(data, start)
+        start += self.HEADER_LEN.size
+        if len(data) < start + header_len:
+            raise ValueError(f"Truncated SFX bank: {path}")
+        header = json.loads(data[start:start + header_len].decode('utf-8'))
+        self.format: Tuple[int, int, int] = tuple(header["format"])
+        self.sources: Dict[str, int] = header["sources"]
+        self.sounds: Dict[str, Tuple[int, int]] = {k: tuple(v) for k, v in header["sounds"].items()}
+        self._pcm = memoryview(data)[start + header_len:]
+        if any(offset + length > len(self._pcm) for offset, length in self.sounds.values()):
+            raise ValueError(f"Truncated SFX bank: {path}")
+
+    def pcm(self, sfx_id: str) -> Optional[memoryview]:
+        entry = self.sounds.get(sfx_id)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._pcm[offset:offset + length]
+
+    # --- Build ---
+
+    @staticmethod
+    def source_files(sfx_dir: str) -> Dict[str, int]:
+        """filename -> mtime_ns of every audio file in sfx_dir."""
+        files = {}
+        if os.path.isdir(sfx_dir):
+            for entry in os.scandir(sfx_dir):
+                if entry.is_file() and entry.name.lower().endswith((".wav", ".ogg", ".mp3", ".flac")):
+                    files[entry.name] = entry.stat().st_mtime_ns
+        return files
+
+    @classmethod
+    def open_current(cls, path: str, sfx_dir: str, mixer_format: Tuple[int, int, int]) -> Optional["SFXBank"]:
+        """The bank at path, read once, if it is intact and matches sfx_dir and the mixer format; else None."""
+        try:
+            bank = cls(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if bank.format != tuple(mixer_format) or bank.sources != cls.source_files(sfx_dir):
+            return None
+        return bank
+
+    @classmethod
+    def build(cls, config: GlobalConfig, path: str) -> int:
+        """
+        Packs SFX_DIR into a bank at path (written atomically), decoded and
+        converted by the open mixer. Main thread only. Returns the number of
+        files packed; each is reachable by its registry id(s), filename and stem.
+        """
+        import pygame
+        sources = cls.source_files(config.SFX_DIR)
+        aliases: Dict[str, list] = {}
+        for sfx_id, filename in SFXLibrary(config).registry.items():
+            aliases.setdefault(filename, []).append(sfx_id)
+
+        chunks = []
+        sounds = {}
+        offset = 0
+        for filename in sorted(sources):
+            try:
+                raw = pygame.mixer.Sound(os.path.join(config.SFX_DIR, filename)).get_raw()
+            except pygame.error as e:
+                print(f"[SFXBank] Skipping {filename}: {e}")
+                continue
+            stem = os.path.splitext(filename)[0]
+            for sfx_id in [filename, stem] + aliases.get(filename, []):
+                sounds.setdefault(sfx_id, [offset, len(raw)])
+            chunks.append(raw)
+            offset += len(raw)
+
+        header = json.dumps({
+            "format": list(pygame.mixer.get_init()),
+            "sources": sources,
+            "sounds": sounds,
+        }, separators=(',', ':')).encode('utf-8')
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.MAGIC)
+            f.write(cls.HEADER_LEN.pack(len(header)))
+            f.write(header)
+            for raw in chunks:
+                f.write(raw)
+        os.replace(tmp_path, path)
+        return len(chunks)
+
+def load_sounds(bank: SFXBank, sound_factory) -> Dict[str, object]:
+    """Slices the bank into sounds (sound_factory(buffer) -> Sound), one object per file shared by its ids."""
+    by_offset = {}
+    sounds = {}
+    for sfx_id, entry in bank.sounds.items():
+        sound = by_offset.get(entry)
+        if sound is None:
+            sound = by_offset[entry] = sound_factory(bank.pcm(sfx_id))
+        sounds[sfx_id] = sound
+    return sounds
@@ -0,0 +1,87 @@
+# core/startup_profiler.py
+
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+class StartupProfiler:
+    """
+    Breaks time-to-first-frame down by named startup phases.
+    Phases after the first frame are reported separately as 'deferred'.
+
+    The clock starts when this module is imported (main.py imports it
+    before pygame and the game modules), so those imports are their own
+    'imports' phase. Where the OS reports the process start time (Linux
+    /proc), interpreter startup before that is the 'interpreter' phase.
+    """
+    # main.py imports this module first, so this is before the heavy imports
+    IMPORT_TIME = time.perf_counter()
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.start_time = self.IMPORT_TIME
+        self.first_frame_time: float | None = None
+        self.phases: List[Tuple[str, float, bool]] = []  # (name, ms, deferred)
+        if not enabled:
+            return
+
+        now = time.perf_counter()
+        imports_ms = (now - self.IMPORT_TIME) * 1000.0
+        process_age_ms = self._process_age_ms()
+        if process_age_ms is not None and process_age_ms > imports_ms:
+            interpreter_ms = process_age_ms - imports_ms
+            self.start_time = self.IMPORT_TIME - interpreter_ms / 1000.0
+            self.phases.append(("interpreter", interpreter_ms, False))
+        self.phases.append(("imports", imports_ms, False))
+
+    @staticmethod
+    def _process_age_ms() -> Optional[float]:
+        """Time since the process started (10 ms resolution), or None where /proc is missing."""
+        try:
+            with open("/proc/self/stat", 'r') as f:
+                # Field 22 (starttime, clock ticks after boot); comm (field 2) may contain spaces
+                start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+            with open("/proc/uptime", 'r') as f:
+                uptime_s = float(f.read().split()[0])
+            return (uptime_s - start_ticks / os.sysconf("SC_CLK_TCK")) * 1000.0
+        except (OSError, ValueError, IndexError):
+            return None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times the wrapped block and records it under 'name'."""
+        if not self.enabled:
+            yield
+            return
+
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            self.phases.append((name, elapsed_ms, self.first_frame_time is not None))
+
+    def mark_first_frame(self):
+        """Call right after the first display.flip()."""
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter()
+
+    def time_to_first_frame_ms(self) -> float | None:
+        if self.first_frame_time is None:
+            return None
+        return (self.first_frame_time - self.start_time) * 1000.0
+
+    def report(self):
+        """Prints a phase breakdown to stdout."""
+        if not self.enabled:
+            return
+
+        print("[Startup] Phase breakdown:")
+        for name, ms, deferred in self.phases:
+            tag = " (deferred)" if deferred else ""
+            print(f"[Startup]   {name:<24} {ms:8.1f} ms{tag}")
+
+        ttff = self.time_to_first_frame_ms()
+        if ttff is not None:
+            print(f"[Startup] Time to first frame: {ttff:.1f} ms")
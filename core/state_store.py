@@ -0,0 +1,165 @@
+# core/state_store.py
+
+import bisect
+import itertools
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Subscriber signature: callback(kind, key, old, new). old/new are MISSING
+# when the key did not exist before / was deleted.
+MISSING = object()
+
+class GroupIndex:
+    """value -> set of keys, e.g. quest status -> quest ids."""
+    def __init__(self):
+        self.groups: Dict[Hashable, Set[str]] = {}
+
+    def update(self, key: str, old: Any, new: Any):
+        if old is not MISSING:
+            group = self.groups.get(old)
+            if group is not None:
+                group.discard(key)
+                if not group:
+                    del self.groups[old]
+        if new is not MISSING:
+            self.groups.setdefault(new, set()).add(key)
+
+    def get(self, value: Hashable) -> Set[str]:
+        return self.groups.get(value, set())
+
+class RangeIndex:
+    """Keys sorted by a numeric value, for "value >= n" queries, e.g. items by quantity."""
+    def __init__(self):
+        self.entries: List[Tuple[float, str]] = []
+
+    def update(self, key: str, old: Any, new: Any):
+        if old is not MISSING:
+            i = bisect.bisect_left(self.entries, (old, key))
+            if i < len(self.entries) and self.entries[i] == (old, key):
+                del self.entries[i]
+        if new is not MISSING:
+            bisect.insort(self.entries, (new, key))
+
+    def at_least(self, value: float) -> List[str]:
+        start = bisect.bisect_left(self.entries, (value, ""))
+        return [key for _, key in self.entries[start:]]
+
+class StateStore:
+    """
+    Keyed game state ("flag", "item", "quest", ...) with change tracking.
+    Every write bumps `version` and appends (version, kind, key) to `log`;
+    subscribers and secondary indexes see (old, new) for each change, so
+    consumers react to deltas instead of rescanning the dicts.
+    """
+    def __init__(self, kinds: Iterable[str], log_limit: int = 4096):
+        self.data: Dict[str, Dict[str, Any]] = {kind: {} for kind in kinds}
+        self.version: int = 0
+        self.log: List[Tuple[int, str, str]] = []  # (version, kind, key)
+        self.log_floor: int = 0  # versions before this predate a reset_log()
+        self.log_limit = log_limit
+
+        self.indexes: Dict[str, Tuple[str, Any]] = {}          # name -> (kind, index)
+        self._subscribers: Dict[Tuple[str, Optional[str]], Dict[int, Callable]] = {}
+        self._tokens = itertools.count(1)
+        self._token_keys: Dict[int, Tuple[str, Optional[str]]] = {}
+
+    # --- Reads ---
+
+    def get(self, kind: str, key: str, default: Any = None) -> Any:
+        return self.data[kind].get(key, default)
+
+    # --- Writes ---
+
+    def set(self, kind: str, key: str, value: Any):
+        store = self.data[kind]
+        old = store.get(key, MISSING)
+        if old is not MISSING and old == value and type(old) is type(value):
+            return  # no change: nothing to log or announce
+        store[key] = value
+        self._changed(kind, key, old, value)
+
+    def delete(self, kind: str, key: str):
+        old = self.data[kind].pop(key, MISSING)
+        if old is not MISSING:
+            self._changed(kind, key, old, MISSING)
+
+    def replace(self, kind: str, values: Dict[str, Any]):
+        """Swaps in a whole mapping (e.g. on load), announcing only keys that differ."""
+        for key in [k for k in self.data[kind] if k not in values]:
+            self.delete(kind, key)
+        for key, value in values.items():
+            self.set(kind, key, value)
+
+    def _changed(self, kind: str, key: str, old: Any, new: Any):
+        self.version += 1
+        self.log.append((self.version, kind, key))
+        if len(self.log) > self.log_limit:
+            # Drop the oldest half; changes_since() then reports the gap
+            del self.log[:len(self.log) // 2]
+
+        for index_kind, index in self.indexes.values():
+            if index_kind == kind:
+                index.update(key, old, new)
+        for subscription in (self._subscribers.get((kind, key)), self._subscribers.get((kind, None))):
+            if subscription:
+                for callback in list(subscription.values()):
+                    callback(kind, key, old, new)
+
+    # --- Change Feed ---
+
+    def changes_since(self, version: int) -> Optional[List[Tuple[int, str, str]]]:
+        """
+        Log entries after `version`, oldest first. Returns None if the log
+        was truncated past that point, or if `version` is from before the
+        last reset_log() (caller must fall back to a full scan).
+        """
+        if version < self.log_floor or version > self.version or (self.log and version < self.log[0][0] - 1):
+            return None
+        start = bisect.bisect_right(self.log, (version, "\uffff", ""))
+        return self.log[start:]
+
+    def changed_keys_since(self, version: int) -> Optional[Dict[str, Set[str]]]:
+        changes = self.changes_since(version)
+        if changes is None:
+            return None
+        keys: Dict[str, Set[str]] = {}
+        for _, kind, key in changes:
+            keys.setdefault(kind, set()).add(key)
+        return keys
+
+    def reset_log(self):
+        """
+        Starts a fresh feed (after a load the old changes mean nothing).
+        `version` keeps counting up, so a version taken before the reset
+        is never mistaken for one after it.
+        """
+        self.log_floor = self.version
+        self.log = []
+
+    # --- Subscriptions ---
+
+    def subscribe(self, kind: str, key: Optional[str], callback: Callable) -> int:
+        """Calls callback(kind, key, old, new) on changes to one key, or to any key of kind if key is None."""
+        token = next(self._tokens)
+        self._subscribers.setdefault((kind, key), {})[token] = callback
+        self._token_keys[token] = (kind, key)
+        return token
+
+    def unsubscribe(self, token: int):
+        target = self._token_keys.pop(token, None)
+        if target:
+            subscription = self._subscribers[target]
+            subscription.pop(token, None)
+            if not subscription:
+                del self._subscribers[target]
+
+    # --- Secondary Indexes ---
+
+    def add_index(self, name: str, kind: str, index):
+        """Registers a GroupIndex/RangeIndex over one kind and fills it from current values."""
+        for key, value in self.data[kind].items():
+            index.update(key, MISSING, value)
+        self.indexes[name] = (kind, index)
+        return index
+
+    def index(self, name: str):
+        return self.indexes[name][1]
@@ -0,0 +1,122 @@
+# core/transcript.py
+
+import json
+import mmap
+import os
+from array import array
+from collections import OrderedDict
+from typing import Iterable, List
+from core.models import LogEntry
+
+class Transcript:
+    """
+    Append-only, disk-backed session log for entries that have left
+    GameState.history (a load may cut lines off the end, see truncate()).
+    Records are JSON lines; their byte offsets are kept in a compact array
+    so any entry can be found without scanning, and reads go through an
+    mmap of the file. Decoded entries are cached a page at a time, so only
+    the pages being looked at stay in memory.
+    """
+    PAGE_SIZE = 64      # entries decoded together
+    CACHED_PAGES = 8
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        # One transcript per run: the file starts empty
+        self._file = open(path, 'w+b')
+        self._offsets = array('Q', [0])  # offsets[i] = start of record i; offsets[-1] = end of file
+        self._dirty = False
+        self._map: mmap.mmap = None
+        self._pages: "OrderedDict[int, List[LogEntry]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    # --- Writing ---
+
+    def append(self, entry: LogEntry):
+        record = json.dumps([entry.channel, entry.text, entry.timestamp, entry.style],
+                            ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b"\n"
+        self._file.write(record)
+        self._offsets.append(self._offsets[-1] + len(record))
+        self._dirty = True
+
+        # A partly filled last page is now stale
+        self._pages.pop((len(self) - 1) // self.PAGE_SIZE, None)
+
+    def extend(self, entries: Iterable[LogEntry]):
+        for entry in entries:
+            self.append(entry)
+
+    def truncate(self, count: int):
+        """Drops entries from index `count` on: lines a loaded save brings back into the window."""
+        if count >= len(self):
+            return
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        del self._offsets[count + 1:]
+        self._file.flush()
+        self._file.truncate(self._offsets[-1])
+        self._file.seek(self._offsets[-1])
+        self._dirty = False
+        for page_no in [p for p in self._pages if p >= count // self.PAGE_SIZE]:
+            del self._pages[page_no]
+
+    # --- Reading ---
+
+    def _mapped(self) -> mmap.mmap:
+        end = self._offsets[-1]
+        if self._dirty:
+            self._file.flush()
+            self._dirty = False
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _page(self, page_no: int) -> List[LogEntry]:
+        page = self._pages.get(page_no)
+        if page is not None:
+            self._pages.move_to_end(page_no)
+            return page
+
+        start = page_no * self.PAGE_SIZE
+        stop = min(start + self.PAGE_SIZE, len(self))
+        data = self._mapped()[self._offsets[start]:self._offsets[stop]]
+        page = []
+        for line in data.splitlines():
+            channel, text, timestamp, style = json.loads(line)
+            page.append(LogEntry(text=text, channel=channel, timestamp=timestamp, style=style))
+
+        self._pages[page_no] = page
+        if len(self._pages) > self.CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def get(self, index: int) -> LogEntry:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._page(index // self.PAGE_SIZE)[index % self.PAGE_SIZE]
+
+    def read(self, start: int, count: int) -> List[LogEntry]:
+        """Entries [start, start + count), clipped to what exists."""
+        stop = min(start + count, len(self))
+        start = max(0, start)
+        entries = []
+        while start < stop:
+            page_no, first = divmod(start, self.PAGE_SIZE)
+            page = self._page(page_no)
+            take = min(stop - start, len(page) - first)
+            entries.extend(page[first:first + take])
+            start += take
+        return entries
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
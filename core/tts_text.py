@@ -0,0 +1,107 @@
+# core/tts_text.py
+
+import re
+import unicodedata
+from typing import List
+
+# Typographic variants that are spoken the same as their ASCII forms
+_TRANSLATE = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"',
+    "\u2013": "-", "\u2014": " - ", "\u2026": "...", "\u00a0": " ",
+})
+_SPACES = re.compile(r"\s+")
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+([,.!?;:])")
+_REPEATED_PUNCT = re.compile(r"([!?])\1+|\.{4,}")
+_CAPS_WORD = re.compile(r"\b[A-Z][A-Z']{3,}\b")
+_LETTER_WORD = re.compile(r"[BCDFGHJKLMNPQRSTVWXZ]+", re.IGNORECASE)  # no vowels: read as letters (HTML, BPM)
+# Short words that are never acronyms: sentence-cased with the rest of a shouted sentence
+_FUNCTION_WORD = re.compile(r"\b(?:A|AM|AN|AND|ARE|AS|AT|BE|BUT|BY|DID|DO|FOR|HAS|HAD|HE|HER|HIS|IN|IS|"
+                            r"ITS|ME|MY|NO|NOT|OF|ON|OR|OUR|SHE|SO|THE|TO|WAS|WE|YES|YOU)\b")
+# Closing quotes/brackets belong to the sentence they end: 'He said "STOP." Then'
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(\s+)(?=\S)")
+_LAST_WORD = re.compile(r"(\S+)$")
+# A period after these does not end a sentence
+_ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "st", "sr", "jr", "mt", "vs", "etc",
+    "lt", "sgt", "capt", "cpt", "col", "gen", "cmdr", "e.g", "i.e", "approx",
+})
+
+def _title_word(match: re.Match) -> str:
+    word = match.group(0)
+    return word if _LETTER_WORD.fullmatch(word) else word.capitalize()
+
+def _lower_word(match: re.Match) -> str:
+    word = match.group(0)
+    return word if _LETTER_WORD.fullmatch(word) else word.lower()
+
+def _sentences(text: str) -> List[str]:
+    """
+    Splits after . ! or ? (and any closing quotes or brackets) followed by
+    whitespace, except after an ellipsis (a pause, not an end), a known
+    abbreviation (Mr., Dr., e.g.), "No." before a number, or a
+    single-letter initial (J. Smith).
+    """
+    parts = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.start(1)
+        if text[match.start()] == ".":
+            if text[max(0, match.start() - 2):match.start() + 1] == "...":
+                continue
+            word = _LAST_WORD.search(text, start, match.start())
+            word = word.group(1).lower().lstrip("(\"'") if word else ""
+            if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                continue
+            if word == "no" and text[match.end():match.end() + 1].isdigit():
+                continue
+        parts.append(text[start:end])
+        start = match.end()
+    parts.append(text[start:])
+    return [part for part in parts if part]
+
+def _case_sentence(sentence: str) -> str:
+    """
+    Words of 4+ letters are shouting, anything shorter may be an acronym
+    (CPU, ID, AI) and keeps its case. Vowel-less words (HTML) are read as
+    letters and always keep their case. In a fully upper-case sentence the
+    long words and short function words (THE, IS, AT) are lower-cased and
+    the first letter is capitalized; in a mixed-case sentence the long
+    words are title-cased. Either way the result is left as is by a second
+    pass, so normalizing normalized text changes nothing.
+    """
+    if any(c.islower() for c in sentence):
+        return _CAPS_WORD.sub(_title_word, sentence)
+    sentence = _CAPS_WORD.sub(_lower_word, sentence)
+    sentence = _FUNCTION_WORD.sub(lambda m: m.group(0).lower(), sentence)
+    for i, c in enumerate(sentence):
+        if c.isalpha():
+            return sentence[:i] + c.upper() + sentence[i + 1:]
+    return sentence
+
+def normalize_tts_text(text: str) -> str:
+    """
+    Canonical form of a line for TTS, so lines that would be spoken the
+    same share one cache key (and one paid synthesis):
+      - Unicode NFKC, typographic quotes/dashes/ellipsis -> ASCII
+      - whitespace collapsed, none before punctuation
+      - shouted words of 4+ letters lose their caps: lower-cased in an
+        all-caps sentence, which is then capitalized ("WARNING: CPU AT 99"
+        -> "Warning: CPU at 99."), title-cased in a mixed-case one; words
+        of 1-3 letters (CPU, ID) and vowel-less ones (HTML) keep their case,
+        except short function words in an all-caps sentence
+      - idempotent: normalize_tts_text(normalize_tts_text(t)) == normalize_tts_text(t)
+      - repeated ! or ? collapsed; a final period added after a closing
+        letter or digit (not after other symbols: "99%" stays as is)
+    """
+    text = unicodedata.normalize("NFKC", text).translate(_TRANSLATE)
+    text = _SPACES.sub(" ", text).strip()
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", text)
+    text = _REPEATED_PUNCT.sub(lambda m: m.group(1) or "...", text)
+    text = " ".join(_case_sentence(sentence) for sentence in _sentences(text))
+    if text and text[-1].isalnum():
+        text += "."
+    return text
+
+def split_phrases(text: str) -> List[str]:
+    """Sentences of a (normalized) line, each synthesized and cached on its own."""
+    return _sentences(text)
@@ -1,46 +1,121 @@
 # main.py
 
 import sys
+# First, so the startup clock covers the imports below
+from core.startup_profiler import StartupProfiler
 import pygame
 from core.config import GlobalConfig
-from core.models import GameState, UIState
+from core.models import UIState
 from core.input_engine import InputEngine
 from core.render_engine import RenderEngine
 from core.audio_engine import AudioEngine 
 from core.audio_player import AudioPlayer
 from core.save_system import SaveSystem
-from story.scene_runner import SceneRunner
+from core.fixed_timestep import FixedTimestep
+from core.frame_profiler import FrameProfiler
+from core.session_recorder import SessionRecorder
+from core.transcript import Transcript
+from story.game_session import GameSession
+from story.scene_watcher import SceneWatcher
 
 def main():
+    config = GlobalConfig()
+    profiler = StartupProfiler(enabled=config.STARTUP_PROFILING)
+
     # 1. Setup
-    pygame.init() # This inits display, font, etc.
+    with profiler.phase("pygame_init"):
+        pygame.init() # This inits display, font, etc.
     # Mixer is inited inside AudioPlayer to keep config centralized, 
     # but strictly called here on Main Thread.
     
-    config = GlobalConfig()
-    screen = pygame.display.set_mode((config.WIDTH, config.HEIGHT))
-    pygame.display.set_caption("ROOT ACCESS")
-    pygame.key.set_repeat(500, 50)
+    with profiler.phase("display"):
+        screen = pygame.display.set_mode((config.WIDTH, config.HEIGHT))
+        pygame.display.set_caption("ROOT ACCESS")
+        pygame.key.set_repeat(500, 50)
     clock = pygame.time.Clock()
     
     # 2. Instantiate Systems
-    game_state = GameState(config)
     ui_state = UIState()
     input_engine = InputEngine(config)
-    render_engine = RenderEngine(config)
-    save_system = SaveSystem()
+    with profiler.phase("render_engine"):
+        render_engine = RenderEngine(config, defer_post_fx=True)
+    save_system = SaveSystem(compact_every=config.SAVE_JOURNAL_COMPACT_EVERY, codec=config.SAVE_CODEC)
     
     # Audio Systems
-    audio_player = AudioPlayer(config)    # <--- NEW (Main Thread)
-    audio_engine = AudioEngine(config)    # <--- (Worker Thread)
+    with profiler.phase("audio_engine"):
+        audio_player = AudioPlayer(config, defer_init=True)    # <--- NEW (Main Thread)
+        audio_engine = AudioEngine(config)    # <--- (Worker Thread, backend built lazily)
     
-    scene_runner = SceneRunner(game_state, audio_engine)
-    scene_runner.load("main_menu")
+    with profiler.phase("scene_load"):
+        session = GameSession(config, audio_engine, save_system, seed=config.RNG_SEED)
+        game_state = session.game_state
+        input_engine.completer = session.complete_command
+        if config.TRANSCRIPT_PATH:
+            game_state.transcript = Transcript(config.TRANSCRIPT_PATH)
+
+    scene_watcher = None
+    if config.DEV_HOT_RELOAD:
+        scene_watcher = SceneWatcher(session.scene_runner.loader.scenes_dir, config.HOT_RELOAD_POLL_S)
+        scene_watcher.start()
+
+    recorder = None
+    if config.RECORD_SESSION_PATH:
+        recorder = SessionRecorder(session.seed, session.start_scene, 1000 // config.SIM_TICK_MS,
+                                   save_dir=save_system.save_dir, transcript=game_state.transcript is not None)
+
+    # Show the window before the slow, non-critical setup
+    with profiler.phase("first_frame"):
+        render_engine.render(screen, game_state, ui_state)
+        pygame.display.flip()
+    profiler.mark_first_frame()
+
+    # Non-critical subsystems finish one per frame after the window is up
+    held_traces = []  # jobs played before the mixer opened: not decoded yet
+
+    def init_mixer():
+        audio_player.init_mixer()
+        for job in held_traces:
+            audio_engine.complete_trace(job)
+        held_traces.clear()
+
+    def init_sfx_bank():
+        # Banked effects are played straight from SceneRunner triggers, not via the worker
+        audio_player.load_sfx_bank()
+        session.scene_runner.local_sfx = frozenset(audio_player.sfx_sounds)
+
+    deferred_init = [
+        ("mixer_init", init_mixer),
+        ("sfx_bank", init_sfx_bank),
+        ("crt_post_fx", render_engine.init_post_fx),
+    ]
+
+    frame_profiler = FrameProfiler(
+        config.FPS,
+        enabled=config.FRAME_PROFILING,
+        window=config.FRAME_PROFILE_WINDOW,
+        hitch_factor=config.FRAME_HITCH_FACTOR
+    )
+    overlay_refresh_ms = 0
+
+    # Game logic runs in fixed ticks; rendering runs at FPS, or IDLE_FPS
+    # while nothing is happening
+    sim_clock = FixedTimestep(config.SIM_TICK_MS, config.MAX_SIM_TICKS_PER_FRAME)
+    pending_commands = []
+    idle_ms = 0
 
     running = True
     
     while running:
-        dt_ms = clock.tick(config.FPS)
+        frame_fps = config.IDLE_FPS if idle_ms >= config.IDLE_AFTER_MS else config.FPS
+        dt_ms = clock.tick(frame_fps)
+        frame_profiler.begin_frame(frame_fps)
+
+        if deferred_init:
+            name, init_fn = deferred_init.pop(0)
+            with profiler.phase(name):
+                init_fn()
+            if not deferred_init:
+                profiler.report()
 
         # Input
         events = pygame.event.get()
@@ -50,48 +125,112 @@ def main():
         
         command = input_engine.process_events(events, game_state, ui_state)
         input_engine.update(dt_ms, ui_state)
-        
         if command:
-            # Echo input
-            game_state.append_history(f"> {command}", channel="terminal")
-            
-            # Meta Commands
-            cmd_lower = command.lower()
-            if cmd_lower == "save":
-                if save_system.save_game(game_state):
-                    game_state.append_history("GAME SAVED [save1.json]", channel="system")
-            elif cmd_lower == "load":
-                if save_system.load_game(game_state):
-                    scene_runner.resume()
-                    game_state.append_history("GAME LOADED [save1.json]", channel="system")
-            elif cmd_lower in ["quit", "exit"]:
-                running = False
-            
-            # Story Update
-            scene_runner.update(dt_ms, latest_command=command)
-        else:
-            scene_runner.update(dt_ms)
+            pending_commands.append(command)  # consumed by the next tick (one per tick)
 
-        # --- AUDIO PIPELINE ---
-        audio_events = audio_engine.poll_events()
-        for ae in audio_events:
-            if ae.type == "AUDIO_READY":
-                
-                # Check Kind
-                if ae.job.kind == "sfx":
-                    audio_player.play_sfx(ae.data)
-                else:
-                    # Assume TTS
-                    audio_player.play_voice(ae.data)
+        # --- PERF OVERLAY (F3) ---
+        if ui_state.perf_overlay_visible != frame_profiler.enabled and not config.FRAME_PROFILING:
+            frame_profiler.set_enabled(ui_state.perf_overlay_visible)
+        if ui_state.perf_overlay_visible:
+            overlay_refresh_ms -= dt_ms
+            if overlay_refresh_ms <= 0:
+                ui_state.perf_overlay_lines = frame_profiler.overlay_lines()
+                overlay_refresh_ms = 250
+        frame_profiler.lap("input")
+
+        # --- SIMULATION (fixed ticks) ---
+        for _ in range(sim_clock.advance(dt_ms)):
+            command = pending_commands.pop(0) if pending_commands else None
+            session.step(config.SIM_TICK_MS, command)
+            frame_profiler.lap("scene")
+
+            # --- AUDIO PIPELINE ---
+            audio_events = audio_engine.poll_events()
+            for ae in audio_events:
+                if ae.type == "AUDIO_READY":
+                    
+                    # Check Kind
+                    if ae.job.kind == "sfx":
+                        audio_player.play_sfx(ae.data, trace=ae.job.trace)
+                    else:
+                        # Assume TTS
+                        audio_player.play_voice(ae.data, trace=ae.job.trace, queued=ae.job.segment > 0)
+                    if audio_player.holding_plays:
+                        held_traces.append(ae.job)  # closed by init_mixer, once decoded
+                    else:
+                        audio_engine.complete_trace(ae.job)
                 
-            elif ae.type == "ERROR":
-                game_state.append_history(f"[Audio Error] {ae.data}", channel="error")
+                session.apply_audio_event(ae)
+            frame_profiler.lap("audio")
+
+            # --- SAVE PIPELINE ---
+            save_events = save_system.poll_events()
+            for se in save_events:
+                session.apply_save_event(se)
+
+            # Ticks are what replay steps through
+            if recorder:
+                recorder.record_frame(config.SIM_TICK_MS, command, audio_events, save_events)
+            frame_profiler.lap("scene")
+
+        if session.quit_requested:
+            running = False
+        if session.scroll_request is not None:
+            # find: the renderer puts the match at the bottom of the view
+            ui_state.scroll_to_entry = session.scroll_request
+            session.scroll_request = None
+        # Typewriter text drawn alpha of a tick ahead, so reveal stays smooth between ticks
+        ui_state.typing_preview = session.scene_runner.typewriter_preview(sim_clock.alpha * config.SIM_TICK_MS / 1000.0)
+
+        # --- SCENE HOT RELOAD (dev) ---
+        scene_reloads = scene_watcher.poll() if scene_watcher else []
+        for reload in scene_reloads:
+            session.apply_scene_reload(reload)
+
+        # Idle: waiting at a prompt with no input
+        if events or game_state.mode != "terminal" or ui_state.typing_preview:
+            idle_ms = 0
+        else:
+            idle_ms += dt_ms
+        frame_profiler.lap("scene")
+
+        # --- LOCAL SFX (banked, no worker round trip) ---
+        for sfx_id in session.scene_runner.sfx_triggers:
+            audio_player.trigger_sfx(sfx_id)
+        session.scene_runner.sfx_triggers.clear()
+        # Typewriter clicks on the runner's reveal schedule, up to the drawn (preview) time
+        runner = session.scene_runner
+        if runner.typewriter_clicks:
+            audio_player.queue_typewriter(runner.typewriter_sfx, runner.typewriter_clicks)
+            runner.typewriter_clicks.clear()
+        audio_player.play_typewriter(runner.clock_s + sim_clock.alpha * config.SIM_TICK_MS / 1000.0)
+        audio_player.update()
+        frame_profiler.lap("audio")
 
         # 2. Render
         render_engine.render(screen, game_state, ui_state)
+        frame_profiler.lap("render")
         pygame.display.flip()
+        frame_profiler.lap("flip")
+
+        for reload in scene_reloads:
+            latency_ms = scene_watcher.mark_displayed(reload)
+            print(f"[SceneWatcher] {reload.scene_id}: save -> screen {latency_ms:.0f} ms "
+                  f"(validate {reload.validate_ms:.1f} ms, {scene_watcher.backend})")
+
+    if config.FRAME_PROFILE_EXPORT and frame_profiler.frame_count:
+        frame_profiler.export_csv(config.FRAME_PROFILE_EXPORT + ".csv")
+        frame_profiler.export_json(config.FRAME_PROFILE_EXPORT + ".json")
+
+    if recorder:
+        recorder.finish(config.RECORD_SESSION_PATH, game_state)
 
+    if scene_watcher:
+        scene_watcher.shutdown()
     audio_engine.shutdown()
+    save_system.shutdown()
+    if game_state.transcript is not None:
+        game_state.transcript.close()
     pygame.quit()
     sys.exit()
 
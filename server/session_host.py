@@ -0,0 +1,376 @@
+# server/session_host.py
+#
+# Headless multi-session host: many independent GameSessions on one asyncio loop.
+#
+#   python -m server.session_host                    # 127.0.0.1:7777, 30 ticks/s, no audio
+#   python -m server.session_host --port 9000 --audio
+#
+# Line protocol (UTF-8, one message per line):
+#   client -> host   one command per line, exactly what a player would type.
+#                    "/stats" answers with host statistics, "/stats reset" clears them first.
+#   host -> client   one JSON object per line:
+#       {"t": "log",   "id": n, "ch": channel, "text": text}   new LogEntry (ids count up per session)
+#       {"t": "more",  "id": n, "text": suffix}                  text appended to line n (typewrite)
+#       {"t": "mode",  "mode": mode}                             GameState.mode changed
+#       {"t": "audio", "kind": kind, "file": name}               audio ready in the shared cache (--audio only)
+#       {"t": "stats", ...}                                      reply to "/stats"
+#       {"t": "error", "text": text}                             host-side failure; the connection closes
+#       {"t": "bye"}                                             session ended (quit/exit)
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+from core.config import GlobalConfig
+from core.audio_engine import AudioEngine, NullAudioEngine
+from core.audio_models import AudioJob
+from core.frame_profiler import SpanRing
+from story.game_session import GameSession
+from story.combat_engine import CombatEngine
+from story.story_loader import StoryLoader
+
+class RemoteClient:
+    """One connection: its GameSession, queued commands and stream cursor."""
+    MAX_QUEUED_COMMANDS = 64
+
+    def __init__(self, client_id: int, writer: asyncio.StreamWriter):
+        self.id = client_id
+        self.writer = writer
+        self.session: Optional[GameSession] = None
+        self.commands = deque(maxlen=self.MAX_QUEUED_COMMANDS)
+        self.closed = False
+
+        # Virtual clock: the session only ever sees its own elapsed time, so a
+        # late tick or a mid-tick join never hands it someone else's dt
+        self.clock_ms = 0
+        self.last_step = time.perf_counter()
+        self._carry_ms = 0.0
+
+        # Stream cursor into GameState.history
+        self.sent_seq = 0
+        self.growing = None   # [entry, id, chars sent] of the typewriter line, if sent
+        self.last_mode: Optional[str] = None
+
+    def send(self, msg: dict):
+        self.writer.write((json.dumps(msg, separators=(',', ':')) + "\n").encode('utf-8'))
+
+    def step(self, now: float):
+        # SceneRunner takes whole milliseconds (like clock.tick); carry the rest
+        self._carry_ms += (now - self.last_step) * 1000.0
+        self.last_step = now
+        dt_ms = int(self._carry_ms)
+        self._carry_ms -= dt_ms
+        self.clock_ms += dt_ms
+
+        command = self.commands.popleft() if self.commands else None
+        self.session.step(dt_ms, command)
+
+    def snapshot(self) -> dict:
+        """Plain-data state for moving this client to another host (see SessionHost.detach)."""
+        return {
+            "session": self.session.snapshot(),
+            "commands": list(self.commands),
+            "clock_ms": self.clock_ms,
+        }
+
+    def restore(self, snapshot: dict):
+        self.session.restore(snapshot["session"])
+        self.commands.extend(snapshot.get("commands", []))
+        self.clock_ms = snapshot.get("clock_ms", 0)
+
+        # The client already has the transcript; continue streaming after it
+        game_state = self.session.game_state
+        self.sent_seq = game_state.history_seq
+        self.growing = None
+        typing = self.session.scene_runner.current_log_entry
+        for offset in range(1, len(game_state.history) + 1):
+            if game_state.history[-offset] is typing:
+                self.growing = [typing, game_state.history_seq - offset + 1, len(typing.text)]
+                break
+        self.last_mode = game_state.mode
+
+    def flush(self):
+        """Sends everything the session produced since the last flush."""
+        game_state = self.session.game_state
+
+        # Typewrite keeps growing an entry after it was sent, even past later appends
+        if self.growing:
+            entry, entry_id, sent = self.growing
+            if len(entry.text) > sent:
+                self.send({"t": "more", "id": entry_id, "text": entry.text[sent:]})
+                self.growing[2] = len(entry.text)
+
+        new = game_state.history_seq - self.sent_seq
+        if new < 0:
+            new = len(game_state.history)  # history was replaced (load); resend what is kept
+        if new:
+            new = min(new, len(game_state.history))
+            first_id = game_state.history_seq - new + 1
+            typing = self.session.scene_runner.current_log_entry
+            for i, entry in enumerate(game_state.history[-new:]):
+                self.send({"t": "log", "id": first_id + i, "ch": entry.channel, "text": entry.text})
+                if entry is typing:
+                    self.growing = [entry, first_id + i, len(entry.text)]
+            self.sent_seq = game_state.history_seq
+
+        if self.growing and self.growing[0] is not self.session.scene_runner.current_log_entry:
+            self.growing = None  # finished; its last chars went out above
+
+        if game_state.mode != self.last_mode:
+            self.last_mode = game_state.mode
+            self.send({"t": "mode", "mode": game_state.mode})
+
+class SessionAudio:
+    """Per-session stand-in for AudioEngine; jobs go to the host's shared engine."""
+    def __init__(self, router: 'HostAudioRouter', client: RemoteClient):
+        self.router = router
+        self.client = client
+
+    def enqueue(self, job: AudioJob):
+        self.router.enqueue(job, self.client)
+
+class HostAudioRouter:
+    """
+    One AudioEngine (one worker, one AudioCache) for every session.
+    Results are routed back to the session that queued the job.
+    """
+    def __init__(self, engine: AudioEngine):
+        self.engine = engine
+        self.owners: Dict[int, RemoteClient] = {}
+
+    def enqueue(self, job: AudioJob, client: RemoteClient):
+        # Split first: the engine reports on the phrase jobs, not the line
+        for part in self.engine.cache.phrase_jobs(job):
+            self.owners[id(part)] = client
+            self.engine.enqueue_split(part)
+
+    def dispatch(self):
+        for ae in self.engine.poll_events():
+            if ae.type == "STARTED":
+                continue
+            client = self.owners.pop(id(ae.job), None)
+            if ae.type == "AUDIO_READY":
+                self.engine.complete_trace(ae.job)
+            if client is None or client.closed:
+                continue
+            if ae.type == "AUDIO_READY":
+                client.send({"t": "audio", "kind": ae.job.kind, "file": os.path.basename(ae.data)})
+            client.session.apply_audio_event(ae)
+
+class SessionHost:
+    """
+    Steps every connected session once per tick on a single asyncio loop.
+    Scenes are parsed once into a shared StoryLoader cache and combat tables
+    are compiled once; audio (optional) goes through one shared AudioEngine.
+    """
+    STATS_WINDOW = 600  # ticks kept for percentiles
+
+    def __init__(self, config: GlobalConfig, tick_hz: int = None, audio_engine: AudioEngine = None,
+                 start_scene: str = "main_menu", loader: StoryLoader = None):
+        self.config = config
+        self.tick_hz = tick_hz or config.HOST_TICK_HZ
+        self.start_scene = start_scene
+
+        self.loader = loader or StoryLoader(cache=True)
+        self.combat = CombatEngine()
+        self.audio = HostAudioRouter(audio_engine) if audio_engine else None
+        self.null_audio = NullAudioEngine()
+
+        self.clients: Dict[int, RemoteClient] = {}
+        self._ids = itertools.count(1)
+        self.reset_stats()
+
+    # --- Connections ---
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.clients) >= self.config.HOST_MAX_SESSIONS:
+            writer.write(b'{"t":"error","text":"host full"}\n')
+            writer.close()
+            return
+        client = self.adopt(reader, writer)
+        await self.serve_client(client, reader)
+
+    def adopt(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+              client_id: int = None, snapshot: dict = None) -> RemoteClient:
+        """Starts a session for a connection, or resumes one from RemoteClient.snapshot()."""
+        client = RemoteClient(client_id or next(self._ids), writer)
+        client.session = GameSession(self.config, self._session_audio(client), None,
+                                     start_scene=self.start_scene, loader=self.loader, combat=self.combat)
+        if snapshot:
+            client.restore(snapshot)
+        self.clients[client.id] = client
+        return client
+
+    async def serve_client(self, client: RemoteClient, reader: asyncio.StreamReader):
+        try:
+            while not client.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='replace').strip()
+                if not text:
+                    continue
+                if text.startswith("/stats"):
+                    if text == "/stats reset":
+                        self.reset_stats()
+                    client.send({"t": "stats", **self.stats()})
+                else:
+                    client.commands.append(text)
+        except (ConnectionError, ValueError):
+            pass  # reset by peer, or a line longer than the stream limit
+        finally:
+            self._drop(client)
+
+    async def detach(self, client: RemoteClient) -> Tuple[int, dict]:
+        """
+        Stops serving a client without closing its connection, for adoption
+        by another host. Returns (duplicated socket fd, snapshot).
+        Output still queued after ~1s, or a half-received command line, is lost.
+        """
+        client.closed = True
+        self.clients.pop(client.id, None)
+        transport = client.writer.transport
+        transport.pause_reading()
+        for _ in range(100):
+            if not transport.get_write_buffer_size():
+                break
+            await asyncio.sleep(0.01)
+        fd = os.dup(transport.get_extra_info('socket').fileno())
+        transport.abort()  # closes only our descriptor; the duplicate keeps the connection
+        return fd, client.snapshot()
+
+    def _session_audio(self, client: RemoteClient):
+        return SessionAudio(self.audio, client) if self.audio else self.null_audio
+
+    def _drop(self, client: RemoteClient):
+        if client.closed:
+            return
+        client.closed = True
+        self.clients.pop(client.id, None)
+        client.writer.close()
+
+    # --- Ticking ---
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.tick_hz
+        next_tick = loop.time() + period
+        while True:
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)  # behind schedule: still let socket I/O run
+            started = loop.time()
+            self.lag_ring.add(max(0.0, started - next_tick) * 1000.0)
+            # A late tick is not made up with a burst; virtual clocks absorb the gap
+            next_tick = max(next_tick + period, started)
+
+            self.tick()
+
+    def tick(self):
+        t0 = time.perf_counter()
+        if self.audio:
+            self.audio.dispatch()
+
+        max_buffer = self.config.HOST_MAX_WRITE_BUFFER
+        for client in list(self.clients.values()):
+            try:
+                client.step(time.perf_counter())
+                client.flush()
+            except Exception as e:
+                # One broken session must not take the host down
+                print(f"[SessionHost] Session {client.id} failed: {e}")
+                client.send({"t": "error", "text": str(e)})
+                self._drop(client)
+                continue
+
+            if client.session.quit_requested:
+                client.send({"t": "bye"})
+                self._drop(client)
+            elif client.writer.transport.get_write_buffer_size() > max_buffer:
+                print(f"[SessionHost] Dropping slow client {client.id}")
+                self._drop(client)
+
+        work_ms = (time.perf_counter() - t0) * 1000.0
+        self.tick_ring.add(work_ms)
+        self.work_s += work_ms / 1000.0
+        self.ticks += 1
+        self.session_steps += len(self.clients)
+        self.session_seconds += len(self.clients) / self.tick_hz
+        self.peak_sessions = max(self.peak_sessions, len(self.clients))
+
+    # --- Stats ---
+
+    def reset_stats(self):
+        self.tick_ring = SpanRing(self.STATS_WINDOW)
+        self.lag_ring = SpanRing(self.STATS_WINDOW)
+        self.ticks = 0
+        self.session_steps = 0
+        self.work_s = 0.0
+        self.session_seconds = 0.0
+        self.peak_sessions = len(self.clients)
+        self._stats_wall = time.perf_counter()
+        self._stats_cpu = time.process_time()
+
+    def stats(self) -> dict:
+        wall_s = time.perf_counter() - self._stats_wall
+        cpu_s = time.process_time() - self._stats_cpu
+        runners = [c.session.scene_runner for c in self.clients.values()]
+        scene_loads = sum(r.scene_loads for r in runners)
+        return {
+            "sessions": len(self.clients),
+            "peak_sessions": self.peak_sessions,
+            "tick_hz": self.tick_hz,
+            "ticks": self.ticks,
+            "wall_s": wall_s,
+            "session_steps": self.session_steps,
+            "tick_ms": self.tick_ring.percentiles(),
+            "lag_ms": self.lag_ring.percentiles(),
+            "step_us": self.work_s * 1e6 / self.session_steps if self.session_steps else 0.0,
+            "cpu_util": cpu_s / wall_s if wall_s else 0.0,
+            # Session-seconds served per CPU-second (includes socket I/O, not just stepping)
+            "sessions_per_core": self.session_seconds / cpu_s if cpu_s else 0.0,
+            "scenes_cached": len(self.loader.cache),
+            # Of the current sessions' scene transitions, the share served by the background preloader
+            "preload_hit_rate": sum(r.preload_hits for r in runners) / scene_loads if scene_loads else 0.0,
+        }
+
+    # --- Run ---
+
+    async def serve(self, address: str, port: int):
+        server = await asyncio.start_server(self._handle_client, address, port)
+        print(f"[SessionHost] Listening on {address}:{port} ({self.tick_hz} ticks/s)")
+        ticker = asyncio.create_task(self._tick_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            ticker.cancel()
+
+def main():
+    config = GlobalConfig()
+    parser = argparse.ArgumentParser(description="Headless multi-session game host.")
+    parser.add_argument("--address", default=config.HOST_ADDRESS)
+    parser.add_argument("--port", type=int, default=config.HOST_PORT)
+    parser.add_argument("--tick-hz", type=int, default=config.HOST_TICK_HZ)
+    parser.add_argument("--audio", action="store_true", help="resolve voice/sfx through one shared AudioEngine")
+    args = parser.parse_args()
+
+    audio_engine = AudioEngine(config) if args.audio else None
+    host = SessionHost(config, tick_hz=args.tick_hz, audio_engine=audio_engine)
+    try:
+        asyncio.run(host.serve(args.address, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[SessionHost] {json.dumps(host.stats())}")
+        if audio_engine:
+            audio_engine.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+# server/shard_supervisor.py
+#
+# Process-sharded session hosting: one supervisor, N worker processes.
+#
+#   python -m server.shard_supervisor                  # one worker per core, 127.0.0.1:7777
+#   python -m server.shard_supervisor --workers 4 --port 9000
+#
+# The supervisor accepts connections and hands each socket (the file
+# descriptor itself, over a Unix control socket) to the least-loaded worker.
+# Workers run a ShardHost (SessionHost) and talk the same line protocol as
+# server.session_host. Scenes and the audio cache index are compiled once into
+# files that every worker memory-maps, so the OS shares their pages.
+# Sessions move between workers as GameSession snapshots (GameState.to_dict).
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from core.config import GlobalConfig
+from core.audio_cache import AudioCache, AudioCacheIndex
+from core.audio_models import AudioJob
+from core.sfx_library import SFXLibrary
+from server.session_host import RemoteClient, SessionHost
+from story.scene_corpus import CorpusStoryLoader, SceneCorpus
+
+class ControlChannel:
+    """JSON messages (plus an optional socket fd) over a SOCK_SEQPACKET pair."""
+    MAX_MESSAGE = 256 * 1024
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def send(self, msg: dict, fd: int = None):
+        data = json.dumps(msg, separators=(',', ':')).encode('utf-8')
+        if fd is None:
+            self.sock.send(data)
+        else:
+            socket.send_fds(self.sock, [data], [fd])
+
+    def recv(self) -> Tuple[Optional[dict], Optional[int]]:
+        """(message, fd or None); message is None once the other side is gone."""
+        data, fds, _, _ = socket.recv_fds(self.sock, self.MAX_MESSAGE, 1)
+        if not data:
+            return None, None
+        return json.loads(data), fds[0] if fds else None
+
+# --- Worker Side ---
+
+class IndexedSessionAudio:
+    """Per-session audio stand-in for shards; see ShardHost.resolve_audio."""
+    def __init__(self, host: 'ShardHost', client: RemoteClient):
+        self.host = host
+        self.client = client
+
+    def enqueue(self, job: AudioJob):
+        self.host.resolve_audio(job, self.client)
+
+class ShardHost(SessionHost):
+    """
+    SessionHost inside a worker process. Content comes from the shared corpus
+    and audio index; session ownership is reported back to the supervisor.
+    Shards never synthesize audio: cached lines are announced, misses counted.
+    """
+    def __init__(self, config: GlobalConfig, tick_hz: int, corpus: SceneCorpus,
+                 audio_index: AudioCacheIndex, channel: ControlChannel):
+        super().__init__(config, tick_hz=tick_hz, loader=CorpusStoryLoader(corpus))
+        self.audio_index = audio_index
+        self.audio_cache = AudioCache(config)
+        self.sfx_library = SFXLibrary(config)
+        self.sfx_files: Dict[str, Optional[str]] = {}
+        self.channel = channel
+        self.audio_hits = 0
+        self.audio_misses = 0
+
+    def _session_audio(self, client: RemoteClient):
+        return IndexedSessionAudio(self, client)
+
+    def resolve_audio(self, job: AudioJob, client: RemoteClient):
+        if job.kind == "tts" and job.text:
+            # Looked up the way AudioEngine would cache it (per phrase in phrase mode)
+            for part in self.audio_cache.phrase_jobs(job):
+                key = next((k for k in self.audio_cache.candidate_keys(self.config.AUDIO_BACKEND, part)
+                            if k in self.audio_index), None)
+                if key:
+                    self.audio_hits += 1
+                    client.send({"t": "audio", "kind": "tts", "file": f"{key}.mp3"})
+                else:
+                    self.audio_misses += 1
+        elif job.kind == "sfx" and job.sfx_id:
+            if job.sfx_id not in self.sfx_files:
+                path = self.sfx_library.get_path(job.sfx_id)
+                self.sfx_files[job.sfx_id] = os.path.basename(path) if path else None
+            if self.sfx_files[job.sfx_id]:
+                client.send({"t": "audio", "kind": "sfx", "file": self.sfx_files[job.sfx_id]})
+
+    def _drop(self, client: RemoteClient):
+        if client.closed:
+            return
+        super()._drop(client)
+        self.channel.send({"op": "closed", "session_id": client.id})
+
+    def stats(self) -> dict:
+        s = super().stats()
+        s["audio_hits"] = self.audio_hits
+        s["audio_misses"] = self.audio_misses
+        return s
+
+class ShardWorker:
+    """Event loop of one worker process: ticks its ShardHost, obeys the supervisor."""
+    def __init__(self, config: GlobalConfig, worker_id: int, channel: ControlChannel, tick_hz: int):
+        self.config = config
+        self.worker_id = worker_id
+        self.channel = channel
+        self.tick_hz = tick_hz
+        self.host: Optional[ShardHost] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        corpus = SceneCorpus(self.config.SCENE_CORPUS_PATH)
+        audio_index = AudioCacheIndex(self.config.AUDIO_INDEX_PATH)
+        self.host = ShardHost(self.config, self.tick_hz, corpus, audio_index, self.channel)
+
+        loop.add_reader(self.channel.fileno(), self._on_control)
+        ticker = asyncio.create_task(self.host._tick_loop())
+        try:
+            await self._stopped.wait()
+        finally:
+            ticker.cancel()
+            loop.remove_reader(self.channel.fileno())
+            for client in list(self.host.clients.values()):
+                self.host._drop(client)
+
+    def _on_control(self):
+        msg, fd = self.channel.recv()
+        if msg is None:
+            self._stopped.set()  # supervisor exited
+            return
+        op = msg["op"]
+        if op == "adopt":
+            asyncio.create_task(self._adopt(msg, fd))
+        elif op == "detach":
+            asyncio.create_task(self._detach(msg["session_id"]))
+        elif op == "stats":
+            self.channel.send({"op": "stats", "worker": self.worker_id, **self.host.stats()})
+        elif op == "reset_stats":
+            self.host.reset_stats()
+        elif op == "shutdown":
+            self._stopped.set()
+
+    async def _adopt(self, msg: dict, fd: int):
+        sock = socket.socket(fileno=fd)
+        sock.setblocking(False)
+        reader, writer = await asyncio.open_connection(sock=sock)
+        client = self.host.adopt(reader, writer, msg["session_id"], msg.get("snapshot"))
+        await self.host.serve_client(client, reader)
+
+    async def _detach(self, session_id: int):
+        client = self.host.clients.get(session_id)
+        if client is None:
+            self.channel.send({"op": "detach_failed", "session_id": session_id})
+            return
+        fd, snapshot = await self.host.detach(client)
+        try:
+            self.channel.send({"op": "detached", "session_id": session_id, "snapshot": snapshot}, fd)
+        finally:
+            os.close(fd)
+
+def run_shard_worker(config: GlobalConfig, worker_id: int, sock: socket.socket, tick_hz: int):
+    """Worker process entry point."""
+    try:
+        asyncio.run(ShardWorker(config, worker_id, ControlChannel(sock), tick_hz).run())
+    except KeyboardInterrupt:
+        pass
+
+# --- Supervisor Side ---
+
+@dataclass
+class WorkerHandle:
+    worker_id: int
+    process: multiprocessing.Process
+    channel: ControlChannel
+    sessions: Set[int] = field(default_factory=set)
+
+class ShardSupervisor:
+    """
+    Spreads sessions across worker processes and rebalances them.
+    Only accepts and routes sockets; all stepping and socket I/O happen in workers.
+    """
+    def __init__(self, config: GlobalConfig, workers: int = None, tick_hz: int = None,
+                 scenes_dir: str = "content/scenes"):
+        self.config = config
+        self.scenes_dir = scenes_dir
+        self.worker_count = workers or config.SHARD_WORKERS or os.cpu_count() or 1
+        self.tick_hz = tick_hz or config.HOST_TICK_HZ
+
+        self.workers: List[WorkerHandle] = []
+        self.owner: Dict[int, WorkerHandle] = {}
+        self.migrations: Dict[int, WorkerHandle] = {}  # session_id -> target worker
+        self.migrated = 0
+        self._ids = itertools.count(1)
+        self._stats_replies: Dict[int, asyncio.Future] = {}
+        self._listener: Optional[socket.socket] = None
+
+    def start(self):
+        """Compiles the shared content files and spawns the workers."""
+        scene_count, errors = SceneCorpus.compile(self.scenes_dir, self.config.SCENE_CORPUS_PATH)
+        for error in errors:
+            print(f"[ShardSupervisor] Scene left out of corpus: {error}")
+        audio_count = AudioCacheIndex.build(self.config.AUDIO_CACHE_DIR, self.config.AUDIO_INDEX_PATH)
+        print(f"[ShardSupervisor] Corpus: {scene_count} scenes, audio index: {audio_count} lines")
+
+        # spawn: workers start from a clean interpreter, not a fork of this event loop
+        ctx = multiprocessing.get_context("spawn")
+        for worker_id in range(self.worker_count):
+            parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+            process = ctx.Process(target=run_shard_worker, args=(self.config, worker_id, child, self.tick_hz),
+                                  name=f"shard-{worker_id}", daemon=True)
+            process.start()
+            child.close()
+            self.workers.append(WorkerHandle(worker_id, process, ControlChannel(parent)))
+
+    async def serve(self, address: str, port: int):
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            loop.add_reader(worker.channel.fileno(), self._on_worker_message, worker)
+
+        self._listener = socket.create_server((address, port), backlog=4096)
+        self._listener.setblocking(False)
+        print(f"[ShardSupervisor] Listening on {address}:{port} ({self.worker_count} workers, {self.tick_hz} ticks/s)")
+
+        rebalancer = asyncio.create_task(self._rebalance_loop())
+        try:
+            while True:
+                conn, _ = await loop.sock_accept(self._listener)
+                self.assign(conn)
+        finally:
+            rebalancer.cancel()
+            self._listener.close()
+
+    def assign(self, conn: socket.socket):
+        """Hands a new connection to the least-loaded worker."""
+        worker = min(self.workers, key=lambda w: len(w.sessions))
+        session_id = next(self._ids)
+        try:
+            worker.channel.send({"op": "adopt", "session_id": session_id}, conn.fileno())
+        finally:
+            conn.close()  # the worker has its own descriptor now
+        worker.sessions.add(session_id)
+        self.owner[session_id] = worker
+
+    # --- Migration ---
+
+    def migrate(self, session_id: int, target: WorkerHandle) -> bool:
+        """Asks the owning worker to hand the session over; completes in _on_worker_message."""
+        source = self.owner.get(session_id)
+        if source is None or source is target or session_id in self.migrations:
+            return False
+        self.migrations[session_id] = target
+        source.channel.send({"op": "detach", "session_id": session_id})
+        return True
+
+    def rebalance(self) -> int:
+        """Moves sessions from the busiest to the idlest worker until they differ by at most one."""
+        moved = 0
+        load = {w.worker_id: len(w.sessions) for w in self.workers}
+        for target in self.migrations.values():
+            load[target.worker_id] += 1
+        while True:
+            busiest = max(self.workers, key=lambda w: load[w.worker_id])
+            idlest = min(self.workers, key=lambda w: load[w.worker_id])
+            if load[busiest.worker_id] - load[idlest.worker_id] <= 1:
+                return moved
+            candidates = [sid for sid in busiest.sessions if sid not in self.migrations]
+            if not candidates or not self.migrate(candidates[0], idlest):
+                return moved
+            load[busiest.worker_id] -= 1
+            load[idlest.worker_id] += 1
+            moved += 1
+
+    async def _rebalance_loop(self):
+        while True:
+            await asyncio.sleep(self.config.SHARD_REBALANCE_S)
+            self.rebalance()
+
+    def _on_worker_message(self, worker: WorkerHandle):
+        msg, fd = worker.channel.recv()
+        if msg is None:
+            asyncio.get_running_loop().remove_reader(worker.channel.fileno())
+            print(f"[ShardSupervisor] Worker {worker.worker_id} exited; its sessions are lost")
+            for session_id in worker.sessions:
+                self.owner.pop(session_id, None)
+            worker.sessions.clear()
+            return
+
+        op = msg["op"]
+        if op == "closed":
+            worker.sessions.discard(msg["session_id"])
+            self.owner.pop(msg["session_id"], None)
+        elif op == "detached":
+            session_id = msg["session_id"]
+            target = self.migrations.pop(session_id)
+            worker.sessions.discard(session_id)
+            try:
+                target.channel.send({"op": "adopt", "session_id": session_id, "snapshot": msg["snapshot"]}, fd)
+            finally:
+                os.close(fd)
+            target.sessions.add(session_id)
+            self.owner[session_id] = target
+            self.migrated += 1
+        elif op == "detach_failed":
+            self.migrations.pop(msg["session_id"], None)
+        elif op == "stats":
+            future = self._stats_replies.pop(worker.worker_id, None)
+            if future and not future.done():
+                future.set_result(msg)
+
+    # --- Stats ---
+
+    def reset_stats(self):
+        for worker in self.workers:
+            worker.channel.send({"op": "reset_stats"})
+
+    async def stats(self, timeout_s: float = 5.0) -> dict:
+        """Aggregate over all workers (stepping throughput is the sum of per-worker rates)."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for worker in self.workers:
+            future = self._stats_replies[worker.worker_id] = loop.create_future()
+            worker.channel.send({"op": "stats"})
+            futures.append(future)
+        done, _ = await asyncio.wait(futures, timeout=timeout_s)
+        per_worker = [f.result() for f in futures if f in done]
+
+        return {
+            "workers": len(self.workers),
+            "responding": len(per_worker),
+            "sessions": sum(w["sessions"] for w in per_worker),
+            "migrated": self.migrated,
+            "steps_per_s": sum(w["session_steps"] / w["wall_s"] for w in per_worker if w["wall_s"]),
+            "tick_ms_p95": max((w["tick_ms"]["p95"] for w in per_worker), default=0.0),
+            "lag_ms_p95": max((w["lag_ms"]["p95"] for w in per_worker), default=0.0),
+            "cpu_util": sum(w["cpu_util"] for w in per_worker),
+            "per_worker": per_worker,
+        }
+
+    def shutdown(self, timeout_s: float = 3.0):
+        for worker in self.workers:
+            try:
+                worker.channel.send({"op": "shutdown"})
+            except OSError:
+                pass
+        deadline = time.monotonic() + timeout_s
+        for worker in self.workers:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.channel.sock.close()
+
+def main():
+    config = GlobalConfig()
+    parser = argparse.ArgumentParser(description="Process-sharded headless game host.")
+    parser.add_argument("--address", default=config.HOST_ADDRESS)
+    parser.add_argument("--port", type=int, default=config.HOST_PORT)
+    parser.add_argument("--workers", type=int, default=config.SHARD_WORKERS)
+    parser.add_argument("--tick-hz", type=int, default=config.HOST_TICK_HZ)
+    args = parser.parse_args()
+
+    supervisor = ShardSupervisor(config, workers=args.workers, tick_hz=args.tick_hz)
+    supervisor.start()
+    try:
+        asyncio.run(supervisor.serve(args.address, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.shutdown()
+
+if __name__ == "__main__":
+    main()
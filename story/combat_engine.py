@@ -0,0 +1,336 @@
+# story/combat_engine.py
+
+import bisect
+import itertools
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from core.command_router import CommandTrie
+
+class CombatContentError(Exception):
+    pass
+
+# Used when content/combat is missing or invalid, so the game stays playable
+# (matches the rules before combat became data-driven).
+BUILTIN_CONTENT = {
+    "damage_tables": {"tables": {
+        "blaster": {"min": 3, "max": 8},
+        "drone_laser": {"min": 2, "max": 6},
+    }},
+    "actions": {"actions": {
+        "attack": {"effect": "damage", "table": "blaster", "text": "> You attack for {amount} DMG."},
+        "heal": {"effect": "heal", "amount": 5, "text": "> Systems repaired (+{amount} HP).", "channel": "system"},
+        "scan": {"effect": "scan", "text": "TARGET: {enemy} | HP: {enemy_hp}/{enemy_max_hp}", "channel": "info"},
+        "flee": {"effect": "flee", "chance": 0.5, "text": "ESCAPED SUCCESSFULLY.", "fail_text": "ESCAPE FAILED.",
+                 "channel": "system"},
+    }},
+    "enemies": {"default_enemy": "unknown_threat", "enemies": {
+        "unknown_threat": {"name": "Unknown Threat", "hp": 20, "attacks": [
+            {"table": "drone_laser", "text": "WARNING: Hull breach! Took {damage} DMG. (Integrity: {hp})"}]},
+    }},
+}
+
+@dataclass(frozen=True)
+class DamageTable:
+    """
+    Compiled damage distribution. Uniform ranges sample with rng.randint
+    (so seeded sessions replay exactly as before); weighted tables bisect a
+    precomputed cumulative list. `pmf` is the exact distribution for
+    simulators: ((value, probability), ...) sorted by value.
+    """
+    table_id: str
+    values: Tuple[int, ...]
+    cum_weights: Tuple[float, ...]
+    pmf: Tuple[Tuple[int, float], ...]
+    uniform: Optional[Tuple[int, int]] = None
+
+    def sample(self, rng) -> int:
+        if self.uniform:
+            return rng.randint(*self.uniform)
+        return self.values[bisect.bisect_right(self.cum_weights, rng.random() * self.cum_weights[-1])]
+
+    @property
+    def mean(self) -> float:
+        return sum(v * p for v, p in self.pmf)
+
+@dataclass(frozen=True)
+class CombatAction:
+    action_id: str
+    effect: str
+    handler: Callable  # picked from CombatEngine.EFFECTS when compiled
+    text: str
+    channel: str = "terminal"
+    table: Optional[DamageTable] = None
+    amount: int = 0
+    chance: float = 0.0
+    fail_text: str = ""
+
+@dataclass(frozen=True)
+class EnemyAttack:
+    table: DamageTable
+    text: str
+    channel: str = "error"
+
+@dataclass(frozen=True)
+class EnemyDef:
+    """
+    Compiled enemy. `commands` maps every accepted input (ids and aliases)
+    to its action and `command_trie` adds unambiguous prefixes on top;
+    `damage_pmf` is the enemy's per-turn damage distribution with the
+    attack choice folded in.
+    """
+    enemy_id: str
+    name: str
+    hp: int
+    commands: Dict[str, CombatAction]
+    command_trie: CommandTrie
+    action_ids: Tuple[str, ...]
+    attacks: Tuple[EnemyAttack, ...]
+    attack_cum_weights: Tuple[float, ...]
+    damage_pmf: Tuple[Tuple[int, float], ...]
+
+    def choose_attack(self, rng) -> EnemyAttack:
+        if len(self.attacks) == 1:
+            return self.attacks[0]  # no extra draw: keeps the RNG sequence of one-attack enemies stable
+        return self.attacks[bisect.bisect_right(self.attack_cum_weights, rng.random() * self.attack_cum_weights[-1])]
+
+@dataclass(frozen=True)
+class TurnOutcome:
+    """
+    Result of one combat command.
+    result: "ongoing", "won", "lost", "fled", "scan" (free action) or "invalid".
+    """
+    result: str
+    player_hp: int
+    enemy_hp: int
+    damage_dealt: int = 0
+    damage_taken: int = 0
+    healed: int = 0
+    flee_failed: bool = False
+    action: Optional[CombatAction] = None
+    attack: Optional[EnemyAttack] = None
+
+    @property
+    def consumed_turn(self) -> bool:
+        return self.result not in ("scan", "invalid")
+
+# --- Effect handlers: (action, player_hp, player_max_hp, enemy_hp, rng) -> (player_hp, enemy_hp, fields) ---
+# fields may contain "result" to end the turn before the enemy acts.
+
+def _effect_damage(action: CombatAction, player_hp, player_max_hp, enemy_hp, rng):
+    dealt = action.table.sample(rng)
+    return player_hp, enemy_hp - dealt, {"damage_dealt": dealt}
+
+def _effect_heal(action: CombatAction, player_hp, player_max_hp, enemy_hp, rng):
+    healed = min(player_max_hp, player_hp + action.amount) - player_hp
+    return player_hp + healed, enemy_hp, {"healed": healed}
+
+def _effect_scan(action: CombatAction, player_hp, player_max_hp, enemy_hp, rng):
+    return player_hp, enemy_hp, {"result": "scan"}
+
+def _effect_flee(action: CombatAction, player_hp, player_max_hp, enemy_hp, rng):
+    if rng.random() > 1.0 - action.chance:
+        return player_hp, enemy_hp, {"result": "fled"}
+    return player_hp, enemy_hp, {"flee_failed": True}
+
+class CombatEngine:
+    """
+    Loads enemies, actions and damage tables from content/combat/*.json and
+    compiles them into lookup tables. Holds no per-battle state, so one
+    engine can serve every session in a process and headless simulators.
+    """
+    FILES = ("damage_tables", "actions", "enemies")
+    EFFECTS: Dict[str, Callable] = {
+        "damage": _effect_damage,
+        "heal": _effect_heal,
+        "scan": _effect_scan,
+        "flee": _effect_flee,
+    }
+    # Required fields per effect (optional: aliases, channel, fail_text)
+    EFFECT_REQUIREMENTS = {
+        "damage": ["table", "text"],
+        "heal": ["amount", "text"],
+        "scan": ["text"],
+        "flee": ["chance", "text"],
+    }
+
+    def __init__(self, content_dir: str = "content/combat"):
+        self.content_dir = content_dir
+        try:
+            self._compile(self._read_content())
+        except (OSError, json.JSONDecodeError, CombatContentError) as e:
+            print(f"[CombatEngine] {e} -- using built-in rules")
+            self._compile(BUILTIN_CONTENT)
+
+    # --- Loading & Compilation ---
+
+    def _read_content(self) -> dict:
+        content = {}
+        for name in self.FILES:
+            path = os.path.join(self.content_dir, f"{name}.json")
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("schema_version") != 1:
+                raise CombatContentError(f"{path}: unsupported schema version: {data.get('schema_version')}")
+            content[name] = data
+        return content
+
+    def _compile(self, content: dict):
+        """Compiles content; wrongly shaped content (a list for a dict, a missing section) is a CombatContentError."""
+        try:
+            self._compile_content(content)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise CombatContentError(f"Malformed combat content: {type(e).__name__}: {e}") from e
+
+    def _compile_content(self, content: dict):
+        self.tables = {tid: self._compile_table(tid, raw)
+                       for tid, raw in content["damage_tables"].get("tables", {}).items()}
+        raw_actions = content["actions"].get("actions", {})
+        self.actions = {aid: self._compile_action(aid, raw) for aid, raw in raw_actions.items()}
+
+        # Every accepted input -> action, built once; turns are a dict lookup
+        self.commands: Dict[str, CombatAction] = {}
+        for aid, raw in raw_actions.items():
+            for name in [aid] + list(raw.get("aliases", [])):
+                name = name.lower()
+                if name in self.commands:
+                    raise CombatContentError(f"Command '{name}' is defined twice")
+                self.commands[name] = self.actions[aid]
+
+        enemies_data = content["enemies"]
+        self.enemies = {eid: self._compile_enemy(eid, raw) for eid, raw in enemies_data.get("enemies", {}).items()}
+        self.default_enemy_id = enemies_data.get("default_enemy", "")
+        if self.default_enemy_id not in self.enemies:
+            raise CombatContentError(f"default_enemy '{self.default_enemy_id}' is not defined")
+
+    @staticmethod
+    def _number(cast: Callable, value, owner: str, field: str):
+        """cast(value) for a content field; bad values name the entry and field instead of raising ValueError."""
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            kind = "an integer" if cast is int else "a number"
+            raise CombatContentError(f"{owner} field '{field}' must be {kind}, got {value!r}") from None
+
+    def _compile_table(self, table_id: str, raw: dict) -> DamageTable:
+        owner = f"Damage table '{table_id}'"
+        if "weights" in raw:
+            pairs = sorted((self._number(int, v, owner, "weights"), self._number(float, w, owner, f"weights.{v}"))
+                           for v, w in raw["weights"].items())
+            if not pairs or any(w <= 0 for _, w in pairs):
+                raise CombatContentError(f"Damage table '{table_id}' needs positive weights")
+            total = sum(w for _, w in pairs)
+            values = tuple(v for v, _ in pairs)
+            return DamageTable(table_id, values, tuple(itertools.accumulate(w for _, w in pairs)),
+                               tuple((v, w / total) for v, w in pairs))
+
+        if "min" not in raw or "max" not in raw:
+            raise CombatContentError(f"Damage table '{table_id}' needs min/max or weights")
+        lo, hi = self._number(int, raw["min"], owner, "min"), self._number(int, raw["max"], owner, "max")
+        if lo > hi:
+            raise CombatContentError(f"Damage table '{table_id}': min > max")
+        values = tuple(range(lo, hi + 1))
+        return DamageTable(table_id, values, tuple(float(i + 1) for i in range(len(values))),
+                           tuple((v, 1.0 / len(values)) for v in values), uniform=(lo, hi))
+
+    def _compile_action(self, action_id: str, raw: dict) -> CombatAction:
+        effect = raw.get("effect")
+        if effect not in self.EFFECTS:
+            raise CombatContentError(f"Action '{action_id}' has unknown effect: '{effect}'")
+        for field in self.EFFECT_REQUIREMENTS[effect]:
+            if field not in raw:
+                raise CombatContentError(f"Action '{action_id}' ({effect}) missing required field: '{field}'")
+
+        table = None
+        if effect == "damage":
+            table = self.tables.get(raw["table"])
+            if table is None:
+                raise CombatContentError(f"Action '{action_id}' uses unknown damage table '{raw['table']}'")
+        owner = f"Action '{action_id}'"
+        return CombatAction(action_id, effect, self.EFFECTS[effect], raw["text"], raw.get("channel", "terminal"),
+                            table=table, amount=self._number(int, raw.get("amount", 0), owner, "amount"),
+                            chance=self._number(float, raw.get("chance", 0.0), owner, "chance"),
+                            fail_text=raw.get("fail_text", ""))
+
+    def _compile_enemy(self, enemy_id: str, raw: dict) -> EnemyDef:
+        for field in ("name", "hp", "attacks"):
+            if field not in raw:
+                raise CombatContentError(f"Enemy '{enemy_id}' missing required field: '{field}'")
+
+        action_ids = tuple(raw.get("actions", self.actions))
+        unknown = [aid for aid in action_ids if aid not in self.actions]
+        if unknown:
+            raise CombatContentError(f"Enemy '{enemy_id}' allows unknown actions: {unknown}")
+        commands = {name: action for name, action in self.commands.items() if action.action_id in action_ids}
+        command_trie = CommandTrie()
+        for aid in action_ids:
+            command_trie.add(aid, self.actions[aid], aliases=[n for n, a in commands.items() if a.action_id == aid and n != aid])
+
+        attacks, weights = [], []
+        for raw_attack in raw["attacks"]:
+            table = self.tables.get(raw_attack.get("table"))
+            if table is None:
+                raise CombatContentError(f"Enemy '{enemy_id}' uses unknown damage table '{raw_attack.get('table')}'")
+            attacks.append(EnemyAttack(table, raw_attack.get("text", "Took {damage} DMG."),
+                                       raw_attack.get("channel", "error")))
+            weights.append(self._number(float, raw_attack.get("weight", 1), f"Enemy '{enemy_id}'", "attacks.weight"))
+        if not attacks or any(w <= 0 for w in weights):
+            raise CombatContentError(f"Enemy '{enemy_id}' needs at least one attack with positive weight")
+
+        # Fold the attack choice into one damage distribution
+        total = sum(weights)
+        pmf: Dict[int, float] = {}
+        for attack, weight in zip(attacks, weights):
+            for value, p in attack.table.pmf:
+                pmf[value] = pmf.get(value, 0.0) + p * weight / total
+
+        hp = self._number(int, raw["hp"], f"Enemy '{enemy_id}'", "hp")
+        return EnemyDef(enemy_id, raw["name"], hp, commands, command_trie, action_ids, tuple(attacks),
+                        tuple(itertools.accumulate(weights)), tuple(sorted(pmf.items())))
+
+    # --- Runtime ---
+
+    def enemy(self, enemy_id: str = "") -> EnemyDef:
+        """
+        Enemy of a running fight (CombatState.enemy_id). Unknown or empty ids
+        (saves from before enemy_id existed) get the default enemy; starting
+        a fight goes through encounter_enemy() instead.
+        """
+        return self.enemies.get(enemy_id) or self.enemies[self.default_enemy_id]
+
+    def encounter_enemy(self, enemy_id: str = "") -> Optional[EnemyDef]:
+        """Enemy for a combat_start step: the default when no enemy_id is given, None for an unknown id."""
+        if not enemy_id:
+            return self.enemies[self.default_enemy_id]
+        return self.enemies.get(enemy_id)
+
+    def resolve_turn(self, enemy: EnemyDef, command: str, player_hp: int, player_max_hp: int,
+                     enemy_hp: int, rng) -> TurnOutcome:
+        """
+        Pure turn resolution: no GameState, no text. `rng` is any
+        random.Random-like object; draws happen in a fixed order (player
+        action, attack choice, enemy damage) so a seeded session replays
+        identically.
+        """
+        match = enemy.command_trie.lookup(command.strip())
+        if match is None:
+            return TurnOutcome("invalid", player_hp, enemy_hp)
+        action = match.target
+
+        player_hp, enemy_hp, fields = action.handler(action, player_hp, player_max_hp, enemy_hp, rng)
+        result = fields.pop("result", None)
+        if result:
+            return TurnOutcome(result, player_hp, enemy_hp, action=action, **fields)
+        if enemy_hp <= 0:
+            return TurnOutcome("won", player_hp, enemy_hp, action=action, **fields)
+
+        # Enemy Turn
+        attack = enemy.choose_attack(rng)
+        damage_taken = attack.table.sample(rng)
+        player_hp -= damage_taken
+        return TurnOutcome("lost" if player_hp <= 0 else "ongoing", player_hp, enemy_hp,
+                           damage_taken=damage_taken, action=action, attack=attack, **fields)
+
+    def commands_banner(self, enemy: EnemyDef) -> str:
+        return "COMMANDS: " + " ".join(f"[{aid.upper()}]" for aid in enemy.action_ids)
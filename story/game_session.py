@@ -0,0 +1,246 @@
+# story/game_session.py
+
+import os
+import random
+from core.command_router import CommandRouter, CommandTrie
+from core.config import GlobalConfig
+from core.models import GameState
+from core.search_index import ScrollbackIndex
+from story.combat_engine import CombatEngine
+from story.scene_runner import SceneRunner
+from story.story_loader import StoryLoader
+
+class GameSession:
+    """
+    One player's game logic: GameState + SceneRunner + meta commands.
+    Contains no pygame calls, so main.py, the replay harness and headless
+    hosts all drive it the same way through step().
+    """
+    FIND_MAX_HITS = 1000  # matches a find remembers for stepping back
+
+    def __init__(self, config: GlobalConfig, audio_engine, save_system=None,
+                 seed: int = None, start_scene: str = "main_menu", loader: StoryLoader = None,
+                 combat: CombatEngine = None):
+        self.config = config
+        self.audio_engine = audio_engine
+        self.save_system = save_system
+
+        # Combat rolls come from this seed; recordings store it for replay
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.start_scene = start_scene
+
+        self.game_state = GameState(config)
+        self.scene_runner = SceneRunner(self.game_state, audio_engine, rng=random.Random(self.seed),
+                                        loader=loader, combat=combat)
+        if save_system and config.AUTOSAVE_ENABLED:
+            self.scene_runner.autosave_hook = lambda: save_system.autosave(self.game_state, config.AUTOSAVE_SLOT)
+
+        self.quit_requested = False
+        # Full-text index over the scrollback; find results ask the caller to
+        # scroll the view to scroll_request (a scrollback position)
+        self.search = ScrollbackIndex(self.game_state)
+        self.scroll_request = None
+        self._last_find = None  # (query, hits, cursor) to step through with a repeated find
+        self.router = CommandRouter(self._build_meta_commands(), self.scene_runner.active_commands)
+        self.scene_runner.load(start_scene)
+
+    def _build_meta_commands(self) -> CommandTrie:
+        # Two letters minimum so a stray keystroke never triggers a meta command;
+        # load/quit throw away the running game, so they need the full word.
+        trie = CommandTrie(min_prefix=2)
+        if self.save_system:
+            trie.add("save", self._cmd_save)
+            trie.add("load", self._cmd_load, prefix=False)
+            trie.add("slots", self._cmd_slots)
+        if hasattr(self.audio_engine, "tracer"):
+            trie.add("audiostats", self._cmd_audiostats)
+        trie.add("scenestats", self._cmd_scenestats)
+        trie.add("find", self._cmd_find)
+        trie.add("quit", self._cmd_quit, aliases=["exit"], prefix=False)
+        return trie
+
+    def snapshot(self) -> dict:
+        """Plain-data copy of the session (GameState.to_dict plus RNG), e.g. to move it between processes."""
+        runner = self.scene_runner
+        version, internal, gauss = runner.rng.getstate()
+
+        # Mid-step progress, so a wait or typewrite continues instead of restarting
+        typing_offset = None
+        history = self.game_state.history
+        for offset in range(1, min(len(history), 50) + 1):
+            if history[-offset] is runner.current_log_entry:
+                typing_offset = offset
+                break
+
+        return {
+            "state": self.game_state.to_dict(),
+            "seed": self.seed,
+            "start_scene": self.start_scene,
+            "rng": [version, list(internal), gauss],
+            "step": {
+                "wait_timer": runner.wait_timer,
+                "typewriter_timer": runner.typewriter_timer,
+                "typewriter_char_index": runner.typewriter_char_index,
+                "typing_offset": typing_offset,  # history[-offset] is the line being typed
+            },
+        }
+
+    def restore(self, snapshot: dict):
+        """Continues a session from snapshot() exactly where it was, mid-step included."""
+        runner = self.scene_runner
+        self.game_state.restore_from_dict(snapshot["state"])
+        if self.save_system:
+            # Checkpoints referred to the state we just replaced
+            self.save_system.journal_checkpoints.clear()
+        self.seed = snapshot.get("seed", self.seed)
+        self.start_scene = snapshot.get("start_scene", self.start_scene)
+        if "rng" in snapshot:
+            version, internal, gauss = snapshot["rng"]
+            runner.rng.setstate((version, tuple(internal), gauss))
+        runner.resume()
+
+        step = snapshot.get("step")
+        if step:
+            runner.wait_timer = step["wait_timer"]
+            runner.typewriter_timer = step["typewriter_timer"]
+            runner.typewriter_char_index = step["typewriter_char_index"]
+            offset = step["typing_offset"]
+            history = self.game_state.history
+            if offset and offset <= len(history):
+                runner.current_log_entry = history[-offset]
+
+    def step(self, dt_ms: int, command: str = None):
+        """One frame of game logic: meta commands, then the scene."""
+        if command:
+            self.handle_command(command)
+            self.scene_runner.update(dt_ms, latest_command=command)
+        else:
+            self.scene_runner.update(dt_ms)
+        self.search.sync()
+
+    def handle_command(self, command: str):
+        game_state = self.game_state
+
+        # Echo input
+        game_state.append_history(f"> {command}", channel="terminal")
+
+        # Meta Commands (scene and combat words are matched by the SceneRunner)
+        route = self.router.resolve(command.lower())
+        if route and route.context == "global":
+            route.match.target(route.args)
+
+    def complete_command(self, text: str):
+        """Tab completion candidates for the input line."""
+        return self.router.complete(text)
+
+    # --- Meta Commands (handlers take the words after the command) ---
+
+    def _cmd_save(self, args):
+        if len(args) > 1:
+            return
+        slot_name = args[0] if args else "save1"
+        if self.save_system.save_game(self.game_state, slot_name):
+            self.game_state.append_history("SAVING...", channel="system")
+        else:
+            self.game_state.append_history(f"SAVE FAILED [{slot_name}]", channel="error")
+
+    def _cmd_load(self, args):
+        if len(args) > 1:
+            return
+        slot_name = args[0] if args else "save1"
+        if self.save_system.load_game(self.game_state, slot_name):
+            self.scene_runner.resume()
+            self.game_state.append_history(f"GAME LOADED [{slot_name}]", channel="system")
+        else:
+            self.game_state.append_history(f"NO SAVE FOUND [{slot_name}]", channel="error")
+
+    def _cmd_slots(self, args):
+        slots = self.save_system.list_slots()
+        if not slots:
+            self.game_state.append_history("NO SAVES.", channel="info")
+        for info in slots:
+            self.game_state.append_history(
+                f"{info.slot_name:<12} {info.scene_id:<20} TIER {info.tier}  HP {info.hp}/{info.max_hp}",
+                channel="info"
+            )
+
+    def _cmd_audiostats(self, args):
+        for line in self.audio_engine.tracer.report_lines():
+            self.game_state.append_history(line, channel="info")
+
+    def _cmd_scenestats(self, args):
+        runner = self.scene_runner
+        rate = runner.preload_hits / runner.scene_loads if runner.scene_loads else 0.0
+        self.game_state.append_history(
+            f"SCENE LOADS {runner.scene_loads}  PRELOADED {runner.preload_hits} ({rate:.0%})"
+            f"  STEP BUDGET OVERRUNS {runner.budget_overruns}",
+            channel="info"
+        )
+
+    def _cmd_find(self, args):
+        game_state = self.game_state
+        if not args:
+            game_state.append_history("USAGE: find <words>", channel="info", style=ScrollbackIndex.SKIP_STYLE)
+            return
+        query = " ".join(args)
+
+        # The same query again steps to the next older match
+        if self._last_find and self._last_find[0] == query and self._last_find[2] + 1 < len(self._last_find[1]):
+            _, hits, cursor = self._last_find
+            cursor += 1
+            self._last_find = (query, hits, cursor)
+            game_state.append_history(f"MATCH {cursor + 1}/{len(hits)}  #{hits[cursor]}", channel="info",
+                                      style=ScrollbackIndex.SKIP_STYLE)
+            self.scroll_request = hits[cursor]
+            return
+
+        # Leave out this command's own echo
+        hits = self.search.find(query, limit=self.FIND_MAX_HITS, before=game_state.scrollback_len() - 1)
+        self._last_find = (query, hits, 0)
+        if not hits:
+            game_state.append_history(f"NO MATCHES FOR '{query}'", channel="info", style=ScrollbackIndex.SKIP_STYLE)
+            return
+        count = f"{len(hits)}+" if len(hits) == self.FIND_MAX_HITS else str(len(hits))
+        game_state.append_history(f"{count} MATCHES FOR '{query}' (repeat to step back):", channel="info",
+                                  style=ScrollbackIndex.SKIP_STYLE)
+        for position in hits[:self.config.FIND_RESULT_LINES]:
+            text = game_state.scrollback_range(position, position + 1)[0].text
+            game_state.append_history(f"  #{position}  {text[:60]}", channel="info", style=ScrollbackIndex.SKIP_STYLE)
+        self.scroll_request = hits[0]
+
+    def _cmd_quit(self, args):
+        self.quit_requested = True
+
+    def apply_audio_event(self, ae):
+        """Game-state side of an AudioEvent (playback stays with the caller)."""
+        if ae.type == "ERROR":
+            self.game_state.append_history(f"[Audio Error] {ae.data}", channel="error")
+
+    def apply_scene_reload(self, reload) -> bool:
+        """
+        Game-state side of a SceneWatcher result. Valid scenes replace the
+        cached copy and, if running, the live scene; invalid edits are shown
+        inline and the old version keeps running. Returns True if the
+        running scene changed.
+        """
+        runner = self.scene_runner
+        if reload.scene is None:
+            self.game_state.append_history(f"[HOT RELOAD] {reload.scene_id}: {reload.error}", channel="error")
+            return False
+
+        runner.loader.replace_scene(reload.scene_id, reload.scene)
+        if not runner.current_scene or runner.current_scene.id != reload.scene_id:
+            return False
+        kept = runner.swap_scene(reload.scene)
+        where = f"step {runner.current_step_index}" if kept else "restarted (step removed)"
+        self.game_state.append_history(
+            f"[HOT RELOAD] {reload.scene_id} ({where}, validated in {reload.validate_ms:.1f} ms)",
+            channel="info"
+        )
+        return True
+
+    def apply_save_event(self, se):
+        if se.type == "SAVED" and se.slot_name != self.config.AUTOSAVE_SLOT:
+            self.game_state.append_history(f"GAME SAVED [{os.path.basename(se.data)}]", channel="system")
+        elif se.type == "ERROR":
+            self.game_state.append_history(f"[Save Error] {se.data}", channel="error")
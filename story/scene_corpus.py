@@ -0,0 +1,106 @@
+# story/scene_corpus.py
+
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+from story.scene_validator import SceneValidator, SceneValidationError
+from story.story_loader import StoryLoader
+
+class SceneCorpus:
+    """
+    Read-only, memory-mapped bundle of every validated scene.
+
+    Layout: MAGIC | u32 version | u32 index length | index JSON | scene blobs.
+    The index maps scene_id -> [offset, length] into the blob area; blobs are
+    compact scene JSON. Processes that map the same file share its pages, and
+    each process only decodes the scenes it actually visits.
+    """
+    MAGIC = b"RSCORPUS"
+    VERSION = 1
+    _HEADER = struct.Struct("<II")
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f"Not a scene corpus: {path}")
+        pos = len(self.MAGIC)
+        version, index_len = self._HEADER.unpack_from(self._map, pos)
+        if version != self.VERSION:
+            raise ValueError(f"Unsupported scene corpus version: {version}")
+        pos += self._HEADER.size
+        self.index: Dict[str, List[int]] = json.loads(self._map[pos:pos + index_len])
+        self._data_start = pos + index_len
+
+    def __contains__(self, scene_id: str) -> bool:
+        return scene_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get(self, scene_id: str) -> Optional[dict]:
+        """Raw (already validated) scene data, or None if not in the corpus."""
+        entry = self.index.get(scene_id)
+        if entry is None:
+            return None
+        start = self._data_start + entry[0]
+        return json.loads(self._map[start:start + entry[1]])
+
+    def close(self):
+        self._map.close()
+
+    @staticmethod
+    def compile(scenes_dir: str, path: str) -> Tuple[int, List[str]]:
+        """
+        Validates every scene in scenes_dir and writes the corpus atomically.
+        Returns (scenes written, error messages for the ones left out).
+        """
+        validator = SceneValidator()
+        blobs: List[bytes] = []
+        index: Dict[str, List[int]] = {}
+        errors: List[str] = []
+        offset = 0
+
+        for filename in sorted(os.listdir(scenes_dir)):
+            if not filename.endswith(".json"):
+                continue
+            scene_id = filename[:-len(".json")]
+            try:
+                with open(os.path.join(scenes_dir, filename), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                validator.validate(data)
+            except (json.JSONDecodeError, SceneValidationError, OSError) as e:
+                # Left out on purpose: loading it falls back to the file and its error scene
+                errors.append(f"{filename}: {e}")
+                continue
+            blob = json.dumps(data, separators=(',', ':')).encode('utf-8')
+            index[scene_id] = [offset, len(blob)]
+            blobs.append(blob)
+            offset += len(blob)
+
+        index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(SceneCorpus.MAGIC)
+            f.write(SceneCorpus._HEADER.pack(SceneCorpus.VERSION, len(index_bytes)))
+            f.write(index_bytes)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        return len(index), errors
+
+class CorpusStoryLoader(StoryLoader):
+    """StoryLoader that parses scenes out of a SceneCorpus instead of scenes_dir."""
+    def __init__(self, corpus: SceneCorpus, scenes_dir: str = "content/scenes"):
+        super().__init__(scenes_dir, cache=True)
+        self.corpus = corpus
+
+    def _read_scene(self, scene_id: str):
+        data = self.corpus.get(scene_id)
+        if data is None:
+            return super()._read_scene(scene_id)
+        return self._parse_scene_data(data), True
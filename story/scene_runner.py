@@ -1,16 +1,26 @@
 # story/scene_runner.py
 
 import random
+from core.command_router import CommandTrie
 from core.models import GameState, LogEntry
 from core.audio_engine import AudioEngine, AudioJob
+from story.combat_engine import CombatEngine
 from story.scene_types import Scene
 from story.story_loader import StoryLoader
 
 class SceneRunner:
-    def __init__(self, game_state: GameState, audio_engine):
+    # Scene commands that end the session need the full word, like the global quit
+    FULL_WORD_COMMANDS = frozenset({"quit", "exit"})
+
+    def __init__(self, game_state: GameState, audio_engine, rng: random.Random = None,
+                 loader: StoryLoader = None, combat: CombatEngine = None):
         self.game_state = game_state
         self.audio_engine = audio_engine
-        self.loader = StoryLoader()
+        self.loader = loader or StoryLoader()
+        self.combat = combat or CombatEngine()
+
+        # Own RNG (not the global module) so a recorded seed replays exactly
+        self.rng = rng or random.Random()
         
         self.current_scene: Scene = None
         self.current_step_index: int = 0
@@ -21,16 +31,52 @@ class SceneRunner:
         self.typewriter_char_index: int = 0
         self.current_log_entry: LogEntry = None
 
+        # Optional callback fired after every completed step / combat turn
+        self.autosave_hook = None
+        self._autosave_deferred = False  # set while a burst coalesces autosaves
+        self._autosave_pending = False
+
+        # Burst execution: completed steps run back to back in one update(),
+        # up to step_budget per call (guards against goto_step loops)
+        self.step_budget = game_state.config.SCENE_STEP_BUDGET
+        self.step_serial = 0  # bumped whenever the cursor moves or a scene loads
+        self.budget_overruns = 0
+        self._overrun_reported = set()
+
+        # Scene transitions served by the background preloader (not a plain cache hit)
+        self.scene_loads = 0
+        self.preload_hits = 0
+
+        # Effects the caller plays itself (e.g. from a preloaded SFX bank): sfx
+        # steps append to sfx_triggers, drained by the main thread, instead of
+        # going through the audio worker
+        self.local_sfx = frozenset()
+        self.sfx_triggers = []
+        # Typewriter clicks: a typewrite step with "sfx" records the game time
+        # (clock_s) each character was revealed; the main thread drains the
+        # list and plays the clicks on that schedule
+        self.clock_s = 0.0  # game time: sum of update() dt
+        self.typewriter_sfx = None
+        self.typewriter_clicks = []
+
+        # Command trie of the current require_command step, built on first use
+        self._scene_commands = (None, None)  # (step, trie)
+
     def load(self, scene_id: str):
         """Loads a new scene and resets cursors."""
-        self.current_scene = self.loader.load_scene(scene_id)
+        self.scene_loads += 1
+        self.current_scene, preloaded = self.loader.fetch_scene(scene_id)
+        if preloaded:
+            self.preload_hits += 1
         self.current_step_index = 0
+        self._preload_exits()
         
         # SYNC: Update GameState immediately
         self.game_state.current_scene_id = scene_id
         self.game_state.scene_cursor = 0
         
         self._reset_step_state()
+        self._autosave()
 
     def resume(self):
         """
@@ -41,6 +87,7 @@ class SceneRunner:
         cursor = self.game_state.scene_cursor
         
         self.current_scene = self.loader.load_scene(scene_id)
+        self._preload_exits()
         
         # Validate cursor range
         if self.current_scene and 0 <= cursor < len(self.current_scene.steps):
@@ -50,7 +97,33 @@ class SceneRunner:
             
         self._reset_step_state()
 
+    def swap_scene(self, scene: Scene) -> bool:
+        """
+        Hot reload: replaces the running scene with a new version of itself.
+        The cursor stays if that step still exists (with its progress, if the
+        step is unchanged); otherwise the scene restarts like resume() does.
+        Returns True if the cursor was kept.
+        """
+        if not self.current_scene or scene.id != self.current_scene.id:
+            return False
+        old = self.current_scene
+        index = self.current_step_index
+        self.current_scene = scene
+        self._preload_exits()
+
+        if index < len(scene.steps):
+            if index >= len(old.steps) or old.steps[index] != scene.steps[index]:
+                self._reset_step_state()
+            return True
+
+        self.current_step_index = 0
+        self.game_state.scene_cursor = 0
+        self._reset_step_state()
+        return False
+
     def update(self, dt_ms: int, latest_command: str = None):
+        self.clock_s += dt_ms / 1000.0
+
         # 1. COMBAT INTERCEPTION
         if self.game_state.mode == "combat":
             if latest_command:
@@ -58,12 +131,69 @@ class SceneRunner:
             return  # Stop scene processing while in combat
 
         # 2. NORMAL SCENE PROCESSING
-        if not self.current_scene or self.current_step_index >= len(self.current_scene.steps):
+        # Keep going while steps complete; stop at one that has to wait
+        # (wait, typewrite, require_command), in combat, or at the budget.
+        # Time and input belong to the first step only.
+        dt_seconds = dt_ms / 1000.0
+        self._autosave_deferred = True
+        try:
+            for _ in range(self.step_budget):
+                if not self.current_scene or self.current_step_index >= len(self.current_scene.steps):
+                    return
+                serial = self.step_serial
+                self._execute_step(self.current_scene.steps[self.current_step_index], dt_seconds, latest_command)
+                if self.step_serial == serial or self.game_state.mode == "combat":
+                    return
+                dt_seconds = 0.0
+                latest_command = None
+            # Budget used up; only an overrun if the next step would not wait either
+            if self._next_step_is_instant():
+                self._report_overrun()
+        finally:
+            self._autosave_deferred = False
+            if self._autosave_pending:
+                self._autosave_pending = False
+                self._autosave()
+
+    def _preload_exits(self):
+        """
+        Queues every scene the current one can jump to: goto_scene branches,
+        and game_over if it has combat. Exits of the previous scene that were
+        not taken are dropped.
+        """
+        if not self.current_scene:
+            self.loader.retain_preloaded(())
             return
+        targets = []
+        for step in self.current_scene.steps:
+            if step.type == "branch":
+                for action in (step.kwargs.get("then"), step.kwargs.get("else")):
+                    if action and "goto_scene" in action:
+                        targets.append(action["goto_scene"])
+            elif step.type == "combat_start":
+                targets.append("game_over")
+        self.loader.retain_preloaded(targets)
+        if targets:
+            self.loader.preload(dict.fromkeys(targets))
 
+    def _next_step_is_instant(self) -> bool:
+        """False at the end of the scene or at a step that waits for time or input before completing."""
+        if not self.current_scene or self.current_step_index >= len(self.current_scene.steps):
+            return False
         step = self.current_scene.steps[self.current_step_index]
-        dt_seconds = dt_ms / 1000.0
+        if step.type == "wait":
+            return step.kwargs.get("seconds", 1.0) <= 0
+        return step.type not in ("typewrite", "require_command")
+
+    def _report_overrun(self):
+        self.budget_overruns += 1
+        where = (self.game_state.current_scene_id, self.current_step_index)
+        if where not in self._overrun_reported:
+            self._overrun_reported.add(where)
+            print(f"[SceneRunner] Step budget ({self.step_budget}) exceeded in '{where[0]}' "
+                  f"at step {where[1]}; continuing next frame (goto_step loop?)")
 
+    def _execute_step(self, step, dt_seconds: float, latest_command: str = None):
         if step.type == "print":
             self.game_state.append_history(step.kwargs.get("text", ""), step.kwargs.get("channel", "terminal"))
             self._advance_step()
@@ -77,7 +207,10 @@ class SceneRunner:
 
         elif step.type == "sfx":
             sfx_id = step.kwargs.get("sfx_id")
-            self.audio_engine.enqueue(AudioJob(kind="sfx", sfx_id=sfx_id))
+            if sfx_id in self.local_sfx:
+                self.sfx_triggers.append(sfx_id)
+            else:
+                self.audio_engine.enqueue(AudioJob(kind="sfx", sfx_id=sfx_id))
             self._advance_step()
 
         elif step.type == "wait":
@@ -91,18 +224,25 @@ class SceneRunner:
             full_text = step.kwargs.get("text", "")
             if self.current_log_entry is None:
                 self.current_log_entry = LogEntry(text="", channel=step.kwargs.get("channel", "terminal"))
-                self.game_state.history.append(self.current_log_entry)
+                self.game_state.append_entry(self.current_log_entry)
             
             speed = step.kwargs.get("speed", 30)
             char_delay = 1.0 / speed
+            click_sfx = step.kwargs.get("sfx") if step.kwargs.get("sfx") in self.local_sfx else None
+            if click_sfx:
+                self.typewriter_sfx = click_sfx
             self.typewriter_timer += dt_seconds
             
             if self.typewriter_char_index < len(full_text):
                 while self.typewriter_timer >= char_delay:
                     self.typewriter_timer -= char_delay
                     if self.typewriter_char_index < len(full_text):
-                        self.current_log_entry.text += full_text[self.typewriter_char_index]
+                        char = full_text[self.typewriter_char_index]
+                        self.current_log_entry.text += char
                         self.typewriter_char_index += 1
+                        if click_sfx and not char.isspace():
+                            # Due typewriter_timer ago (the remainder after it)
+                            self.typewriter_clicks.append(self.clock_s - self.typewriter_timer)
                     else:
                         break
             
@@ -113,12 +253,11 @@ class SceneRunner:
         elif step.type == "require_command":
             self.game_state.mode = "terminal"
             if latest_command:
-                allowed = [c.lower() for c in step.kwargs.get("commands", [])]
-                user_input = latest_command.lower().strip()
-                if user_input in allowed:
+                match = self._step_commands(step).lookup(latest_command.strip())
+                if match:
                     out_flag = step.kwargs.get("output_flag")
                     if out_flag:
-                        self.game_state.set_flag(out_flag, user_input)
+                        self.game_state.set_flag(out_flag, match.name)
                     self._advance_step()
                 else:
                     fail_msg = step.kwargs.get("fail_msg")
@@ -154,29 +293,81 @@ class SceneRunner:
         elif step.type == "quest_update":
             qid = step.kwargs.get("quest_id")
             status = step.kwargs.get("status")
-            self.game_state.quests[qid] = status
+            self.game_state.set_quest(qid, status)
             self.game_state.append_history(f"[QUEST UPDATE: {qid.upper()} -> {status.upper()}]", "system")
             self._advance_step()
 
         elif step.type == "combat_start":
-            enemy = step.kwargs.get("enemy_name", "Unknown Threat")
-            hp = step.kwargs.get("hp", 20)
+            # enemy_id picks a definition from content/combat; enemy_name/hp override it
+            enemy = self.combat.encounter_enemy(step.kwargs.get("enemy_id", ""))
+            if enemy is None:
+                # A typo must not quietly become the default enemy
+                error = (f"Unknown enemy_id '{step.kwargs['enemy_id']}' in "
+                         f"'{self.game_state.current_scene_id}' step {self.current_step_index}")
+                print(f"[SceneRunner] {error}; combat skipped")
+                self.game_state.append_history(f"{error}; combat skipped.", "error")
+                self._advance_step()
+                return
+            name = step.kwargs.get("enemy_name", enemy.name)
+            hp = step.kwargs.get("hp", enemy.hp)
             
             self.game_state.combat.active = True
-            self.game_state.combat.enemy_name = enemy
+            self.game_state.combat.enemy_id = enemy.enemy_id
+            self.game_state.combat.enemy_name = name
             self.game_state.combat.enemy_hp = hp
             self.game_state.combat.enemy_max_hp = hp
             self.game_state.combat.turn_count = 0
             
             self.game_state.mode = "combat"
             
-            self.game_state.append_history(f"WARNING: {enemy.upper()} ENGAGED.", "error")
+            self.game_state.append_history(f"WARNING: {name.upper()} ENGAGED.", "error")
             self.game_state.append_history("COMBAT MODE INITIATED.", "system")
-            self.game_state.append_history("COMMANDS: [ATTACK] [HEAL] [SCAN] [FLEE]", "terminal")
+            self.game_state.append_history(self.combat.commands_banner(enemy), "terminal")
             self._advance_step()
 
 # --- HELPER LOGIC ---
 
+    def typewriter_preview(self, ahead_s: float):
+        """
+        (entry, text) of the line being typed as it will look ahead_s from
+        now, for drawing between fixed ticks; None if nothing is typing.
+        Read-only: the next tick reveals the same characters for real.
+        """
+        if not self.current_scene or self.current_step_index >= len(self.current_scene.steps):
+            return None
+        step = self.current_scene.steps[self.current_step_index]
+        if step.type != "typewrite" or self.current_log_entry is None:
+            return None
+        full_text = step.kwargs.get("text", "")
+        if self.typewriter_char_index >= len(full_text):
+            return None
+        extra = int((self.typewriter_timer + ahead_s) * step.kwargs.get("speed", 30))
+        return self.current_log_entry, self.current_log_entry.text + full_text[self.typewriter_char_index:self.typewriter_char_index + extra]
+
+    def _step_commands(self, step) -> CommandTrie:
+        """Trie of a require_command step: "commands" plus optional "aliases" ({alias: command})."""
+        cached_step, trie = self._scene_commands
+        if cached_step is not step:
+            aliases = {}
+            for alias, command in step.kwargs.get("aliases", {}).items():
+                aliases.setdefault(command.lower(), []).append(alias)
+            trie = CommandTrie()
+            for command in step.kwargs.get("commands", []):
+                trie.add(command, aliases=aliases.get(command.lower(), ()),
+                         prefix=command.lower() not in self.FULL_WORD_COMMANDS)
+            self._scene_commands = (step, trie)
+        return trie
+
+    def active_commands(self):
+        """(context, trie) for the command router: the enemy's actions in combat, the prompt's words at a require_command step."""
+        if self.game_state.mode == "combat" and self.game_state.combat.active:
+            return "combat", self.combat.enemy(self.game_state.combat.enemy_id).command_trie
+        if self.current_scene and self.current_step_index < len(self.current_scene.steps):
+            step = self.current_scene.steps[self.current_step_index]
+            if step.type == "require_command":
+                return "scene", self._step_commands(step)
+        return "none", None
+
     def _evaluate_condition(self, condition: dict) -> bool:
         if not condition: return False
         if "flag_equals" in condition:
@@ -198,6 +389,7 @@ class SceneRunner:
             self.current_step_index = action["goto_step"]
             self.game_state.scene_cursor = self.current_step_index # Sync
             self._reset_step_state()
+            self._autosave()
         else:
             self._advance_step()
 
@@ -205,8 +397,16 @@ class SceneRunner:
         self.current_step_index += 1
         self.game_state.scene_cursor = self.current_step_index
         self._reset_step_state()
+        self._autosave()
+
+    def _autosave(self):
+        if self._autosave_deferred:
+            self._autosave_pending = True  # once, at the end of the burst
+        elif self.autosave_hook:
+            self.autosave_hook()
 
     def _reset_step_state(self):
+        self.step_serial += 1
         self.wait_timer = 0.0
         self.typewriter_timer = 0.0
         self.typewriter_char_index = 0
@@ -215,51 +415,63 @@ class SceneRunner:
 # --- COMBAT LOGIC ---
     
     def _handle_combat_turn(self, command: str):
-        cmd = command.lower().strip()
         cs = self.game_state.combat
         
-        # Player Turn Logic (Attack/Heal/etc) ... 
-        # (This part remains the same as Phase 3)
-        if cmd == "attack":
-            dmg = random.randint(3, 8)
-            cs.enemy_hp -= dmg
-            self.game_state.append_history(f"> You attack for {dmg} DMG.", "terminal")
-        elif cmd == "heal":
-            amt = 5
-            self.game_state.hp = min(self.game_state.max_hp, self.game_state.hp + amt)
-            self.game_state.append_history(f"> Systems repaired (+{amt} HP).", "system")
-        elif cmd == "scan":
-            self.game_state.append_history(f"TARGET: {cs.enemy_name} | HP: {cs.enemy_hp}/{cs.enemy_max_hp}", "info")
-            return 
-        elif cmd == "flee":
-            if random.random() > 0.5:
-                self.game_state.append_history("ESCAPED SUCCESSFULLY.", "system")
-                self._end_combat()
-                return
-            else:
-                self.game_state.append_history("ESCAPE FAILED.", "error")
+        self._resolve_combat_turn(command, cs)
+        self._autosave()
+
+    def _resolve_combat_turn(self, command: str, cs):
+        gs = self.game_state
+        enemy = self.combat.enemy(cs.enemy_id)
+        outcome = self.combat.resolve_turn(enemy, command, gs.hp, gs.max_hp, cs.enemy_hp, self.rng)
+        gs.hp = outcome.player_hp
+        cs.enemy_hp = outcome.enemy_hp
+        if outcome.consumed_turn:
+            cs.turn_count += 1
+
+        if outcome.result == "invalid":
+            gs.append_history("Invalid Combat Command.", "error")
+            return
+
+        # Player Turn (message templates come from content/combat/actions.json)
+        action = outcome.action
+        fields = {
+            "amount": outcome.damage_dealt if action.effect == "damage" else action.amount,
+            "healed": outcome.healed,
+            "enemy": cs.enemy_name,
+            "enemy_hp": cs.enemy_hp,
+            "enemy_max_hp": cs.enemy_max_hp,
+            "hp": gs.hp,
+            "max_hp": gs.max_hp,
+        }
+        if outcome.flee_failed:
+            gs.append_history(action.fail_text.format(**fields), "error")
         else:
-            self.game_state.append_history("Invalid Combat Command.", "error")
+            gs.append_history(action.text.format(**fields), action.channel)
+
+        if outcome.result == "scan":
+            return
+        if outcome.result == "fled":
+            self._end_combat()
             return
 
         # Check Win
-        if cs.enemy_hp <= 0:
-            self.game_state.append_history(f"TARGET {cs.enemy_name} DESTROYED.", "system")
+        if outcome.result == "won":
+            gs.append_history(f"TARGET {cs.enemy_name} DESTROYED.", "system")
             self._end_combat()
             return
 
         # Enemy Turn
-        enemy_dmg = random.randint(2, 6)
-        self.game_state.hp -= enemy_dmg
-        self.game_state.append_history(f"WARNING: Hull breach! Took {enemy_dmg} DMG. (Integrity: {self.game_state.hp})", "error")
+        fields["damage"] = outcome.damage_taken
+        gs.append_history(outcome.attack.text.format(**fields), outcome.attack.channel)
 
         # --- UPDATED: Check Loss (Game Over Trigger) ---
-        if self.game_state.hp <= 0:
-            self.game_state.append_history("CRITICAL FAILURE. SYSTEM TERMINATED.", "error")
+        if outcome.result == "lost":
+            gs.append_history("CRITICAL FAILURE. SYSTEM TERMINATED.", "error")
             
             # 1. Force end combat mode so we don't get stuck processing combat commands
-            self.game_state.combat.active = False
-            self.game_state.mode = "cutscene" 
+            gs.combat.active = False
+            gs.mode = "cutscene" 
             
             # 2. Load the Game Over scene
             self.load("game_over") 
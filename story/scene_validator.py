@@ -17,10 +17,10 @@ class SceneValidator:
     # (Optional fields like 'channel' or 'speed' are not listed here)
     STEP_REQUIREMENTS = {
         "print": ["text"],
-        "typewrite": ["text"],
+        "typewrite": ["text"],  # optional: speed, channel, sfx (click per character, banked SFX only)
         "wait": ["seconds"],
         "voice": ["text"],        
-        "require_command": ["commands"], # output_flag is optional
+        "require_command": ["commands"], # output_flag, aliases ({alias: command}) are optional
         "set_flag": ["key", "value"],
         "branch": ["if", "then"],
         "sfx": ["sfx_id"],
@@ -29,7 +29,7 @@ class SceneValidator:
         "give_item": ["item_id"],   # optional: qty
         "remove_item": ["item_id"], # optional: qty
         "quest_update": ["quest_id", "status"], # "active", "completed"
-        "combat_start": ["enemy_name", "hp"],
+        "combat_start": [], # enemy_id, or enemy_name + hp (see _validate_step)
         "combat_end": [] # No args required
     }
 
@@ -65,4 +65,10 @@ class SceneValidator:
         required = self.STEP_REQUIREMENTS[step_type]
         for field in required:
             if field not in step:
-                raise SceneValidationError(f"Step #{index} ({step_type}) missing required field: '{field}'")
\ No newline at end of file
+                raise SceneValidationError(f"Step #{index} ({step_type}) missing required field: '{field}'")
+
+        # C. Combat: a content/combat enemy, or an ad-hoc one
+        if step_type == "combat_start" and "enemy_id" not in step:
+            for field in ("enemy_name", "hp"):
+                if field not in step:
+                    raise SceneValidationError(f"Step #{index} (combat_start) needs 'enemy_id' or '{field}'")
\ No newline at end of file
@@ -0,0 +1,179 @@
+# story/scene_watcher.py
+
+import ctypes
+import ctypes.util
+import json
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from story.scene_types import Scene
+from story.scene_validator import SceneValidationError
+from story.story_loader import StoryLoader
+
+@dataclass
+class SceneReload:
+    """Worker thread -> Main Thread: a scene file changed and was re-validated."""
+    scene_id: str
+    scene: Optional[Scene]   # None if the edit is invalid
+    error: str = ""
+    saved_at: float = 0.0    # file mtime (time.time() clock)
+    validate_ms: float = 0.0
+
+class SceneWatcher:
+    """
+    Dev-mode hot reload for content/scenes. A background thread watches the
+    directory (inotify on Linux, mtime polling elsewhere or if inotify is
+    unavailable), then reads and validates changed files itself. The main
+    thread only receives finished SceneReload results via poll().
+    """
+    # inotify(7)
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    DEBOUNCE_S = 0.05  # editors often write a file in several steps
+
+    def __init__(self, scenes_dir: str = "content/scenes", poll_interval_s: float = 0.25):
+        self.scenes_dir = scenes_dir
+        self.poll_interval_s = poll_interval_s
+        self.parser = StoryLoader(scenes_dir)  # validator + parser only, never its error scenes
+
+        self.results: "queue.Queue[SceneReload]" = queue.Queue()
+        self.backend = "none"
+        self.latencies_ms: List[float] = []  # save -> on screen, filled by the caller via mark_displayed()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Main Thread API ---
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SceneWatcher", daemon=True)
+            self._thread.start()
+
+    def poll(self) -> List[SceneReload]:
+        events = []
+        try:
+            while True:
+                events.append(self.results.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def mark_displayed(self, reload: SceneReload) -> float:
+        """Records save -> on-screen latency once the frame showing the reload is presented."""
+        latency_ms = max(0.0, (time.time() - reload.saved_at) * 1000.0)
+        self.latencies_ms.append(latency_ms)
+        return latency_ms
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    # --- Worker Thread ---
+
+    def _run(self):
+        fd = self._open_inotify()
+        if fd is not None:
+            self.backend = "inotify"
+            try:
+                self._run_inotify(fd)
+            finally:
+                os.close(fd)
+        else:
+            self.backend = "polling"
+            self._run_polling()
+
+    def _open_inotify(self) -> Optional[int]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+            if libc.inotify_add_watch(fd, os.fsencode(self.scenes_dir), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError) as e:
+            print(f"[SceneWatcher] inotify unavailable ({e}), polling instead.")
+            return None
+
+    def _run_inotify(self, fd: int):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([fd], [], [], 0.5)
+            if not ready:
+                continue
+            changed = set(self._read_events(fd))
+            # Let a multi-step save settle, folding its events into one reload
+            while select.select([fd], [], [], self.DEBOUNCE_S)[0]:
+                changed.update(self._read_events(fd))
+            for filename in sorted(changed):
+                self._reload(filename)
+
+    def _read_events(self, fd: int):
+        data = os.read(fd, 64 * 1024)
+        pos = 0
+        while pos < len(data):
+            _, _, _, name_len = self.EVENT_HEADER.unpack_from(data, pos)
+            pos += self.EVENT_HEADER.size
+            name = data[pos:pos + name_len].rstrip(b"\0").decode('utf-8', errors='replace')
+            pos += name_len
+            if name.endswith(".json"):
+                yield name
+
+    def _run_polling(self):
+        mtimes = self._scan()
+        while not self._stop.wait(self.poll_interval_s):
+            current = self._scan()
+            for filename, mtime in current.items():
+                if mtimes.get(filename) != mtime:
+                    self._reload(filename)
+            mtimes = current
+
+    def _scan(self) -> Dict[str, int]:
+        mtimes = {}
+        try:
+            with os.scandir(self.scenes_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        mtimes[entry.name] = entry.stat().st_mtime_ns
+        except OSError:
+            pass
+        return mtimes
+
+    def _reload(self, filename: str):
+        scene_id = filename[:-len(".json")]
+        path = os.path.join(self.scenes_dir, filename)
+        t0 = time.perf_counter()
+        try:
+            saved_at = os.path.getmtime(path)
+        except FileNotFoundError:
+            return  # deleted or renamed away; keep whatever is loaded
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.parser.validator.validate(data)
+            if data["scene_id"] != scene_id:
+                raise SceneValidationError(f"scene_id '{data['scene_id']}' does not match file name")
+            scene = self.parser._parse_scene_data(data)
+            error = ""
+        except json.JSONDecodeError as e:
+            scene, error = None, f"Invalid JSON: {e}"
+        except SceneValidationError as e:
+            scene, error = None, f"Schema Error: {e}"
+        except Exception as e:
+            scene, error = None, f"Unknown Error: {e}"
+
+        self.results.put(SceneReload(scene_id, scene, error, saved_at, (time.perf_counter() - t0) * 1000.0))
@@ -2,25 +2,130 @@
 
 import json
 import os
+import queue
+import threading
+from typing import Dict, Iterable, Optional, Tuple
 from story.scene_types import Scene, Step
 from story.scene_validator import SceneValidator, SceneValidationError # <--- NEW
 
 class StoryLoader:
-    def __init__(self, scenes_dir: str = "content/scenes"):
+    def __init__(self, scenes_dir: str = "content/scenes", cache: bool = False):
         self.scenes_dir = scenes_dir
         self.validator = SceneValidator() # <--- NEW
 
+        # Parsed scenes by id. Scenes are never mutated by SceneRunner, so one
+        # cached loader can be shared by every session in a host process.
+        self.cache: Optional[Dict[str, Scene]] = {} if cache else None
+
+        # Background preloading (see preload()). Without a cache, preloaded
+        # scenes are held until their first load_scene() or until
+        # retain_preloaded() drops them, so such a loader serves one runner.
+        self.preloaded: Dict[str, Scene] = {}
+        self._preload_queue: Optional[queue.Queue] = None
+        self._pending = set()
+        self._wanted = set()        # no cache: ids the preloader may still hand over
+        self._fresh = set()         # cache: ids the preloader put there, not yet loaded
+        self._lock = threading.Lock()
+
+    def is_ready(self, scene_id: str) -> bool:
+        """True if load_scene(scene_id) will not touch the disk."""
+        return scene_id in self.preloaded or (self.cache is not None and scene_id in self.cache)
+
+    def replace_scene(self, scene_id: str, scene: Scene):
+        """Swaps in a newer version (hot reload) so later loads don't return a stale copy."""
+        with self._lock:
+            self.preloaded.pop(scene_id, None)
+            self._fresh.discard(scene_id)
+            if self.cache is not None:
+                self.cache[scene_id] = scene
+
+    def retain_preloaded(self, scene_ids: Iterable[str]):
+        """
+        Without a cache: drops preloaded scenes (and queued preloads) not in
+        scene_ids, e.g. the branches a transition did not take, so they are
+        not served stale much later. With a cache this does nothing.
+        """
+        if self.cache is not None:
+            return
+        keep = set(scene_ids)
+        with self._lock:
+            self._wanted &= keep
+            for scene_id in [sid for sid in self.preloaded if sid not in keep]:
+                del self.preloaded[scene_id]
+
+    def preload(self, scene_ids: Iterable[str]):
+        """
+        Reads, validates and parses scenes on a background thread so a later
+        load_scene() is a dict lookup. Scenes that fail are not kept; the
+        main-thread load reports the error as usual.
+        """
+        scene_ids = list(scene_ids)
+        with self._lock:
+            if self.cache is None:
+                self._wanted.update(scene_ids)
+            wanted = [sid for sid in scene_ids if not self.is_ready(sid) and sid not in self._pending]
+            if not wanted:
+                return
+            self._pending.update(wanted)
+            if self._preload_queue is None:
+                self._preload_queue = queue.Queue()
+                threading.Thread(target=self._preload_loop, name="ScenePreloader", daemon=True).start()
+        for scene_id in wanted:
+            self._preload_queue.put(scene_id)
+
+    def _preload_loop(self):
+        while True:
+            scene_id = self._preload_queue.get()
+            try:
+                scene, ok = self._read_scene(scene_id)
+            except Exception as e:
+                print(f"[StoryLoader] Preload failed for '{scene_id}': {e}")
+                ok = False
+            with self._lock:
+                self._pending.discard(scene_id)
+                if ok:
+                    if self.cache is not None:
+                        if scene_id not in self.cache:
+                            self.cache[scene_id] = scene
+                            self._fresh.add(scene_id)
+                    elif scene_id in self._wanted:
+                        self.preloaded[scene_id] = scene
+
     def load_scene(self, scene_id: str) -> Scene:
         """
         Loads a scene from a JSON file in content/scenes/.
         Validates schema before parsing.
         """
+        return self.fetch_scene(scene_id)[0]
+
+    def fetch_scene(self, scene_id: str) -> Tuple[Scene, bool]:
+        """load_scene(), plus whether the scene came from the background preloader (not the cache or disk)."""
+        if self.preloaded or self._fresh:
+            with self._lock:
+                scene = self.preloaded.pop(scene_id, None)
+                self._wanted.discard(scene_id)
+                if scene is not None:
+                    return scene, True
+                if scene_id in self._fresh:
+                    self._fresh.discard(scene_id)
+                    return self.cache[scene_id], True
+        if self.cache is not None:
+            scene = self.cache.get(scene_id)
+            if scene is None:
+                scene, ok = self._read_scene(scene_id)
+                if ok:  # error scenes are retried on the next load
+                    self.cache[scene_id] = scene
+            return scene, False
+        return self._read_scene(scene_id)[0], False
+
+    def _read_scene(self, scene_id: str):
+        """Returns (scene, ok); ok is False when an error scene was substituted."""
         filename = f"{scene_id}.json"
         path = os.path.join(self.scenes_dir, filename)
 
         # 1. Check File Existence
         if not os.path.exists(path):
-            return self._create_error_scene(scene_id, f"File not found: {path}")
+            return self._create_error_scene(scene_id, f"File not found: {path}"), False
 
         try:
             with open(path, 'r', encoding='utf-8') as f:
@@ -30,14 +135,14 @@ class StoryLoader:
             self.validator.validate(data)
             
             # 3. Parse Data
-            return self._parse_scene_data(data)
+            return self._parse_scene_data(data), True
 
         except json.JSONDecodeError as e:
-            return self._create_error_scene(scene_id, f"Invalid JSON: {e}")
+            return self._create_error_scene(scene_id, f"Invalid JSON: {e}"), False
         except SceneValidationError as e:
-            return self._create_error_scene(scene_id, f"Schema Error: {e}")
+            return self._create_error_scene(scene_id, f"Schema Error: {e}"), False
         except Exception as e:
-            return self._create_error_scene(scene_id, f"Unknown Error: {e}")
+            return self._create_error_scene(scene_id, f"Unknown Error: {e}"), False
 
     def _create_error_scene(self, scene_id: str, error_msg: str) -> Scene:
         """
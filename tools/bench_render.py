@@ -0,0 +1,233 @@
+# tools/bench_render.py
+#
+# Headless RenderEngine benchmark (SDL dummy video driver, offscreen surface).
+#
+#   python -m tools.bench_render                      # run + compare to baseline
+#   python -m tools.bench_render --save-baseline      # record a new baseline
+#
+# Each scenario runs twice: "warm" (wrap cache kept, the steady state) and
+# "cold" (wrap cache cleared before every frame, so visible entries are
+# re-wrapped through _wrap_text_pixel each frame).
+#
+# Baselines are local: timings only compare on the machine that recorded
+# them, so tools/baselines/render.json is not committed. Only
+# --save-baseline writes one. A run with no baseline from this machine and
+# frame count (or after a Python/pygame/CPU change) compares nothing and
+# exits with status 2; otherwise it exits with status 1 if a scenario is
+# slower than baseline * (1 + tolerance). Typical use: --save-baseline on
+# the base commit, then run again on the change.
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import pygame
+from core.config import GlobalConfig
+from core.models import GameState, UIState, LogEntry
+from core.render_engine import RenderEngine
+from core.transcript import Transcript
+
+class CallTimer:
+    """Accumulates call count and total time for one wrapped function."""
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+        self.total_s = 0.0
+
+    def __call__(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return self.fn(*args, **kwargs)
+        finally:
+            self.total_s += time.perf_counter() - t0
+            self.calls += 1
+
+    def reset(self):
+        self.calls = 0
+        self.total_s = 0.0
+
+    def per_call_us(self) -> float:
+        return (self.total_s / self.calls) * 1e6 if self.calls else 0.0
+
+class TimedFont:
+    """Proxy around pygame.font.Font that times render() calls."""
+    def __init__(self, font: pygame.font.Font):
+        self._font = font
+        self.render = CallTimer(font.render)
+
+    def __getattr__(self, name):
+        return getattr(self._font, name)
+
+class RenderBenchmark:
+    WORDS = ["uplink", "vessel", "integrity", "root", "access", "daemon", "sigil", "kernel",
+             "ward", "mana", "packet", "relay", "lattice", "rune", "override", "sector"]
+    CHANNELS = ["terminal", "system", "error", "voice", "narration", "info"]
+
+    def __init__(self, frames: int, seed: int = 7):
+        self.frames = frames
+        self.rng = random.Random(seed)
+        self.config = GlobalConfig()
+
+        pygame.init()
+        pygame.display.set_mode((1, 1))
+        self.surface = pygame.Surface((self.config.WIDTH, self.config.HEIGHT))
+        self.engine = RenderEngine(self.config)
+
+        self.font_timer = TimedFont(self.engine.font)
+        self.engine.font = self.font_timer
+        self.wrap_timer = CallTimer(self.engine._wrap_text_pixel)
+        self.engine._wrap_text_pixel = self.wrap_timer
+
+    # --- Synthetic Histories ---
+
+    def _sentence(self, words: int) -> str:
+        return " ".join(self.rng.choice(self.WORDS) for _ in range(words))
+
+    def _state(self, texts) -> GameState:
+        state = GameState(self.config)
+        for text in texts:
+            state.append_history(text, self.rng.choice(self.CHANNELS))
+        return state
+
+    def scenarios(self):
+        """name -> (GameState, UIState, per-frame mutator or None)"""
+        lines = self.config.MAX_HISTORY_LINES
+        short = self._state(self._sentence(4) for _ in range(lines))
+        wrapped = self._state(self._sentence(120) for _ in range(lines))
+        tokens = self._state("".join(self.rng.choice("0123456789ABCDEF") for _ in range(600)) for _ in range(lines))
+
+        # scroll_offset counts wrapped lines up from the bottom
+        scrolled = self._state(self._sentence(self.rng.randint(4, 60)) for _ in range(lines))
+        scrolled_ui = UIState(scroll_offset=lines - 5)
+
+        typing = self._state(self._sentence(20) for _ in range(lines - 1))
+        typing_entry = LogEntry(text="", channel="terminal")
+        typing.append_entry(typing_entry)
+        typing_source = self._sentence(400)
+
+        def typewrite(frame: int):
+            typing_entry.text = typing_source[:frame * 2 % len(typing_source)]
+
+        # 100k entries on disk, viewport wandering 50k lines up from the bottom
+        transcript = GameState(self.config)
+        transcript.transcript = Transcript(os.path.join(tempfile.mkdtemp(), "transcript.log"))
+        for _ in range(100_000):
+            transcript.append_history(self._sentence(self.rng.randint(4, 40)), self.rng.choice(self.CHANNELS))
+        transcript_ui = UIState(scroll_offset=50_000)
+
+        def scroll(frame: int):
+            transcript_ui.scroll_offset = 50_000 + (frame * 7) % 2000
+
+        return {
+            "short_lines": (short, UIState(), None),
+            "long_wrapped": (wrapped, UIState(), None),
+            "unbreakable_tokens": (tokens, UIState(), None),
+            "heavy_scroll": (scrolled, scrolled_ui, None),
+            "typewriting": (typing, UIState(), typewrite),
+            "deep_transcript": (transcript, transcript_ui, scroll),
+        }
+
+    # --- Run ---
+
+    def run(self) -> dict:
+        results = {}
+        for name, (state, ui, mutate) in self.scenarios().items():
+            # Warm-up frame (font glyph caches etc.)
+            self.engine.render(self.surface, state, ui)
+            for mode in ("warm", "cold"):
+                results[f"{name}/{mode}"] = self._measure(state, ui, mutate, cold=(mode == "cold"))
+        return results
+
+    def _measure(self, state: GameState, ui: UIState, mutate, cold: bool) -> dict:
+        self.wrap_timer.reset()
+        self.font_timer.render.reset()
+        wrap_cache = self.engine._wrap_cache
+
+        t0 = time.perf_counter()
+        for frame in range(self.frames):
+            if mutate:
+                mutate(frame)
+            if cold:
+                wrap_cache.clear()
+            self.engine.render(self.surface, state, ui)
+        elapsed = time.perf_counter() - t0
+
+        return {
+            "fps": self.frames / elapsed,
+            "frame_ms": elapsed * 1000.0 / self.frames,
+            "wrap_calls_per_frame": self.wrap_timer.calls / self.frames,
+            "wrap_us_per_call": self.wrap_timer.per_call_us(),
+            "font_render_calls_per_frame": self.font_timer.render.calls / self.frames,
+            "font_render_us_per_call": self.font_timer.render.per_call_us(),
+        }
+
+def machine_id() -> dict:
+    """What a baseline's timings depend on; baselines from anywhere else are not compared."""
+    return {"node": platform.node(), "machine": platform.machine(), "processor": platform.processor(),
+            "python": platform.python_version(), "pygame": pygame.version.ver}
+
+def save_baseline(path: str, results: dict, frames: int):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(results, _meta=dict(machine_id(), frames=frames)), f, indent=2)
+    print(f"Baseline saved: {path}")
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Returns regression messages for scenarios slower than the baseline allows."""
+    failures = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base["frame_ms"] * (1.0 + tolerance)
+        if r["frame_ms"] > limit:
+            failures.append(f"{name}: {r['frame_ms']:.2f} ms/frame > {limit:.2f} (baseline {base['frame_ms']:.2f})")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless RenderEngine benchmark.")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--baseline", default="tools/baselines/render.json")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    results = RenderBenchmark(args.frames).run()
+    pygame.quit()
+
+    print(f"{'scenario':<25}{'fps':>9}{'ms/frame':>10}{'wrap/frm':>10}{'wrap us':>9}{'render/frm':>11}{'render us':>10}")
+    for name, r in results.items():
+        print(f"{name:<25}{r['fps']:>9.1f}{r['frame_ms']:>10.2f}{r['wrap_calls_per_frame']:>10.1f}"
+              f"{r['wrap_us_per_call']:>9.1f}{r['font_render_calls_per_frame']:>11.1f}{r['font_render_us_per_call']:>10.1f}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.frames)
+        return
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    meta = baseline.get("_meta", {}) if baseline else {}
+    if not baseline or any(meta.get(k) != v for k, v in machine_id().items()) or meta.get("frames") != args.frames:
+        reason = f"No baseline at {args.baseline}" if not baseline else "Baseline is from another machine or setup"
+        print(f"{reason}: no comparable baseline. Record one with --save-baseline.")
+        sys.exit(2)
+
+    failures = compare(results, baseline, args.tolerance)
+    if failures:
+        print("RENDER REGRESSION:")
+        for msg in failures:
+            print(f"  {msg}")
+        sys.exit(1)
+    print("Render benchmark within baseline tolerance.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# tools/bench_save_codecs.py
+#
+# Compares save size, encode time and decode time across save codecs
+# using synthetic saves with large flag and inventory maps.
+#
+#   python -m tools.bench_save_codecs --flags 5000 --items 2000
+
+import argparse
+import json
+import random
+import time
+from core.config import GlobalConfig
+from core.models import GameState
+from core.save_codec import JsonSaveCodec, BinarySaveCodec
+
+class LegacyJsonCodec(JsonSaveCodec):
+    """The pre-codec format: json.dump(indent=4)."""
+    name = "json-indent4"
+
+    def encode(self, data: dict) -> bytes:
+        return json.dumps(data, indent=4).encode('utf-8')
+
+class SaveCodecBenchmark:
+    def __init__(self, flags: int, items: int, quests: int, history: int, seed: int = 1234):
+        self.rng = random.Random(seed)
+        self.data = self._build_state(flags, items, quests, history).to_dict()
+
+    def _build_state(self, flags: int, items: int, quests: int, history: int) -> GameState:
+        state = GameState(GlobalConfig())
+        channels = ["terminal", "system", "error", "voice", "narration", "info"]
+        for i in range(flags):
+            value = self.rng.choice([True, False, self.rng.randint(-1000, 1000), f"choice_{i % 7}"])
+            state.set_flag(f"flag_{i:05d}", value)
+        for i in range(items):
+            state.add_item(f"item_{i:05d}", self.rng.randint(1, 99))
+        for i in range(quests):
+            state.set_quest(f"quest_{i:04d}", self.rng.choice(["active", "completed"]))
+        for i in range(history):
+            state.append_history(f"Line {i}: " + "lorem ipsum " * self.rng.randint(1, 8), self.rng.choice(channels))
+        return state
+
+    def _best_ms(self, fn, repeat: int) -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        return best * 1000.0
+
+    def run(self, repeat: int):
+        codecs = [LegacyJsonCodec(), JsonSaveCodec(), BinarySaveCodec()]
+        baseline_size = None
+
+        print(f"{'codec':<14}{'bytes':>12}{'ratio':>8}{'encode ms':>12}{'decode ms':>12}")
+        decode_ms = {}
+        for codec in codecs:
+            blob = codec.encode(self.data)
+            if codec.decode(blob) != self.data:
+                raise AssertionError(f"{codec.name} round-trip mismatch")
+
+            baseline_size = baseline_size or len(blob)
+            enc_ms = self._best_ms(lambda: codec.encode(self.data), repeat)
+            dec_ms = self._best_ms(lambda: codec.decode(blob), repeat)
+            ratio = len(blob) / baseline_size
+            print(f"{codec.name:<14}{len(blob):>12}{ratio:>8.2f}{enc_ms:>12.2f}{dec_ms:>12.2f}")
+            decode_ms[codec.name] = dec_ms
+        print(f"binary decodes in {decode_ms['binary'] / decode_ms['json']:.2f}x json's time")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark save codecs.")
+    parser.add_argument("--flags", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--quests", type=int, default=200)
+    parser.add_argument("--history", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bench = SaveCodecBenchmark(args.flags, args.items, args.quests, args.history)
+    bench.run(args.repeat)
+
+if __name__ == "__main__":
+    main()
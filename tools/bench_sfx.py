@@ -0,0 +1,160 @@
+# tools/bench_sfx.py
+#
+# SFX trigger throughput (SDL dummy audio driver, synthetic clips in a temp dir).
+#
+#   python -m tools.bench_sfx                     # 2 s per path
+#   python -m tools.bench_sfx --seconds 5 --json sfx_bench.json
+#
+# Paths:
+#   worker - AudioJob through AudioEngine: worker stat()s the file, main thread
+#            polls the event and decodes the file again for every play
+#   file   - same per-trigger work without the thread hop (get_path + play_sfx)
+#   bank   - SceneRunner trigger list drained into AudioPlayer.trigger_sfx:
+#            dict lookup + Channel.play on a Sound sliced from the bank
+#
+# Then typewriter clicks at 60 chars/s and 60 FPS: a SceneRunner typewrite step
+# on fixed ticks feeds queue_typewriter()/play_typewriter(); reports the
+# main-thread cost per frame and how many of the line's clicks were played.
+
+import os
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import shutil
+import struct
+import tempfile
+import time
+import wave
+import pygame
+from core.audio_engine import AudioEngine, NullAudioEngine
+from core.audio_models import AudioJob
+from core.audio_player import AudioPlayer
+from core.config import GlobalConfig
+from core.fixed_timestep import FixedTimestep
+from core.models import GameState
+from core.sfx_bank import SFXBank
+from core.sfx_library import SFXLibrary
+from story.scene_runner import SceneRunner
+from story.scene_types import Scene, Step
+
+CLIPS = {"typing.wav": 0.03, "alert.wav": 0.4, "boot_hum.wav": 1.5}
+
+def write_clip(path: str, seconds: float, freq: int = 22050):
+    frames = int(seconds * freq)
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(freq)
+        w.writeframes(b"".join(struct.pack("<h", int(8000 * math.sin(i * 0.2))) for i in range(frames)))
+
+def rate(fn, seconds: float) -> dict:
+    count = 0
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    while time.perf_counter() < deadline:
+        fn()
+        count += 1
+    elapsed = time.perf_counter() - t0
+    return {"triggers": count, "per_s": count / elapsed, "us_per_trigger": elapsed / count * 1e6}
+
+def main():
+    parser = argparse.ArgumentParser(description="SFX trigger throughput: worker vs file vs bank.")
+    parser.add_argument("--seconds", type=float, default=2.0, help="per path")
+    parser.add_argument("--json", help="also write results here")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_sfx_")
+    try:
+        for name, seconds in CLIPS.items():
+            write_clip(os.path.join(tmp, name), seconds)
+        config = GlobalConfig(SFX_DIR=tmp, SFX_BANK_PATH=os.path.join(tmp, "bank.bin"), AUDIO_BACKEND="mock")
+
+        player = AudioPlayer(config)
+        if not player.sfx_channel:
+            raise SystemExit("Mixer unavailable")
+        t0 = time.perf_counter()
+        SFXBank.build(config, config.SFX_BANK_PATH)
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        t0 = time.perf_counter()
+        player.load_sfx_bank()
+        load_ms = (time.perf_counter() - t0) * 1000.0
+        print(f"bank: {len(CLIPS)} files, {os.path.getsize(config.SFX_BANK_PATH) / 1024:.0f} KiB, "
+              f"build {build_ms:.1f} ms, load {load_ms:.1f} ms")
+
+        library = SFXLibrary(config)
+        engine = AudioEngine(config)
+
+        def worker():
+            engine.enqueue(AudioJob(kind="sfx", sfx_id="typing"))
+            while True:
+                events = [e for e in engine.poll_events() if e.type == "AUDIO_READY"]
+                if events:
+                    for e in events:
+                        player.play_sfx(e.data)
+                    return
+
+        def file():
+            player.play_sfx(library.get_path("typing"))
+
+        triggers = []
+
+        def bank():
+            triggers.append("typing")  # what SceneRunner does for a banked sfx step
+            for sfx_id in triggers:
+                player.trigger_sfx(sfx_id)
+            triggers.clear()
+
+        results = {}
+        for name, fn in (("worker", worker), ("file", file), ("bank", bank)):
+            results[name] = rate(fn, args.seconds)
+            r = results[name]
+            print(f"{name:<8}{r['per_s']:>12,.0f} triggers/s{r['us_per_trigger']:>10.1f} us/trigger")
+        print(f"bank vs worker: {results['bank']['per_s'] / results['worker']['per_s']:.0f}x")
+
+        # Typewriter: a 60 cps typewrite step on fixed ticks, 60 FPS render
+        # loop paced in real time (frame jitter included)
+        text = "x" * int(args.seconds * 60)
+        runner = SceneRunner(GameState(config), NullAudioEngine())
+        runner.local_sfx = frozenset(player.sfx_sounds)
+        runner.current_scene = Scene("bench_typewriter", [Step("typewrite", {"text": text, "speed": 60, "sfx": "typing"})])
+        sim_clock = FixedTimestep(config.SIM_TICK_MS, config.MAX_SIM_TICKS_PER_FRAME)
+        frames = 0
+        cost_s = 0.0
+        last = next_frame = time.perf_counter()
+        while runner.current_step_index == 0:
+            next_frame += 1 / 60
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+            now = time.perf_counter()
+            dt_ms = int((now - last) * 1000)  # as clock.tick reports it
+            last += dt_ms / 1000.0
+            for _ in range(sim_clock.advance(dt_ms)):
+                runner.update(config.SIM_TICK_MS)
+            t0 = time.perf_counter()
+            player.queue_typewriter(runner.typewriter_sfx, runner.typewriter_clicks)
+            runner.typewriter_clicks.clear()
+            player.play_typewriter(runner.clock_s + sim_clock.alpha * config.SIM_TICK_MS / 1000.0)
+            cost_s += time.perf_counter() - t0
+            frames += 1
+        results["typewriter_60cps"] = {
+            "frames": frames,
+            "chars": len(text),
+            "us_per_frame": cost_s / frames * 1e6,
+            "clicks_played": player.clicks_played,
+            "clicks_dropped": player.clicks_dropped,
+        }
+        r = results["typewriter_60cps"]
+        print(f"typewriter 60 cps: {r['us_per_frame']:.1f} us/frame, {r['clicks_played']}/{r['chars']} clicks played, "
+              f"{r['clicks_dropped']} dropped (cap {config.TYPEWRITER_SFX_MAX_CPS}/s)")
+
+        engine.shutdown()
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({"build_ms": build_ms, "load_ms": load_ms, "paths": results}, f, indent=2)
+    finally:
+        pygame.mixer.quit()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# tools/bench_shards.py
+#
+# Aggregate stepping throughput of server.shard_supervisor versus worker count.
+#
+#   python -m tools.bench_shards                          # 1, 2, 4 ... up to the core count
+#   python -m tools.bench_shards --workers 1 2 3 --sessions 3000
+#
+# Every run serves the same number of simulated operators at a tick rate
+# they can't all meet on one core, so session-steps/s measures capacity.
+# The clients run in this process and take CPU from the workers; on a
+# machine with fewer free cores than workers the curve flattens early.
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from core.config import GlobalConfig
+from server.shard_supervisor import ShardSupervisor
+from tools.load_host import SimulatedClient, free_port
+
+class ShardBenchmark:
+    def __init__(self, sessions: int, tick_hz: int, duration_s: float, think_s: float):
+        self.config = GlobalConfig()
+        self.sessions = sessions
+        self.tick_hz = tick_hz
+        self.duration_s = duration_s
+        self.think_s = think_s
+
+    async def _run_one(self, workers: int) -> dict:
+        supervisor = ShardSupervisor(self.config, workers=workers, tick_hz=self.tick_hz)
+        supervisor.start()
+        port = free_port()
+        server = asyncio.create_task(supervisor.serve("127.0.0.1", port))
+        stop = asyncio.Event()
+        try:
+            await asyncio.sleep(0.5)
+            rng = random.Random(workers)
+            clients = [SimulatedClient("127.0.0.1", port, self.think_s, random.Random(rng.random()))
+                       for _ in range(self.sessions)]
+            tasks = [asyncio.create_task(c.run(stop)) for c in clients]
+
+            # Let every connection land and the workers settle before measuring
+            await asyncio.sleep(2.0)
+            supervisor.reset_stats()
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.duration_s)
+            stats = await supervisor.stats()
+            stats["wall_s"] = time.perf_counter() - t0
+
+            stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return stats
+        finally:
+            server.cancel()
+            supervisor.shutdown()
+
+    def run(self, worker_counts) -> list:
+        return [asyncio.run(self._run_one(n)) for n in worker_counts]
+
+def main():
+    cores = os.cpu_count() or 1
+    default_counts = [n for n in (1, 2, 4, 8, 16) if n <= cores] or [1]
+    parser = argparse.ArgumentParser(description="Sharded host throughput vs worker count.")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_counts)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--tick-hz", type=int, default=120)
+    parser.add_argument("--duration", type=float, default=8.0)
+    parser.add_argument("--think", type=float, default=2.0, help="mean seconds between commands per client")
+    args = parser.parse_args()
+
+    bench = ShardBenchmark(args.sessions, args.tick_hz, args.duration, args.think)
+    results = bench.run(args.workers)
+
+    print(f"{args.sessions} sessions, {args.tick_hz} Hz target, {cores} cores")
+    print(f"{'workers':>8}{'sessions':>10}{'steps/s':>12}{'speedup':>9}{'tick p95':>10}{'lag p95':>10}{'cpu':>7}")
+    base = results[0]["steps_per_s"] or 1.0
+    for n, r in zip(args.workers, results):
+        print(f"{n:>8}{r['sessions']:>10}{r['steps_per_s']:>12.0f}{r['steps_per_s'] / base:>8.2f}x"
+              f"{r['tick_ms_p95']:>10.1f}{r['lag_ms_p95']:>10.1f}{r['cpu_util'] * 100:>6.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# tools/bench_slot_index.py
+#
+# Measures save slot listing with and without the metadata index.
+# Builds N synthetic slots in a temporary directory.
+#
+#   python -m tools.bench_slot_index --slots 5000
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from core.config import GlobalConfig
+from core.models import GameState
+from core.save_system import SaveSystem
+
+class SlotIndexBenchmark:
+    def __init__(self, slots: int, codec: str, seed: int = 99):
+        self.slots = slots
+        self.codec = codec
+        self.rng = random.Random(seed)
+        self.save_dir = tempfile.mkdtemp(prefix="root_access_slots_")
+
+    def _populate(self):
+        """Writes slot files directly (skips per-save fsync so setup stays quick)."""
+        system = SaveSystem(self.save_dir, codec=self.codec)
+        state = GameState(GlobalConfig())
+        for i in range(60):
+            state.append_history(f"Synthetic line {i} " + "data " * self.rng.randint(1, 10))
+        for i in range(200):
+            state.set_flag(f"flag_{i}", self.rng.randint(0, 9))
+
+        for i in range(self.slots):
+            state.hp = self.rng.randint(1, 20)
+            state.current_scene_id = self.rng.choice(["boot_sequence", "main_menu", "phase3_validation"])
+            blob, _ = system._encode(state.to_dict())
+            with open(system.get_filepath(f"slot_{i:05d}"), 'wb') as f:
+                f.write(blob)
+        system.shutdown()
+
+    def _timed(self, label: str, fn):
+        t0 = time.perf_counter()
+        result = fn()
+        ms = (time.perf_counter() - t0) * 1000.0
+        print(f"{label:<40}{ms:>10.1f} ms")
+        return result
+
+    def run(self):
+        try:
+            self._timed(f"populate {self.slots} slots", self._populate)
+
+            system = SaveSystem(self.save_dir, codec=self.codec)
+            self._timed("full parse of every slot (no index)",
+                        lambda: [system._read_slot_info(f"slot_{i:05d}") for i in range(self.slots)])
+            count = self._timed("index rebuild", system.index.rebuild)
+            print(f"  slots indexed: {count}, index size: {os.path.getsize(system.index.path)} bytes")
+            system.shutdown()
+
+            fresh = SaveSystem(self.save_dir, codec=self.codec)
+            self._timed("list_slots, cold (verify=False)", lambda: fresh.list_slots(verify=False))
+            self._timed("list_slots, warm (verify=True, stat scan)", lambda: fresh.list_slots(verify=True))
+            fresh.shutdown()
+        finally:
+            shutil.rmtree(self.save_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark save slot index.")
+    parser.add_argument("--slots", type=int, default=2000)
+    parser.add_argument("--codec", default="json")
+    args = parser.parse_args()
+    SlotIndexBenchmark(args.slots, args.codec).run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# tools/check_timestep.py
+#
+# Checks that scene timing does not depend on the render rate. A headless
+# session is driven the way main.py drives it (FixedTimestep accumulator,
+# frame times as clock.tick would report them) at several render rates, with
+# an auto-player answering prompts. Like keyboard input, its commands arrive
+# once per rendered frame and are queued, one consumed per tick, so they
+# land on different ticks at different rates. Every run must produce the
+# same timeline (what each line said, and when it appeared relative to the
+# command before it) and the same final state.
+#
+#   python -m tools.check_timestep                     # 15, 30, 60, 144 FPS, 60 s of game time
+#   python -m tools.check_timestep --fps 24 75 --seconds 120
+#   python -m tools.check_timestep --scene phase3_validation   # includes a battle
+#   python -m tools.check_timestep --legacy            # also show the old one-step-per-frame loop
+#
+# Exits with status 1 if any fixed-timestep run differs from the first one.
+
+import argparse
+import sys
+from typing import List, Tuple
+from core.audio_engine import NullAudioEngine
+from core.config import GlobalConfig
+from core.fixed_timestep import FixedTimestep
+from core.session_recorder import SessionLog
+from story.game_session import GameSession
+
+class AutoPlayer:
+    """
+    Answers each prompt with its first accepted command (attack in combat)
+    after a fixed think time. Polled once per rendered frame, as main.py
+    polls the keyboard.
+    """
+    def __init__(self, session: GameSession, think_ms: int = 500):
+        self.session = session
+        self.think_ms = think_ms
+        self.waiting_since = None
+
+    def command(self, now_ms: int):
+        context, trie = self.session.scene_runner.active_commands()
+        if trie is None:
+            self.waiting_since = None
+            return None
+        if self.waiting_since is None:
+            self.waiting_since = now_ms
+        if now_ms - self.waiting_since < self.think_ms:
+            return None
+        self.waiting_since = None
+        if context == "combat":
+            return "attack"
+        runner = self.session.scene_runner
+        return runner.current_scene.steps[runner.current_step_index].kwargs["commands"][0]
+
+def frame_times(fps: int, seconds: float) -> List[int]:
+    """Integer frame durations at fps, as clock.tick returns them (they add up to the exact elapsed time)."""
+    frames = int(seconds * fps)
+    return [round((i + 1) * 1000 / fps) - round(i * 1000 / fps) for i in range(frames)]
+
+def run(config: GlobalConfig, fps: int, seconds: float, seed: int, scene: str = "main_menu",
+        legacy: bool = False) -> Tuple[list, str, int]:
+    """
+    (timeline, final digest, game ms of the last line); timeline =
+    [(ms since the last command was applied, channel, text)] of every line
+    once complete.
+    """
+    session = GameSession(config, NullAudioEngine(), seed=seed, start_scene=scene)
+    player = AutoPlayer(session)
+    sim_clock = FixedTimestep(config.SIM_TICK_MS, config.MAX_SIM_TICKS_PER_FRAME)
+    game_state = session.game_state
+    pending_commands = []
+    timeline = []
+    seen = 0  # history_seq of the last line recorded
+    now_ms = 0
+    command_ms = 0  # when the last command reached the session
+    last_ms = 0
+
+    def step(dt_ms: int, command):
+        nonlocal seen, command_ms, last_ms
+        if command:
+            command_ms = now_ms - dt_ms
+        session.step(dt_ms, command)
+        # Lines are logged once the next one starts (a typed line grows in place)
+        while seen < game_state.history_seq - 1:
+            entry = game_state.history[seen - game_state.history_seq]
+            timeline.append((now_ms - command_ms, entry.channel, entry.text))
+            last_ms = now_ms
+            seen += 1
+
+    for dt_ms in frame_times(fps, seconds):
+        if legacy:
+            now_ms += dt_ms
+            step(dt_ms, player.command(now_ms))
+            continue
+        command = player.command(now_ms)
+        if command:
+            pending_commands.append(command)  # consumed by the next tick (one per tick)
+        for _ in range(sim_clock.advance(dt_ms)):
+            now_ms += config.SIM_TICK_MS
+            step(config.SIM_TICK_MS, pending_commands.pop(0) if pending_commands else None)
+        if session.quit_requested:
+            break
+    return timeline, SessionLog.state_digest(session.game_state), last_ms
+
+def main():
+    parser = argparse.ArgumentParser(description="Render-rate independence check for the fixed-timestep loop.")
+    parser.add_argument("--fps", type=int, nargs="+", default=[15, 30, 60, 144])
+    parser.add_argument("--seconds", type=float, default=60.0, help="game time per run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scene", default="main_menu", help="start scene")
+    parser.add_argument("--legacy", action="store_true", help="also run one variable-dt step per frame, as before")
+    args = parser.parse_args()
+
+    config = GlobalConfig(TRANSCRIPT_PATH="")
+    modes = [False, True] if args.legacy else [False]
+    failed = False
+    for legacy in modes:
+        print(f"--- {'legacy (one step per frame)' if legacy else f'fixed {config.SIM_TICK_MS} ms ticks'} ---")
+        reference = None
+        for fps in args.fps:
+            timeline, digest, last_ms = run(config, fps, args.seconds, args.seed, args.scene, legacy)
+            if reference is None:
+                reference = (fps, timeline, digest)
+            ref_fps, ref_timeline, ref_digest = reference
+            first_diff = next((i for i, (a, b) in enumerate(zip(timeline, ref_timeline)) if a != b),
+                              None if len(timeline) == len(ref_timeline) else min(len(timeline), len(ref_timeline)))
+            same = first_diff is None and digest == ref_digest
+            status = "identical" if same else f"DIFFERS from {ref_fps} FPS"
+            print(f"{fps:>4} FPS  {len(timeline):>5} lines  last at {last_ms:>6} ms  digest {digest[:12]}  {status}")
+            if first_diff is not None and first_diff < min(len(timeline), len(ref_timeline)):
+                print(f"          first difference: line {first_diff}: {timeline[first_diff][:2]} vs {ref_timeline[first_diff][:2]}")
+            if not same and not legacy:
+                failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
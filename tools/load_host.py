@@ -0,0 +1,184 @@
+# tools/load_host.py
+#
+# Load generator for server.session_host: thousands of simulated operators.
+#
+#   python -m tools.load_host --clients 2000                  # spawns a host on a free port
+#   python -m tools.load_host --clients 500 --connect 127.0.0.1:7777
+#
+# Clients connect over --ramp seconds, then host stats are reset and the run
+# is measured for --duration seconds. Reported: command round trip (send ->
+# echoed "> cmd" line), host tick work and lag percentiles, and session-seconds
+# served per CPU-second. The generator shares the machine with a spawned host;
+# use --connect with a host on another core for clean per-core numbers.
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+from typing import List, Optional
+
+class SimulatedClient:
+    """Plays a fixed command script with random think time, forever."""
+    SCRIPT = ["start", "boot", "jumpstart", "engage", "scan", "attack", "heal", "attack", "attack", "menu", "diag"]
+    ECHO_MARK = b'"ch":"terminal","text":"> '
+
+    def __init__(self, host: str, port: int, think_s: float, rng: random.Random):
+        self.host = host
+        self.port = port
+        self.think_s = think_s
+        self.rng = rng
+        self.script_pos = rng.randrange(len(self.SCRIPT))
+
+        self.pending = deque()  # send times of commands not yet echoed
+        self.latencies_ms: List[float] = []
+        self.lines = 0
+        self.connected = False
+        self.error: Optional[str] = None
+
+    async def run(self, stop: asyncio.Event):
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as e:
+            self.error = str(e)
+            return
+        self.connected = True
+        receiver = asyncio.create_task(self._receive(reader))
+        try:
+            while not stop.is_set():
+                await asyncio.sleep(self.think_s * self.rng.uniform(0.5, 1.5))
+                command = self.SCRIPT[self.script_pos % len(self.SCRIPT)]
+                self.script_pos += 1
+                self.pending.append(time.perf_counter())
+                writer.write(f"{command}\n".encode('utf-8'))
+                await writer.drain()
+        except ConnectionError as e:
+            self.error = str(e)
+        finally:
+            receiver.cancel()
+            writer.close()
+
+    async def _receive(self, reader: asyncio.StreamReader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                self.error = self.error or "closed by host"
+                return
+            self.lines += 1
+            if self.ECHO_MARK in line and self.pending:
+                self.latencies_ms.append((time.perf_counter() - self.pending.popleft()) * 1000.0)
+
+class LoadGenerator:
+    def __init__(self, host: str, port: int, clients: int, ramp_s: float, duration_s: float,
+                 think_s: float, seed: int = 1):
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.clients = [SimulatedClient(host, port, think_s, random.Random(self.rng.random()))
+                        for _ in range(clients)]
+        self.ramp_s = ramp_s
+        self.duration_s = duration_s
+
+    async def _query_stats(self, reset: bool = False) -> dict:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        writer.write(b"/stats reset\n" if reset else b"/stats\n")
+        await writer.drain()
+        try:
+            while True:
+                msg = json.loads(await reader.readline())
+                if msg.get("t") == "stats":
+                    return msg
+        finally:
+            writer.close()
+
+    async def run(self) -> dict:
+        stop = asyncio.Event()
+        tasks = []
+        gap = self.ramp_s / max(1, len(self.clients))
+        for client in self.clients:
+            tasks.append(asyncio.create_task(client.run(stop)))
+            await asyncio.sleep(gap)
+
+        # Measure steady state only
+        await asyncio.sleep(1.0)
+        await self._query_stats(reset=True)
+        for client in self.clients:
+            client.latencies_ms.clear()
+            client.lines = 0
+        t0 = time.perf_counter()
+        await asyncio.sleep(self.duration_s)
+        host_stats = await self._query_stats()
+        elapsed = time.perf_counter() - t0
+
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        latencies = sorted(ms for c in self.clients for ms in c.latencies_ms)
+        return {
+            "clients": len(self.clients),
+            "connected": sum(c.connected for c in self.clients),
+            "errors": sum(1 for c in self.clients if c.error and c.error != "closed by host"),
+            "lines_per_s": sum(c.lines for c in self.clients) / elapsed,
+            "commands": len(latencies),
+            "rtt_ms": {f"p{p}": latencies[min(len(latencies) - 1, int(p / 100.0 * len(latencies)))] if latencies else 0.0
+                       for p in (50, 95, 99)},
+            "host": host_stats,
+        }
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for_port(host: str, port: int, timeout_s: float = 10.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Host did not start on {host}:{port}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the headless session host.")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds to connect all clients")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds after ramp")
+    parser.add_argument("--think", type=float, default=2.0, help="mean seconds between commands per client")
+    parser.add_argument("--tick-hz", type=int, default=30, help="tick rate of a spawned host")
+    parser.add_argument("--connect", help="host:port of a running host (default: spawn one)")
+    args = parser.parse_args()
+
+    proc = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", free_port()
+        proc = subprocess.Popen([sys.executable, "-m", "server.session_host", "--port", str(port),
+                                 "--tick-hz", str(args.tick_hz)], stdout=subprocess.DEVNULL)
+        wait_for_port(host, port)
+
+    try:
+        r = asyncio.run(LoadGenerator(host, port, args.clients, args.ramp, args.duration, args.think).run())
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    h = r["host"]
+    print(f"clients {r['connected']}/{r['clients']} connected, {r['errors']} errors")
+    print(f"commands {r['commands']}  rtt p50 {r['rtt_ms']['p50']:.1f}  p95 {r['rtt_ms']['p95']:.1f}  p99 {r['rtt_ms']['p99']:.1f} ms")
+    print(f"stream   {r['lines_per_s']:.0f} lines/s")
+    print(f"host     {h['sessions']} sessions @ {h['tick_hz']} Hz, step {h['step_us']:.1f} us/session")
+    print(f"tick     p50 {h['tick_ms']['p50']:.2f}  p95 {h['tick_ms']['p95']:.2f}  p99 {h['tick_ms']['p99']:.2f} ms"
+          f"  (lag p95 {h['lag_ms']['p95']:.2f} ms)")
+    print(f"cpu      {h['cpu_util'] * 100:.0f}% of one core, {h['sessions_per_core']:.0f} sessions/core")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# tools/replay_session.py
+#
+# Replays a recording made with GlobalConfig.RECORD_SESSION_PATH.
+#
+#   python -m tools.replay_session session.rec.gz             # headless, as fast as possible
+#   python -m tools.replay_session session.rec.gz --realtime  # paced by the recorded frame times
+#
+# The recording's async results (audio/save events) are fed back in the frame
+# they were originally consumed, and saves start from the snapshot taken when
+# recording began, so the final state digest must match. Sessions recorded
+# with a transcript replay with a scratch one.
+# Exits with status 1 on a digest mismatch.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from core.audio_engine import NullAudioEngine
+from core.audio_models import AudioEvent, AudioJob
+from core.config import GlobalConfig
+from core.save_system import SaveEvent, SaveSystem
+from core.session_recorder import SessionLog
+from core.transcript import Transcript
+from story.game_session import GameSession
+
+class SessionReplayer:
+    def __init__(self, log: SessionLog, config: GlobalConfig = None):
+        self.log = log
+        # Saves (autosave included) go to a scratch dir seeded from the recording's
+        # snapshot, so 'load'/'slots' see the recorded slots and nothing real is touched
+        self.config = config or GlobalConfig()
+        self.save_dir = tempfile.mkdtemp(prefix="replay_saves_")
+        log.restore_saves(self.save_dir)
+        self.save_system = SaveSystem(self.save_dir, codec=self.config.SAVE_CODEC)
+        # Recorded AudioEvents stand in for the worker
+        self.session = GameSession(self.config, NullAudioEngine(), self.save_system,
+                                   seed=log.seed, start_scene=log.start_scene)
+        # Loads restore scrollback differently with a transcript (main.py attaches one)
+        self.transcript_dir = None
+        if log.transcript:
+            self.transcript_dir = tempfile.mkdtemp(prefix="replay_transcript_")
+            self.session.game_state.transcript = Transcript(os.path.join(self.transcript_dir, "transcript.log"))
+
+    def _apply_events(self, events: list):
+        for event in events:
+            source, etype, key, data = event
+            if source == "audio":
+                self.session.apply_audio_event(AudioEvent(etype, AudioJob(kind=key), data))
+            else:
+                self.session.apply_save_event(SaveEvent(etype, key, data))
+
+    def run(self, realtime: bool = False) -> dict:
+        frames = 0
+        t0 = time.perf_counter()
+        next_frame = t0
+        for dt_ms, command, events in self.log.frames():
+            if realtime:
+                next_frame += dt_ms / 1000.0
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self.session.step(dt_ms, command)
+            self._apply_events(events)
+            frames += 1
+        elapsed = time.perf_counter() - t0
+
+        digest = SessionLog.state_digest(self.session.game_state)
+        return {
+            "frames": frames,
+            "elapsed_s": elapsed,
+            "fps": frames / elapsed if elapsed else 0.0,
+            "digest": digest,
+            "match": self.log.final_digest is None or digest == self.log.final_digest,
+        }
+
+    def close(self):
+        self.save_system.shutdown()
+        shutil.rmtree(self.save_dir, ignore_errors=True)
+        if self.transcript_dir:
+            self.session.game_state.transcript.close()
+            shutil.rmtree(self.transcript_dir, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic session replay.")
+    parser.add_argument("recording")
+    parser.add_argument("--realtime", action="store_true", help="pace frames by the recorded dt")
+    args = parser.parse_args()
+
+    log = SessionLog.load(args.recording)
+    replayer = SessionReplayer(log)
+    try:
+        r = replayer.run(realtime=args.realtime)
+    finally:
+        replayer.close()
+
+    recorded_s = sum(dt for dt, _, _ in log.frames()) / 1000.0
+    print(f"seed {log.seed}  start '{log.start_scene}'  {r['frames']} frames ({recorded_s:.1f}s recorded), "
+          f"{len(log.saves)} save files")
+    print(f"replayed in {r['elapsed_s']:.3f}s  ({r['fps']:.0f} frames/s)")
+    if log.final_digest is None:
+        print("Recording has no final digest; nothing to verify.")
+        return
+    if not r["match"]:
+        print(f"DIGEST MISMATCH: recorded {log.final_digest[:16]}  replayed {r['digest'][:16]}")
+        sys.exit(1)
+    print(f"Digest match: {r['digest'][:16]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+# tools/sim_combat.py
+#
+# Monte Carlo combat balance report for every combat_start in the scene corpus.
+# Rules, enemies and damage tables come from the same CombatEngine the game uses.
+#
+#   python -m tools.sim_combat                         # all encounters, all policies
+#   python -m tools.sim_combat --enemies all           # plus every enemy in content/combat
+#   python -m tools.sim_combat --battles 5000000 --json combat_balance.json
+#   python -m tools.sim_combat --min-win-rate 0.6      # exit 1 if an encounter is unwinnable-ish
+#
+# Methods:
+#   numpy  - battles vectorized across arrays, one array op per turn (needs NumPy)
+#   python - one battle at a time through CombatEngine.resolve_turn (slow; cross-check)
+#   exact  - no sampling: propagates the probability of every (player HP, enemy HP)
+#            state turn by turn. Same report, no dependency, no sampling noise.
+#   auto   - numpy if installed, else exact.
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+from story.combat_engine import CombatContentError, CombatEngine, EnemyDef
+from story.story_loader import StoryLoader
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+OUTCOMES = ("won", "lost", "fled", "timeout")
+
+@dataclass(frozen=True)
+class CombatPolicy:
+    """
+    Threshold policy: flee at or below flee_at HP, else heal at or below
+    heal_at, else attack. Actions the enemy doesn't allow fall back to attack.
+    """
+    name: str
+    heal_at: int = 0
+    flee_at: int = 0
+
+    def choose(self, player_hp: int, allowed=("attack", "heal", "flee")) -> str:
+        if player_hp <= self.flee_at and "flee" in allowed:
+            return "flee"
+        if player_hp <= self.heal_at and "heal" in allowed:
+            return "heal"
+        return "attack"
+
+POLICIES: Dict[str, CombatPolicy] = {
+    "aggressive": CombatPolicy("aggressive"),
+    "cautious": CombatPolicy("cautious", heal_at=6),
+    "coward": CombatPolicy("coward", flee_at=6),
+}
+
+@dataclass(frozen=True)
+class Encounter:
+    scene_id: str
+    enemy: EnemyDef
+    enemy_name: str
+    enemy_hp: int
+
+def find_encounters(scenes_dir: str, engine: CombatEngine) -> List[Encounter]:
+    """
+    combat_start steps resolved the way SceneRunner does (enemy_id, then
+    name/hp overrides). An unknown enemy_id raises CombatContentError:
+    SceneRunner skips such a fight, so it must not be simulated as the default.
+    """
+    loader = StoryLoader(scenes_dir)
+    encounters = []
+    for filename in sorted(os.listdir(scenes_dir)):
+        if not filename.endswith(".json"):
+            continue
+        scene = loader.load_scene(filename[:-len(".json")])
+        for step in scene.steps:
+            if step.type == "combat_start":
+                enemy = engine.encounter_enemy(step.kwargs.get("enemy_id", ""))
+                if enemy is None:
+                    raise CombatContentError(f"Scene '{scene.id}': unknown enemy_id '{step.kwargs['enemy_id']}'")
+                encounters.append(Encounter(scene.id, enemy, step.kwargs.get("enemy_name", enemy.name),
+                                            step.kwargs.get("hp", enemy.hp)))
+    return encounters
+
+class BattleStats:
+    """Weighted outcome totals plus turn-count and HP-left (on win) histograms."""
+    def __init__(self, max_turns: int, max_hp: int):
+        self.outcomes = {name: 0.0 for name in OUTCOMES}
+        self.turns = [0.0] * (max_turns + 1)
+        self.hp_left = [0.0] * (max_hp + 1)
+        self.total = 0.0
+
+    def add(self, outcome: str, turns: int, hp_left: int, weight: float = 1.0):
+        self.outcomes[outcome] += weight
+        self.turns[turns] += weight
+        if outcome == "won":
+            self.hp_left[hp_left] += weight
+        self.total += weight
+
+    @staticmethod
+    def _percentile(hist: List[float], p: float) -> int:
+        total = sum(hist)
+        if not total:
+            return 0
+        target = p / 100.0 * total
+        seen = 0.0
+        for value, weight in enumerate(hist):
+            seen += weight
+            if seen >= target:
+                return value
+        return len(hist) - 1
+
+    @staticmethod
+    def _mean(hist: List[float]) -> float:
+        total = sum(hist)
+        return sum(v * w for v, w in enumerate(hist)) / total if total else 0.0
+
+    def summary(self) -> dict:
+        turns_hist = [w / self.total for w in self.turns] if self.total else self.turns
+        wins = self.outcomes["won"]
+        return {
+            "rates": {name: (count / self.total if self.total else 0.0) for name, count in self.outcomes.items()},
+            "turns": {
+                "mean": self._mean(self.turns),
+                **{f"p{p}": self._percentile(self.turns, p) for p in (50, 90, 99)},
+                "histogram": turns_hist,
+            },
+            "hp_left_on_win": {
+                "mean": self._mean(self.hp_left),
+                **{f"p{p}": self._percentile(self.hp_left, p) for p in (10, 50, 90)},
+                "histogram": [w / wins for w in self.hp_left] if wins else self.hp_left,
+            },
+        }
+
+class ScalarCombatSim:
+    """Reference: plays battles one by one through the same resolve_turn the game uses."""
+    def __init__(self, engine: CombatEngine, policy: CombatPolicy, player_hp: int, max_turns: int, seed: int):
+        self.engine = engine
+        self.policy = policy
+        self.player_hp = player_hp
+        self.max_turns = max_turns
+        self.rng = random.Random(seed)
+
+    def run(self, enemy: EnemyDef, enemy_hp: int, battles: int) -> BattleStats:
+        stats = BattleStats(self.max_turns, self.player_hp)
+        resolve_turn, allowed = self.engine.resolve_turn, enemy.action_ids
+        for _ in range(battles):
+            php, ehp, outcome, turn = self.player_hp, enemy_hp, "timeout", self.max_turns
+            for t in range(1, self.max_turns + 1):
+                result = resolve_turn(enemy, self.policy.choose(php, allowed), php, self.player_hp, ehp, self.rng)
+                php, ehp = result.player_hp, result.enemy_hp
+                if result.result != "ongoing":
+                    outcome, turn = result.result, t
+                    break
+            stats.add(outcome, turn, max(0, php))
+        return stats
+
+class VectorCombatSim:
+    """All battles of a chunk advance together; each turn is a handful of NumPy array ops."""
+    CHUNK = 1_000_000
+
+    def __init__(self, engine: CombatEngine, policy: CombatPolicy, player_hp: int, max_turns: int, seed: int):
+        self.engine = engine
+        self.policy = policy
+        self.player_hp = player_hp
+        self.max_turns = max_turns
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, enemy: EnemyDef, enemy_hp: int, battles: int) -> BattleStats:
+        stats = BattleStats(self.max_turns, self.player_hp)
+        remaining = battles
+        while remaining > 0:
+            n = min(self.CHUNK, remaining)
+            self._run_chunk(enemy, enemy_hp, n, stats)
+            remaining -= n
+        return stats
+
+    @staticmethod
+    def _sampler(pmf):
+        values = np.array([v for v, _ in pmf], dtype=np.int32)
+        probs = np.array([p for _, p in pmf])
+        return lambda rng, m: rng.choice(values, size=m, p=probs)
+
+    def _run_chunk(self, enemy: EnemyDef, enemy_hp: int, n: int, stats: BattleStats):
+        rng, policy = self.rng, self.policy
+        attack_action = enemy.commands["attack"]
+        heal_amount = enemy.commands["heal"].amount if "heal" in enemy.commands else 0
+        flee_chance = enemy.commands["flee"].chance if "flee" in enemy.commands else 0.0
+        flee_at = policy.flee_at if "flee" in enemy.commands else 0
+        heal_at = policy.heal_at if "heal" in enemy.commands else 0
+        player_damage = self._sampler(attack_action.table.pmf)
+        enemy_damage = self._sampler(enemy.damage_pmf)
+
+        php = np.full(n, self.player_hp, dtype=np.int32)
+        ehp = np.full(n, enemy_hp, dtype=np.int32)
+        outcome = np.full(n, OUTCOMES.index("timeout"), dtype=np.int8)
+        turns = np.full(n, self.max_turns, dtype=np.int32)
+        active = np.arange(n)
+
+        for t in range(1, self.max_turns + 1):
+            if not active.size:
+                break
+            p, e = php[active], ehp[active]
+            m = active.size
+
+            flee = p <= flee_at
+            heal = ~flee & (p <= heal_at)
+            attack = ~(flee | heal)
+
+            e = np.where(attack, e - player_damage(rng, m), e)
+            p = np.where(heal, np.minimum(self.player_hp, p + heal_amount), p)
+            escaped = flee & (rng.random(m) > 1.0 - flee_chance)
+            won = attack & (e <= 0)
+
+            hit = ~(won | escaped)
+            p = np.where(hit, p - enemy_damage(rng, m), p)
+            lost = hit & (p <= 0)
+
+            php[active], ehp[active] = p, e
+            for name, mask in (("won", won), ("lost", lost), ("fled", escaped)):
+                outcome[active[mask]] = OUTCOMES.index(name)
+            ended = won | lost | escaped
+            turns[active[ended]] = t
+            active = active[~ended]
+
+        for index, name in enumerate(OUTCOMES):
+            stats.outcomes[name] += float(np.count_nonzero(outcome == index))
+        for value, count in enumerate(np.bincount(turns, minlength=self.max_turns + 1)):
+            stats.turns[value] += float(count)
+        won_hp = np.clip(php[outcome == OUTCOMES.index("won")], 0, self.player_hp)
+        for value, count in enumerate(np.bincount(won_hp, minlength=self.player_hp + 1)):
+            stats.hp_left[value] += float(count)
+        stats.total += n
+
+class ExactCombatSim:
+    """
+    Exact distributions without sampling: probability mass over (player HP,
+    enemy HP) is pushed through the rules one turn at a time using the
+    engine's precomputed damage distributions. Equivalent to infinitely many
+    battles; the state space is tiny (max HP x enemy HP).
+    """
+    EPSILON = 1e-12  # stop once this little probability is still in play
+
+    def __init__(self, engine: CombatEngine, policy: CombatPolicy, player_hp: int, max_turns: int, seed: int = 0):
+        self.engine = engine
+        self.policy = policy
+        self.player_hp = player_hp
+        self.max_turns = max_turns
+
+    @staticmethod
+    def _enemy_turn(enemy: EnemyDef, php: int, ehp: int, mass: float, t: int, nxt: dict, stats: BattleStats):
+        for dmg, p in enemy.damage_pmf:
+            if php - dmg <= 0:
+                stats.add("lost", t, 0, mass * p)
+            else:
+                key = (php - dmg, ehp)
+                nxt[key] = nxt.get(key, 0.0) + mass * p
+
+    def run(self, enemy: EnemyDef, enemy_hp: int, battles: int = 0) -> BattleStats:
+        stats = BattleStats(self.max_turns, self.player_hp)
+        states = {(self.player_hp, enemy_hp): 1.0}
+
+        for t in range(1, self.max_turns + 1):
+            nxt: Dict[tuple, float] = {}
+            for (php, ehp), mass in states.items():
+                action = enemy.commands[self.policy.choose(php, enemy.action_ids)]
+                if action.effect == "damage":
+                    for dmg, p in action.table.pmf:
+                        if ehp - dmg <= 0:
+                            stats.add("won", t, php, mass * p)
+                        else:
+                            self._enemy_turn(enemy, php, ehp - dmg, mass * p, t, nxt, stats)
+                elif action.effect == "heal":
+                    self._enemy_turn(enemy, min(self.player_hp, php + action.amount), ehp, mass, t, nxt, stats)
+                elif action.effect == "flee":
+                    stats.add("fled", t, php, mass * action.chance)
+                    self._enemy_turn(enemy, php, ehp, mass * (1.0 - action.chance), t, nxt, stats)
+            states = nxt
+            if sum(states.values()) < self.EPSILON:
+                break
+
+        leftover = sum(states.values())
+        if leftover:
+            stats.add("timeout", self.max_turns, 0, leftover)
+        return stats
+
+SIMULATORS = {"numpy": VectorCombatSim, "python": ScalarCombatSim, "exact": ExactCombatSim}
+
+def main():
+    parser = argparse.ArgumentParser(description="Combat balance simulator.")
+    parser.add_argument("--scenes", default="content/scenes")
+    parser.add_argument("--combat", default="content/combat", help="enemy/action/damage table content")
+    parser.add_argument("--enemies", nargs="*", help="also test these enemy ids at their base HP ('all' for every one)")
+    parser.add_argument("--enemy-hp", type=int, nargs="*", help="extra enemy HP values to test")
+    parser.add_argument("--policies", nargs="+", default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument("--player-hp", type=int, default=20)
+    parser.add_argument("--battles", type=int, default=1_000_000)
+    parser.add_argument("--max-turns", type=int, default=200, help="battles still running are 'timeout'")
+    parser.add_argument("--method", default="auto", choices=["auto"] + list(SIMULATORS))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the full report (with histograms) here")
+    parser.add_argument("--min-win-rate", type=float, default=0.0,
+                        help="exit 1 if an encounter's best policy wins less often than this")
+    args = parser.parse_args()
+
+    method = args.method
+    if method == "auto":
+        method = "numpy" if HAS_NUMPY else "exact"
+    if method == "numpy" and not HAS_NUMPY:
+        parser.error("NumPy is not installed; use --method exact or python")
+
+    engine = CombatEngine(args.combat)
+    try:
+        encounters = find_encounters(args.scenes, engine)
+    except CombatContentError as e:
+        parser.error(str(e))
+    enemy_ids = list(engine.enemies) if args.enemies == ["all"] else args.enemies or []
+    for enemy_id in enemy_ids:
+        if enemy_id not in engine.enemies:
+            parser.error(f"unknown enemy id: {enemy_id}")
+        enemy = engine.enemies[enemy_id]
+        encounters.append(Encounter("(enemy)", enemy, enemy.name, enemy.hp))
+    default = engine.enemy()
+    encounters += [Encounter("(cli)", default, f"HP {hp} target", hp) for hp in args.enemy_hp or []]
+    if not encounters:
+        print("No combat_start steps found.")
+        return
+
+    sampled = "" if method == "exact" else f", {args.battles:,} battles each"
+    print(f"method {method}{sampled}, player HP {args.player_hp}")
+    print(f"{'encounter':<44}{'policy':<12}{'win%':>7}{'loss%':>7}{'fled%':>7}"
+          f"{'turns p50/p90/p99':>20}{'HP left p10/p50/p90':>22}")
+
+    report, failures = [], []
+    t0 = time.perf_counter()
+    for enc in encounters:
+        label = f"{enc.scene_id}:{enc.enemy_name} ({enc.enemy_hp})"
+        best = 0.0
+        for name in args.policies:
+            sim = SIMULATORS[method](engine, POLICIES[name], args.player_hp, args.max_turns, args.seed)
+            s = sim.run(enc.enemy, enc.enemy_hp, args.battles).summary()
+            best = max(best, s["rates"]["won"])
+            report.append({"scene_id": enc.scene_id, "enemy_id": enc.enemy.enemy_id,
+                           "enemy_name": enc.enemy_name, "enemy_hp": enc.enemy_hp,
+                           "policy": name, **s})
+            r, tu, hp = s["rates"], s["turns"], s["hp_left_on_win"]
+            turns = f"{tu['p50']}/{tu['p90']}/{tu['p99']}"
+            hp_left = f"{hp['p10']}/{hp['p50']}/{hp['p90']}" if r["won"] else "-"
+            print(f"{label[:43]:<44}{name:<12}{r['won'] * 100:>7.1f}{r['lost'] * 100:>7.1f}{r['fled'] * 100:>7.1f}"
+                  f"{turns:>20}{hp_left:>22}")
+            label = ""
+        if best < args.min_win_rate:
+            failures.append(f"{enc.scene_id}:{enc.enemy_name} best win rate {best:.1%} < {args.min_win_rate:.1%}")
+    elapsed = time.perf_counter() - t0
+
+    runs = len(encounters) * len(args.policies)
+    rate = "" if method == "exact" else f" ({runs * args.battles / elapsed:,.0f} battles/s)"
+    print(f"{runs} runs in {elapsed:.2f}s{rate}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"method": method, "battles": args.battles, "player_hp": args.player_hp,
+                       "results": report}, f, indent=2)
+    if failures:
+        print("BALANCE CHECK FAILED:")
+        for msg in failures:
+            print(f"  {msg}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# tools/tts_cache_report.py
+#
+# TTS cache reuse across the scene corpus, for each keying scheme:
+#   raw        - key on the text as written (the old behaviour)
+#   normalized - key on normalize_tts_text() (TTS_NORMALIZE)
+#   phrases    - normalized, split into sentences (TTS_PHRASE_SEGMENTS)
+#
+#   python -m tools.tts_cache_report
+#   python -m tools.tts_cache_report --scenes content/scenes --json tts_report.json
+#
+# "hit rate" is the share of synthesis requests a cold cache answers during
+# one pass over every voice step; "chars" is what would be sent to the
+# backend (ElevenLabs bills per character). "on disk" counts keys already in
+# AUDIO_CACHE_DIR.
+#
+# "edit reuse" is the share of synthesis requests still answered by the
+# existing cache after a cosmetic rewrite of each line (curly quotes,
+# doubled spaces, shouted words, a dropped final period): what a
+# writer's touch-up or a hot-reloaded scene costs in re-synthesis. The
+# shipped corpus has no repeated lines, so this is where normalization pays.
+
+import argparse
+import dataclasses
+import json
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+from core.audio_cache import AudioCache
+from core.audio_models import AudioJob
+from core.config import GlobalConfig
+from story.story_loader import StoryLoader
+
+SCHEMES = ("raw", "normalized", "phrases")
+
+def voice_lines(scenes_dir: str) -> List[Tuple[str, str, str]]:
+    """(scene_id, voice_id, text) of every voice step in the corpus."""
+    loader = StoryLoader(scenes_dir)
+    lines = []
+    for filename in sorted(os.listdir(scenes_dir)):
+        if not filename.endswith(".json"):
+            continue
+        scene = loader.load_scene(filename[:-len(".json")])
+        for step in scene.steps:
+            if step.type == "voice" and step.kwargs.get("text"):
+                lines.append((scene.id, step.kwargs.get("voice_id", "default"), step.kwargs["text"]))
+    return lines
+
+# Rewrites a writer might make without changing what is spoken
+EDITS = {
+    "curly quotes": lambda t: t.replace("'", "\u2019"),
+    "double spaces": lambda t: t.replace(" ", "  "),
+    "trailing space": lambda t: t + " ",
+    "no final period": lambda t: t[:-1] if t.endswith(".") else t,
+    "shouted words": lambda t: re.sub(r"\b[A-Z][a-z]{3,}\b", lambda m: m.group(0).upper(), t),
+}
+
+def scheme_cache(config: GlobalConfig, scheme: str) -> AudioCache:
+    """The AudioCache the game would key with under a scheme."""
+    return AudioCache(dataclasses.replace(config, TTS_NORMALIZE=scheme != "raw",
+                                          TTS_PHRASE_SEGMENTS=scheme == "phrases"))
+
+def edit_reuse(lines: List[Tuple[str, str, str]], cache: AudioCache, backend: str) -> dict:
+    """Share of an edited corpus's synthesis requests already made by the original one."""
+    original = {key for key, _ in units(lines, cache, backend)}
+    requests = hits = 0
+    for edit in EDITS.values():
+        edited = [(scene_id, voice_id, edit(text)) for scene_id, voice_id, text in lines]
+        edited = [line for line, old in zip(edited, lines) if line[2] != old[2]]
+        for key, _ in units(edited, cache, backend):
+            requests += 1
+            hits += key in original
+    return {"requests": requests, "hit_rate": hits / requests if requests else 0.0}
+
+def units(lines: List[Tuple[str, str, str]], cache: AudioCache, backend: str) -> List[Tuple[str, str]]:
+    """
+    (cache key, synthesized text) of each synthesis request the corpus makes,
+    split and keyed by the cache itself (phrase_jobs, get_key), so the
+    report measures exactly what the game would look up.
+    """
+    requests = []
+    for _, voice_id, text in lines:
+        for job in cache.phrase_jobs(AudioJob(kind="tts", text=text, voice_id=voice_id)):
+            requests.append((cache.get_key(backend, job), cache.tts_text(job.text)))
+    return requests
+
+def report(lines: List[Tuple[str, str, str]], backend: str, config: GlobalConfig) -> Dict[str, dict]:
+    results = {}
+    for scheme in SCHEMES:
+        cache = scheme_cache(config, scheme)
+        requests = units(lines, cache, backend)
+        counts = Counter(requests)
+        results[scheme] = {
+            "requests": len(requests),
+            "unique": len(counts),
+            "hit_rate": 1.0 - len(counts) / len(requests) if requests else 0.0,
+            "chars": sum(len(text) for _, text in counts),
+            "on_disk": sum(1 for key, _ in counts if cache.has(key)),
+            "edit_reuse": edit_reuse(lines, cache, backend)["hit_rate"],
+            "repeated": sorted(((text, n) for (_, text), n in counts.items() if n > 1), key=lambda x: -x[1])[:10],
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS cache reuse per keying scheme over the scene corpus.")
+    parser.add_argument("--scenes", default="content/scenes")
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+
+    config = GlobalConfig()
+    lines = voice_lines(args.scenes)
+    results = report(lines, config.AUDIO_BACKEND, config)
+    print(f"{len(lines)} voice steps in {args.scenes} (backend: {config.AUDIO_BACKEND})")
+    print(f"{'scheme':<12}{'requests':>9}{'unique':>8}{'hit rate':>10}{'chars':>8}{'on disk':>9}{'edit reuse':>12}")
+    for scheme, r in results.items():
+        print(f"{scheme:<12}{r['requests']:>9}{r['unique']:>8}{r['hit_rate']:>10.1%}{r['chars']:>8}{r['on_disk']:>9}"
+              f"{r['edit_reuse']:>12.1%}")
+    raw_chars = results["raw"]["chars"]
+    for scheme in ("normalized", "phrases"):
+        r = results[scheme]
+        saved = 1.0 - r["chars"] / raw_chars if raw_chars else 0.0
+        print(f"{scheme}: hit rate {r['hit_rate'] - results['raw']['hit_rate']:+.1%} vs raw, "
+              f"edit reuse {r['edit_reuse'] - results['raw']['edit_reuse']:+.1%}, "
+              f"{saved:.1%} fewer characters synthesized")
+        for text, n in r["repeated"]:
+            print(f"    x{n}  {text}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()